@@ -1,15 +1,343 @@
+import bisect
 import datetime
+import functools
+import hashlib
+import http.server
+import json
 import logging
-from typing import Optional, Union, List, Tuple
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Union, List, Tuple
 
 import numpy as np
 import pandas as pd
+import talib
 import talib.abstract as ta
 from pandas import DataFrame, Series
 
 import freqtrade.vendor.qtpylib.indicators as qtpylib
-from freqtrade.persistence import Trade, CustomDataWrapper
-from freqtrade.strategy import (DecimalParameter, IStrategy, IntParameter)
+from freqtrade.enums import CandleType, RunMode
+from freqtrade.exchange import timeframe_to_prev_date, timeframe_to_resample_freq, timeframe_to_seconds
+from freqtrade.persistence import Order, Trade, CustomDataWrapper
+from freqtrade.strategy import (CategoricalParameter, DecimalParameter, IStrategy, IntParameter)
+
+
+def _ema_step(prev: float, value: float, period: int) -> float:
+    # Stejný tvar rekurze jako TA-Lib (TA_INT_EMA), aby navazující hodnoty seděly
+    return (value - prev) * (2.0 / (period + 1)) + prev
+
+
+def _wilder_step(prev: float, value: float, period: int) -> float:
+    # Wilderovo vyhlazení používané v TA-Lib pro RSI a ATR
+    return (prev * (period - 1) + value) / period
+
+
+def _decay_length(alpha: float, tolerance: float) -> int:
+    # Počet kroků rekurze x = (1 - alpha) * x + alpha * v, po kterých váha inicializace klesne pod tolerance
+    return int(np.ceil(np.log(tolerance) / np.log1p(-alpha)))
+
+
+def _date_overlap(cached_dates: np.ndarray, dates: np.ndarray) -> Optional[Tuple[int, int]]:
+    """
+    Ověří, že nový dataframe jen pokračuje v uložené časové řadě (zepředu může ubýt, vzadu přibýt).
+    Vrátí (offset do uložených dat, délka překryvu), nebo None pokud se historie přepsala.
+    """
+    if len(cached_dates) == 0 or len(dates) == 0:
+        return None
+    offset = int(np.searchsorted(cached_dates, dates[0]))
+    if offset >= len(cached_dates) or cached_dates[offset] != dates[0]:
+        return None
+    overlap_len = len(cached_dates) - offset
+    if overlap_len > len(dates) or not np.array_equal(dates[:overlap_len], cached_dates[offset:]):
+        return None
+    return offset, overlap_len
+
+
+def _sequential_mean(values: np.ndarray) -> float:
+    # Sčítání zleva doprava jako v TA-Lib (np.mean sčítá párově a liší se v posledních bitech)
+    total = 0.0
+    for value in values:
+        total += value
+    return total / len(values)
+
+
+def _rsi_state(close: np.ndarray, period: int) -> Tuple[float, float]:
+    """
+    Přehraje výpočet TA-Lib RSI a vrátí průměrný zisk a ztrátu po poslední svíčce.
+    Z výstupu RSI se tyto hodnoty zpětně získat nedají, proto je přepočítáváme.
+    """
+    if len(close) <= period:
+        return np.nan, np.nan
+    gain = 0.0
+    loss = 0.0
+    for i in range(1, period + 1):
+        delta = close[i] - close[i - 1]
+        if delta < 0:
+            loss -= delta
+        else:
+            gain += delta
+    gain /= period
+    loss /= period
+    for i in range(period + 1, len(close)):
+        delta = close[i] - close[i - 1]
+        gain = _wilder_step(gain, delta if delta > 0 else 0.0, period)
+        loss = _wilder_step(loss, -delta if delta < 0 else 0.0, period)
+    return gain, loss
+
+
+def _macd_state(close: np.ndarray, fast: int = 12, slow: int = 26) -> Tuple[float, float]:
+    """
+    Přehraje rychlou a pomalou EMA tak, jak je inicializuje TA-Lib MACD
+    (obě startují průměrem na indexu slow - 1).
+    """
+    if len(close) < slow:
+        return np.nan, np.nan
+    fast_ema = _sequential_mean(close[slow - fast:slow])
+    slow_ema = _sequential_mean(close[:slow])
+    for value in close[slow:]:
+        fast_ema = _ema_step(fast_ema, value, fast)
+        slow_ema = _ema_step(slow_ema, value, slow)
+    return fast_ema, slow_ema
+
+
+# Řádky výstupu _window_kernel (názvy odpovídají sloupcům dataframe)
+WINDOW_KERNEL_ROWS = ('pp', 'r1', 's1', 'swing_low', 'swing_high', 'hh', 'll', 'buyPower', 'sellPower', 'ttf')
+
+
+def _rolling_extreme(values: np.ndarray, window: int, min_periods: int, func: np.ufunc,
+                     out: np.ndarray) -> np.ndarray:
+    """
+    Klouzavé maximum/minimum (func = np.fmax/np.fmin) zapsané do out, shodné s pandas
+    rolling(window, min_periods).max()/min() včetně NaN na začátku a NaN ve vstupu.
+    Van Herk/Gil-Werman: prefixové a sufixové extrémy po blocích délky window, výsledek okna
+    je extrém sufixu jeho prvního a prefixu posledního bloku - O(n) bez ohledu na délku okna.
+    Extrém jen vybírá jednu ze vstupních hodnot, takže výsledek je bitově stejný jako v pandas.
+    Počítá se po poslední ose - 2-D vstup (páry, svíčky) zpracuje všechny páry najednou.
+    """
+    lead, n = values.shape[:-1], values.shape[-1]
+    if n == 0:
+        return out
+    blocks = -(-n // window)
+    padded = np.full(lead + (blocks, window), np.nan)
+    padded.reshape(lead + (-1,))[..., :n] = values
+    prefix = func.accumulate(padded, axis=-1).reshape(lead + (-1,))
+    # Sufix se zapisuje rovnou do obráceného pohledu, reshape pak nekopíruje
+    suffix = np.empty_like(padded)
+    func.accumulate(padded[..., ::-1], axis=-1, out=suffix[..., ::-1])
+    suffix = suffix.reshape(lead + (-1,))
+    # Neúplná okna na začátku leží celá v prvním bloku => prefix od indexu 0
+    head = min(window - 1, n)
+    out[..., :head] = prefix[..., :head]
+    if n >= window:
+        func(suffix[..., :n - window + 1], prefix[..., window - 1:n], out=out[..., window - 1:])
+    # pandas počítá do min_periods jen ne-NaN hodnoty v okně
+    missing = np.isnan(values)
+    if missing.any():
+        valid = np.concatenate((np.zeros(lead + (1,), dtype=np.int64), np.cumsum(~missing, axis=-1)), axis=-1)
+        counts = valid[..., 1:] - valid[..., np.maximum(np.arange(1, n + 1) - window, 0)]
+        out[counts < min_periods] = np.nan
+    else:
+        out[..., :min(min_periods - 1, n)] = np.nan
+    return out
+
+
+def _ttf_kernel(close: np.ndarray, lookback: int, out: np.ndarray) -> np.ndarray:
+    """
+    hh, ll, buyPower, sellPower a TTF do řádků out (5, ..., n). Posuny o lookback jsou jen posunuté
+    slice bez mezivýsledků, aritmetika má stejné pořadí operací jako původní pandas výrazy.
+    """
+    hh, ll, buy_power, sell_power, ttf = out
+    _rolling_extreme(close, lookback, lookback, np.fmax, hh)
+    _rolling_extreme(close, lookback, lookback, np.fmin, ll)
+    buy_power[..., :lookback] = np.nan
+    sell_power[..., :lookback] = np.nan
+    np.subtract(hh[..., lookback:], ll[..., :-lookback], out=buy_power[..., lookback:])
+    np.subtract(hh[..., :-lookback], ll[..., lookback:], out=sell_power[..., lookback:])
+    # 200 * (buy - sell) / (buy + sell), dělení nulou dává inf/NaN stejně jako pandas
+    np.subtract(buy_power, sell_power, out=ttf)
+    np.multiply(ttf, 200, out=ttf)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(ttf, buy_power + sell_power, out=ttf)
+    return out
+
+
+def _window_kernel(high: np.ndarray, low: np.ndarray, close: np.ndarray, lookback: int,
+                   swing_window: int, swing_min_periods: int) -> np.ndarray:
+    """
+    Pivoty, swing high/low a hh/ll/TTF jedním voláním nad souvislými float64 poli.
+    Vrací předalokované pole (len(WINDOW_KERNEL_ROWS), ..., n), řádky jsou přímo sloupce dataframe
+    (pro 2-D vstup páry x svíčky je každý řádek 2-D a pár dostane jeho pohled).
+    Výsledky jsou bitově shodné s původním pandas výpočtem (shift/rolling) včetně NaN warm-upu.
+    """
+    out = np.empty((len(WINDOW_KERNEL_ROWS),) + close.shape)
+    pp, r1, s1, swing_low, swing_high = out[:5]
+    if close.shape[-1]:
+        pp[..., 0] = r1[..., 0] = s1[..., 0] = np.nan
+        # (high + low + close) / 3 z předchozí svíčky, sčítá se zleva jako v pandas
+        np.add(high[..., :-1], low[..., :-1], out=pp[..., 1:])
+        np.add(pp[..., 1:], close[..., :-1], out=pp[..., 1:])
+        np.divide(pp[..., 1:], 3, out=pp[..., 1:])
+        np.multiply(pp[..., 1:], 2, out=r1[..., 1:])
+        np.subtract(r1[..., 1:], low[..., :-1], out=r1[..., 1:])
+        np.multiply(pp[..., 1:], 2, out=s1[..., 1:])
+        np.subtract(s1[..., 1:], high[..., :-1], out=s1[..., 1:])
+    _rolling_extreme(low, swing_window, swing_min_periods, np.fmin, swing_low)
+    _rolling_extreme(high, swing_window, swing_min_periods, np.fmax, swing_high)
+    _ttf_kernel(close, lookback, out[5:])
+    return out
+
+
+class SharedCandleStore:
+    """
+    Read-only pohled na sdílený svíčkový store nodu, který plní jediný zapisovatel (candle_store.py).
+    Série = <série>.json (file, length, columns, date_unit) + memmap .npy (sloupce × kapacita,
+    date jako int64 ns). OHLCV sloupce vrácené z frame() jsou pohledy do mmap (zero-copy, stránky
+    sdílené všemi boty na nodu); .json se čte znovu jen při změně mtime.
+    """
+
+    def __init__(self, root: Union[str, Path]) -> None:
+        self.root = Path(root)
+        self.series = {}
+
+    @staticmethod
+    def series_name(pair: str, timeframe: str, candle_type: str) -> str:
+        # Stejné pojmenování jako series_name v candle_store.py
+        return f"{pair.replace('/', '_').replace(':', '_')}-{timeframe}-{candle_type}"
+
+    def open_series(self, pair: str, timeframe: str, candle_type: str) -> Optional[dict]:
+        name = self.series_name(pair, timeframe, candle_type)
+        meta_path = self.root / f"{name}.json"
+        try:
+            mtime = meta_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        cached = self.series.get(name)
+        if cached is not None and cached['mtime'] == mtime:
+            return cached
+        try:
+            with meta_path.open() as f:
+                meta = json.load(f)
+            if cached is not None and cached['file'] == meta['file']:
+                buffer = cached['buffer']
+            else:
+                # Nová generace souboru - starý mmap zůstává platný, dokud na něj drží referenci pandas
+                buffer = np.load(self.root / meta['file'], mmap_mode='r')
+        except Exception as e:
+            logging.error(f"Error reading candle store {meta_path}: {e}")
+            return None
+        cached = {**meta, 'mtime': mtime, 'buffer': buffer}
+        self.series[name] = cached
+        return cached
+
+    def last_date(self, pair: str, timeframe: str, candle_type: str) -> Optional[pd.Timestamp]:
+        series = self.open_series(pair, timeframe, candle_type)
+        if series is None or not series['length']:
+            return None
+        return pd.Timestamp(int(series['buffer'][0, series['length'] - 1].view(np.int64)), tz='UTC')
+
+    def frame(self, pair: str, timeframe: str, candle_type: str,
+              count: Optional[int] = None) -> Optional[DataFrame]:
+        series = self.open_series(pair, timeframe, candle_type)
+        if series is None or not series['length']:
+            return None
+        length = series['length']
+        view = series['buffer'][:, max(0, length - count) if count else 0:length]
+        data = {}
+        for i, column in enumerate(series['columns']):
+            if column == 'date':
+                data[column] = pd.to_datetime(view[i].view(np.int64), utc=True).as_unit(series['date_unit'])
+            else:
+                data[column] = view[i]
+        return DataFrame(data, copy=False)
+
+
+class CallbackMetrics:
+    """
+    Latence callbacků strategie (histogramy) a počty DB volání v Prometheus text formátu.
+    Měří jen metody obalené přes timed() - bez install_metrics() strategie neplatí nic.
+    Endpoint GET /metrics běží v daemon vlákně (serve), čte hodnoty bez zámku (jen čísla).
+    """
+    # Horní meze bucketů v sekundách (+Inf se přidává automaticky)
+    buckets = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+    def __init__(self, labels: dict) -> None:
+        self.set_labels(labels)
+        # callback -> ([počty v bucketech + Inf], [součet sekund])
+        self.histograms = {}
+        # (metrika, helper) -> počet
+        self.counters = {}
+        # Volitelný zdroj gauge hodnot: callable -> [(metrika, help, hodnota)]
+        self.gauges = None
+
+    def set_labels(self, labels: dict) -> None:
+        # Po reloadu parametrů se mění štítek params, histogramy pokračují
+        self.labels = ','.join(f'{name}="{value}"' for name, value in labels.items())
+
+    def timed(self, name: str, func):
+        counts = [0] * (len(self.buckets) + 1)
+        total = [0.0]
+        self.histograms[name] = (counts, total)
+        buckets = self.buckets
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                counts[bisect.bisect_left(buckets, elapsed)] += 1
+                total[0] += elapsed
+
+        return wrapper
+
+    def count(self, metric: str, helper: str) -> None:
+        key = (metric, helper)
+        self.counters[key] = self.counters.get(key, 0) + 1
+
+    def render(self) -> str:
+        lines = ['# HELP dailybuy_callback_duration_seconds Strategy callback latency.',
+                 '# TYPE dailybuy_callback_duration_seconds histogram']
+        for name, (counts, total) in self.histograms.items():
+            labels = f'{self.labels},callback="{name}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'dailybuy_callback_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'dailybuy_callback_duration_seconds_sum{{{labels}}} {total[0]}')
+            lines.append(f'dailybuy_callback_duration_seconds_count{{{labels}}} {cumulative}')
+        for metric in sorted({metric for metric, _ in self.counters}):
+            lines.append(f'# TYPE {metric} counter')
+            for (name, helper), value in self.counters.items():
+                if name == metric:
+                    lines.append(f'{metric}{{{self.labels},helper="{helper}"}} {value}')
+        for metric, help_text, value in (self.gauges() if self.gauges else []):
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} gauge',
+                      f'{metric}{{{self.labels}}} {value}']
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port: int) -> None:
+        metrics = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Scrape každých pár sekund by zaplavil log bota
+
+        server = http.server.ThreadingHTTPServer(('0.0.0.0', port), Handler)
+        threading.Thread(target=server.serve_forever, name='strategy-metrics', daemon=True).start()
 
 
 class DailyBuyStrategy3_5_JPA(IStrategy):
@@ -49,15 +377,93 @@ class DailyBuyStrategy3_5_JPA(IStrategy):
     trailing_stop_positive = 0.003
     trailing_stop_positive_offset = 0.008
 
-    dca_attempts = {}
     position_adjustment_enable = True
-    candle_open_prices = {}
-    last_dca_candle_index = {}
-
-    last_dca_price = {}
     dca_order_table = None
-    csl = {}
-    thresholds = {}
+
+    # Per-pair DCA stav (dicty se vytvářejí v __init__), ukládá se per trade do DB
+    persisted_trade_state = ('thresholds', 'dca_attempts', 'last_dca_price', 'candle_open_prices')
+
+    # Inkrementální výpočet indikátorů (jen live/dry-run, backtest vždy počítá celý dataframe)
+    incremental_indicators = True
+    # Více nových svíček než tento počet => plný přepočet (např. po výpadku spojení)
+    incremental_max_new_candles = 50
+
+    # Cross-pair batch: plný výpočet indikátorů všech párů se stejnou délkou dataframe najednou
+    # nad 2-D poli (páry x svíčky) - backtest/hyperopt v advise_all_indicators, live při startu
+    # a pro páry bez inkrementálního stavu. Pár pak dostane pohled na svůj řádek.
+    batch_indicators = True
+    # Max. páry x svíčky v jednom 2-D batchi (omezuje přechodnou paměť, ~8 B x 25 sloupců na buňku)
+    indicator_batch_max_cells = 2_000_000
+
+    # Hyperopt: všechny varianty EMA/hh/ll/TTF se spočítají jednou do memmap .npy (sdílené -j workery)
+    hyperopt_precompute = True
+
+    # Pásma ATR % (horní mez, exkluzivně) -> base leverage, viz docstring leverage()
+    atr_leverage_bands = ((0.5, 5.0), (1.0, 4.0), (1.5, 3.0), (2.0, 2.0))
+    atr_leverage_default = 1.0  # ATR >= 2.0 % nebo neznámé ATR (NaN)
+
+    # True => vyšší timeframe se skládá lokálně z base svíček a z burzy se nic navíc nestahuje
+    informative_resample = False
+
+    # Kompaktní dataframe (analyzovaná cache je u 5m bota největší spotřebitel paměti):
+    # float32 indikátory, bez duplicitních sloupců (pivot_point/resistance_1/support_1,
+    # previous_close) a bez mezivýsledků TTF (buyPower/sellPower).
+    # Zapíná env FT_COMPACT_DATAFRAME=1 nebo config 'strategy_compact_dataframe'
+    compact_dataframe = os.environ.get('FT_COMPACT_DATAFRAME', '').lower() in ('1', 'true')
+    # Sloupce porovnávané přímo s cenou zůstávají float64 (zaokrouhlení by překlopilo close > swing_high)
+    compact_float64_columns = ('swing_high',)
+
+    # Sdílený svíčkový store nodu (candle_store.py) - čerstvé svíčky se berou odtud místo z burzy
+    candle_store_path = os.environ.get('FT_CANDLE_STORE', '')
+
+    # Parametry za běhu (jen live/dry-run): JSON ve formátu exportu hyperoptu (strategy_name,
+    # params, ft_stratparam_v) se při startu načte po nativním <strategie>.json (má přednost)
+    # a při změně souboru znovu v bot_loop_start, bez restartu bota. Cesta z configu
+    # 'strategy_params_file' nebo env FT_PARAMS_FILE, jinak <user_data_dir>/strategy_params.json.
+    # Backtest/hyperopt berou jen nativní <strategie>.json.
+    params_file = os.environ.get('FT_PARAMS_FILE', '')
+    params_file_name = 'strategy_params.json'
+    params_file_version = 1
+    # Sekce params -> povolené klíče a typy (prostory buy/sell/protection se validují proti parametrům)
+    params_special_schema = {
+        'stoploss': {'stoploss': (int, float)},
+        'trailing': {'trailing_stop': bool, 'trailing_stop_positive': (int, float, type(None)),
+                     'trailing_stop_positive_offset': (int, float), 'trailing_only_offset_is_reached': bool},
+        'max_open_trades': {'max_open_trades': int},
+    }
+
+    # Warm start (jen live/dry-run): každých snapshot_interval_seconds se cache svíček exchange
+    # a indicator_state uloží do .npz vedle sqlite DB (persistentní /freqtrade/db_persist), při
+    # vypnutí bota ještě jednou. Po restartu podu se obnoví po načtení parametrů - freqtrade dotáhne jen
+    # chybějící svíčky a indikátory se počítají inkrementálně jen pro ně.
+    # Adresář z configu 'strategy_snapshot_dir' nebo env FT_SNAPSHOT_DIR, interval 0 => bez snapshotů
+    snapshot_dir = os.environ.get('FT_SNAPSHOT_DIR', '')
+    snapshot_file_name = 'warm_start.npz'
+    snapshot_interval_seconds = 600
+    snapshot_version = 1
+    snapshot_ohlcv_columns = ('date', 'open', 'high', 'low', 'close', 'volume')
+
+    # startup_candle_count se počítá z hodnot parametrů (warmup_candles): okna a posuny + u EMA
+    # a Wilderových rekurzí (RSI/ATR) počet svíček, po kterých váha inicializace klesne pod
+    # warmup_tolerance. Config 'startup_candle_count' hodnotu přebije.
+    warmup_tolerance = 0.01
+    warmup_parameters = ('buy_ema_short', 'buy_ema_long', 'lookback_length', 'swing_window')
+
+    # Plánovač analýzy po uzavření svíčky (jen live/dry-run, viz analyze):
+    # páry bez otevřeného tradu se rozloží do okna analysis_spread_ratio * timeframe
+    # (max analysis_spread_max_seconds), 0 => všechny páry hned jako ve freqtrade
+    analysis_spread_ratio = 0.1
+    analysis_spread_max_seconds = 60
+    # Rozpočet jedné smyčky na odložené páry (páry s otevřeným tradem se analyzují vždy)
+    analysis_loop_budget_seconds = 1.0
+    # Otevřený trade s cenou do této vzdálenosti nad SL má nejvyšší prioritu
+    analysis_stop_margin = 0.02
+
+    # Prometheus metriky callbacků (jen live/dry-run): port z configu 'strategy_metrics_port'
+    # nebo env FT_METRICS_PORT, 0 => vypnuto (callbacky se neobalují)
+    metrics_port = int(os.environ.get('FT_METRICS_PORT') or 0)
+    timed_callbacks = ('populate_indicators', 'populate_entry_trend', 'populate_exit_trend', 'custom_exit',
+                       'adjust_trade_position', 'confirm_trade_exit', 'leverage', 'custom_stake_amount')
 
     new_sl_coef = DecimalParameter(0.3, 0.9, default=0.75, space='sell', optimize=False)
     lookback_length = IntParameter(1, 30, default=15, space='buy', optimize=True)
@@ -83,6 +489,642 @@ class DailyBuyStrategy3_5_JPA(IStrategy):
     # sell_ema_short = IntParameter(5, 50, default=10, space='sell', optimize=False)
     # sell_ema_long = IntParameter(50, 200, default=50, space='sell', optimize=False)
 
+    def __init__(self, config: dict) -> None:
+        super().__init__(config)
+        # DCA stav per pár - instanční, ne sdílený přes třídu
+        self.thresholds = {}
+        self.dca_attempts = {}
+        self.last_dca_price = {}
+        self.candle_open_prices = {}
+        self.last_dca_candle_index = {}
+        self.csl = {}
+        # trade.id -> trade, jejichž stav se změnil a čeká na zápis v bot_loop_start
+        self.dirty_trade_state = {}
+        # Stav inkrementálních indikátorů per pár (EMA/RSI/ATR/MACD rekurze + poslední sloupce)
+        self.indicator_state = {}
+        # pair -> (klíč dataframe, sloupce) předpočítané compute_indicator_batch, spotřebuje populate_indicators
+        self.indicator_batch = {}
+        # Výsledek as-of merge vyššího timeframe per (pair, timeframe)
+        self.informative_cache = {}
+        # DCA seznam a SL per trade.id (write-through do CustomDataWrapper)
+        self.trade_data_cache = {}
+        # Otevřené memmap varianty indikátorů pro hyperopt (per worker proces)
+        self.hyperopt_variants = {}
+        # (pair, délka, první a poslední date) -> prefix souborů variant (hash dat jen jednou)
+        self.hyperopt_variant_paths = {}
+        # pair -> (date, atr, close) sloupce posledního analyzovaného dataframe pro leverage()
+        self.volatility_state = {}
+        self._atr_band_limits = [limit for limit, _ in self.atr_leverage_bands]
+        self._atr_band_leverage = [lev for _, lev in self.atr_leverage_bands] + [self.atr_leverage_default]
+        # SharedCandleStore, pokud je na nodu k dispozici (jen live/dry-run)
+        self.candle_store = None
+        self.compact_dataframe = bool(config.get('strategy_compact_dataframe', self.compact_dataframe))
+        # Metriky plánovače analýzy pro aktuální svíčku (queue_depth = páry čekající na analýzu,
+        # lag = s od uzavření svíčky do dokončení analýzy páru)
+        self.analysis_metrics = {'candle': None, 'queue_depth': 0, 'peak_queue_depth': 0, 'analyzed': 0,
+                                 'urgent': 0, 'lag_last': 0.0, 'lag_max': 0.0, 'loop_seconds': 0.0}
+        # Fáze bota v okně rozložení - boty flotily se stejným timeframem nezačínají současně
+        # CallbackMetrics, pokud jsou metriky zapnuté (install_metrics)
+        self.metrics = None
+        # (mtime_ns, velikost) naposledy načteného souboru parametrů - reload jen při změně
+        self.params_file_key = None
+        # Vlákno posledního zápisu warm-start snapshotu a monotonic čas jeho spuštění
+        self.snapshot_thread = None
+        self.snapshot_time = time.monotonic()
+        self.startup_candle_count = self.warmup_candles(self.startup_param_values(),
+                                                        config.get('timeframe'))
+        bot_name = str(config.get('bot_name', ''))
+        self._analysis_phase = int(hashlib.md5(bot_name.encode()).hexdigest()[:8], 16) / 2 ** 32
+
+    def is_live_mode(self) -> bool:
+        return self.config.get('runmode') in (RunMode.LIVE, RunMode.DRY_RUN)
+
+    def bot_start(self, **kwargs) -> None:
+        if self.is_live_mode():
+            self.load_trade_state()
+            self.install_candle_store()
+            self.install_metrics()
+
+    def ft_load_hyper_params(self, hyperopt: bool = False) -> None:
+        # Freqtrade nastaví parametry z nativního <strategie>.json až po bot_start - runtime soubor
+        # parametrů se proto aplikuje tady, po něm (a až teď jsou parametry zaregistrované pro validaci)
+        super().ft_load_hyper_params(hyperopt)
+        if self.is_live_mode():
+            self.params_file_key = None
+            self.reload_strategy_params()
+            # Snapshot indikátorů platí jen pro stejné hodnoty parametrů (indicator_signature)
+            self.load_warm_start()
+
+    def ft_bot_cleanup(self) -> None:
+        # Vypnutí bota (SIGTERM při restartu podu) - poslední snapshot, ať restart navazuje na aktuální stav
+        if self.is_live_mode() and self.snapshot_interval_seconds:
+            self.save_warm_start(blocking=True)
+        super().ft_bot_cleanup()
+
+    def strategy_params_path(self) -> Path:
+        path = self.config.get('strategy_params_file') or self.params_file
+        if path:
+            return Path(path)
+        return Path(self.config.get('user_data_dir', 'user_data')) / self.params_file_name
+
+    def reload_strategy_params(self) -> bool:
+        """
+        Načte soubor parametrů, pokud se od posledního načtení změnil (mtime/velikost).
+        Nevalidní soubor se zaloguje a platí dál předchozí hodnoty - zkusí se znovu po další
+        změně (nedopsaný soubor se tak načte, až zápis doběhne).
+        """
+        path = self.strategy_params_path()
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        key = (stat.st_mtime_ns, stat.st_size)
+        if key == self.params_file_key:
+            return False
+        self.params_file_key = key
+        try:
+            with open(path, 'r') as f:
+                params = self.validate_strategy_params(json.load(f))
+        except (OSError, ValueError) as e:
+            logging.error(f"Error loading strategy params from {path}: {e}")
+            return False
+        changes = self.apply_strategy_params(params)
+        startup = self.warmup_candles({name: getattr(self, name).value for name in self.warmup_parameters},
+                                      self.timeframe)
+        if startup > self.config.get('startup_candle_count', 0):
+            # Exchange drží jen startup_candle_count svíček historie - delší warm-up až po restartu
+            logging.warning(f"Strategy params need {startup} startup candles, bot runs with "
+                            f"{self.config.get('startup_candle_count', 0)} - restart the bot")
+        if self.metrics is not None:
+            self.metrics.set_labels(self.metrics_labels())
+        logging.info(f"Strategy params loaded from {path} ({self.params_hash()}): "
+                     f"{', '.join(changes) if changes else 'no changes'}")
+        return True
+
+    def startup_param_values(self) -> dict:
+        """
+        Hodnoty warmup_parameters v okamžiku __init__ (freqtrade je načte až v ft_bot_start):
+        default <- nativní <strategie>.json <- runtime soubor parametrů (live/dry-run).
+        Hyperopt bere horní mez parametrů optimalizovaných ve zvolených spaces - warm-up
+        musí stačit pro každou epochu.
+        """
+        runtime = {}
+        if self.is_live_mode():
+            # Parametry strategie ještě nejsou zaregistrované (validate_strategy_params by je neznal),
+            # celý soubor zvaliduje a případnou chybu zaloguje reload_strategy_params při startu
+            try:
+                with open(self.strategy_params_path(), 'r') as f:
+                    runtime = json.load(f)['params']
+            except (OSError, ValueError, KeyError, TypeError):
+                runtime = {}
+        spaces = None
+        if self.config.get('runmode') == RunMode.HYPEROPT:
+            from freqtrade.optimize.hyperopt_tools import HyperoptTools
+            spaces = {'spaces': self.config.get('spaces') or ['default']}
+
+        values = {}
+        for name in self.warmup_parameters:
+            param = getattr(self, name)
+            value = param.value
+            for params in (getattr(self, '_ft_params_from_file', None) or {}, runtime):
+                try:
+                    value = self.validate_parameter_value(name, param, params[param.space][name])
+                except (KeyError, TypeError, ValueError):
+                    pass
+            if spaces is not None and param.optimize and HyperoptTools.has_space(spaces, param.space):
+                value = param.high
+            values[name] = value
+        return values
+
+    def warmup_candles(self, values: dict, timeframe: Optional[str] = None) -> int:
+        """
+        Minimální počet svíček před první použitelnou hodnotou všech indikátorů pro dané hodnoty
+        warmup_parameters. EMA(p): TA-Lib seeduje SMA z p svíček, pak decay 2/(p+1); MACD(12,26,9):
+        lookback 33 + decay pomalé EMA; RSI/ATR(14): lookback 14 + Wilderův decay 1/14;
+        okenní indikátory: window_length. Při informative_resample ještě jedna celá svíčka
+        vyššího timeframe.
+        """
+        tolerance = self.warmup_tolerance
+        ema = [period - 1 + _decay_length(2 / (period + 1), tolerance)
+               for period in (values['buy_ema_short'], values['buy_ema_long'])]
+        components = ema + [
+            33 + _decay_length(2 / 27, tolerance),
+            14 + _decay_length(1 / 14, tolerance),
+            self.window_length(values['swing_window'], values['lookback_length']),
+        ]
+        if self.informative_resample and timeframe in self.timeframe_hierarchy:
+            components.append(int(np.ceil(timeframe_to_seconds(self.timeframe_hierarchy[timeframe])
+                                          / timeframe_to_seconds(timeframe))))
+        return int(max(components))
+
+    def validate_strategy_params(self, data) -> dict:
+        """
+        Kontrola schématu souboru parametrů, vrací sekce params normalizované pro
+        apply_strategy_params. Chyba => ValueError (nic z souboru se nepoužije).
+        """
+        if not isinstance(data, dict):
+            raise ValueError("parameter file must be a JSON object")
+        if data.get('strategy_name') != self.__class__.__name__:
+            raise ValueError(f"strategy_name {data.get('strategy_name')!r} != {self.__class__.__name__!r}")
+        if data.get('ft_stratparam_v') != self.params_file_version:
+            raise ValueError(f"unsupported ft_stratparam_v {data.get('ft_stratparam_v')!r}")
+        sections = data.get('params')
+        if not isinstance(sections, dict):
+            raise ValueError("missing 'params' object")
+
+        params = {}
+        spaces = {space: dict(self.enumerate_parameters(space)) for space in ('buy', 'sell', 'protection')}
+        for section, values in sections.items():
+            if not isinstance(values, dict):
+                raise ValueError(f"params.{section} must be an object")
+            if section in spaces:
+                params[section] = {}
+                for name, value in values.items():
+                    param = spaces[section].get(name)
+                    if param is None:
+                        logging.warning(f"Strategy params: unknown {section} parameter {name} ignored")
+                        continue
+                    params[section][name] = self.validate_parameter_value(f'{section}.{name}', param, value)
+            elif section == 'roi':
+                roi = {}
+                for minutes, value in values.items():
+                    if not str(minutes).isdigit() or isinstance(value, bool) or not isinstance(value, (int, float)):
+                        raise ValueError(f"roi.{minutes}: expected '<minutes>': <number>")
+                    roi[int(minutes)] = value
+                if 0 not in roi:
+                    raise ValueError("roi must contain key '0'")
+                params[section] = dict(sorted(roi.items()))
+            elif section in self.params_special_schema:
+                schema = self.params_special_schema[section]
+                for name, value in values.items():
+                    if name not in schema:
+                        raise ValueError(f"unknown key {section}.{name}")
+                    if (isinstance(value, bool) and schema[name] is not bool) or not isinstance(value, schema[name]):
+                        raise ValueError(f"{section}.{name}: invalid value {value!r}")
+                if section == 'stoploss' and not -1 <= values.get('stoploss', -1) < 0:
+                    raise ValueError(f"stoploss.stoploss must be in [-1, 0), got {values['stoploss']}")
+                if section == 'max_open_trades' and values.get('max_open_trades', -1) < -1:
+                    raise ValueError("max_open_trades.max_open_trades must be >= -1")
+                params[section] = dict(values)
+            else:
+                raise ValueError(f"unknown params section {section!r}")
+        return params
+
+    @staticmethod
+    def validate_parameter_value(name: str, param, value):
+        # Typ a rozsah podle definice parametru (IntParameter/DecimalParameter: low..high)
+        if isinstance(param, CategoricalParameter):
+            if value not in param.opt_range:
+                raise ValueError(f"{name}: {value!r} not in {list(param.opt_range)}")
+            return value
+        if isinstance(param, IntParameter):
+            if isinstance(value, bool) or not isinstance(value, int):
+                raise ValueError(f"{name}: expected int, got {value!r}")
+        elif isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{name}: expected number, got {value!r}")
+        if not param.low <= value <= param.high:
+            raise ValueError(f"{name}: {value} outside [{param.low}, {param.high}]")
+        return value
+
+    def apply_strategy_params(self, params: dict) -> List[str]:
+        """
+        Nastaví zvalidované hodnoty jako freqtrade při startu (hodnoty parametrů, ROI, SL,
+        trailing, max_open_trades) a vrátí seznam změn. Callbacky (DCA, exit, leverage) vidí nové
+        hodnoty hned, signály od příští analýzy svíčky. Změna parametru indikátorů mění
+        indicator_signature(), takže inkrementální stav se přepočítá celý.
+        """
+        changes = []
+
+        def update(target, attribute, value, label):
+            if getattr(target, attribute, None) != value:
+                changes.append(f"{label}: {getattr(target, attribute, None)} -> {value}")
+                setattr(target, attribute, value)
+
+        for space in ('buy', 'sell', 'protection'):
+            spaces = dict(self.enumerate_parameters(space))
+            for name, value in params.get(space, {}).items():
+                if spaces[name].load:
+                    update(spaces[name], 'value', value, name)
+        if 'roi' in params and params['roi'] != self.minimal_roi:
+            changes.append(f"minimal_roi: {self.minimal_roi} -> {params['roi']}")
+            self.minimal_roi = params['roi']
+            self.config['minimal_roi'] = params['roi']
+        for name, value in params.get('stoploss', {}).items():
+            update(self, name, value, name)
+            self.config[name] = value
+        for name, value in params.get('trailing', {}).items():
+            update(self, name, value, name)
+            self.config[name] = value
+        for name, value in params.get('max_open_trades', {}).items():
+            # Freqtrade drží neomezený počet tradů jako inf, v souboru je -1
+            value = float('inf') if value == -1 else value
+            update(self, name, value, name)
+            self.config[name] = value
+        return changes
+
+    def params_hash(self) -> str:
+        params = {name: param.value for name, param in self.enumerate_parameters()}
+        params.update(stoploss=self.stoploss, minimal_roi=self.minimal_roi)
+        return hashlib.md5(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+    def metrics_labels(self) -> dict:
+        return {'bot': self.config.get('bot_name', ''), 'timeframe': self.timeframe, 'params': self.params_hash()}
+
+    def install_metrics(self) -> None:
+        """
+        Obalí timed_callbacks měřením latence a spustí /metrics endpoint. Štítek params
+        (hash hodnot parametrů) odliší běhy po každém načtení nových parametrů.
+        """
+        port = int(self.config.get('strategy_metrics_port', self.metrics_port) or 0)
+        if not port:
+            return
+        labels = self.metrics_labels()
+        params_hash = labels['params']
+        self.metrics = CallbackMetrics(labels)
+        for name in self.timed_callbacks:
+            setattr(self, name, self.metrics.timed(name, getattr(self, name)))
+        self.metrics.gauges = self.metrics_gauges
+        try:
+            self.metrics.serve(port)
+            logging.info(f"Strategy metrics on :{port}/metrics (params {params_hash})")
+        except OSError as e:
+            logging.error(f"Error starting metrics endpoint on port {port}: {e}")
+
+    def metrics_gauges(self) -> List[Tuple[str, str, float]]:
+        metrics = self.analysis_metrics
+        return [
+            ('dailybuy_analysis_queue_depth', 'Pairs waiting for analysis of the last closed candle.',
+             metrics['queue_depth']),
+            ('dailybuy_analysis_peak_queue_depth', 'Peak analysis queue depth in the current candle.',
+             metrics['peak_queue_depth']),
+            ('dailybuy_analysis_lag_seconds', 'Delay of the last pair analysis after candle close.',
+             metrics['lag_last']),
+            ('dailybuy_analysis_max_lag_seconds', 'Maximum analysis delay in the current candle.',
+             metrics['lag_max']),
+            ('dailybuy_analysis_loop_seconds', 'Duration of the last analyze() loop.', metrics['loop_seconds']),
+            ('dailybuy_trade_data_cache_trades', 'Trades held in the CustomData cache.',
+             len(self.trade_data_cache)),
+        ]
+
+    def install_candle_store(self) -> None:
+        """
+        Přesměruje refresh svíček exchange na sdílený store: série, které mají ve storu
+        poslední uzavřenou svíčku, se z burzy nestahují. Ostatní (store chybí / zaostává)
+        jdou původní cestou, takže výpadek zapisovatele bota nezastaví.
+        """
+        if not self.candle_store_path or not Path(self.candle_store_path).is_dir():
+            return
+        self.candle_store = SharedCandleStore(self.candle_store_path)
+        exchange = self.dp._exchange
+        original = exchange.refresh_latest_ohlcv
+
+        def refresh_latest_ohlcv(pair_list, *, since_ms=None, cache=True, drop_incomplete=None):
+            if since_ms is not None or not cache:
+                return original(pair_list, since_ms=since_ms, cache=cache, drop_incomplete=drop_incomplete)
+            served = {}
+            remaining = []
+            for pair, timeframe, candle_type in pair_list:
+                dataframe = self.fresh_store_frame(pair, timeframe, candle_type,
+                                                   exchange.ohlcv_candle_limit(timeframe, candle_type))
+                if dataframe is None:
+                    remaining.append((pair, timeframe, candle_type))
+                    continue
+                exchange._klines[(pair, timeframe, candle_type)] = dataframe
+                served[(pair, timeframe, candle_type)] = dataframe
+            result = original(remaining, cache=cache, drop_incomplete=drop_incomplete) if remaining else {}
+            result.update(served)
+            return result
+
+        exchange.refresh_latest_ohlcv = refresh_latest_ohlcv
+        logging.info(f"Using shared candle store {self.candle_store_path}")
+
+    def fresh_store_frame(self, pair: str, timeframe: str, candle_type,
+                          count: Optional[int] = None) -> Optional[DataFrame]:
+        """Svíčky ze sdíleného storu, pokud obsahují poslední uzavřenou svíčku, jinak None."""
+        if self.candle_store is None:
+            return None
+        candle_type = str(candle_type or self.config.get('candle_type_def', 'spot'))
+        last_date = self.candle_store.last_date(pair, timeframe, candle_type)
+        last_closed = timeframe_to_prev_date(timeframe) - datetime.timedelta(seconds=timeframe_to_seconds(timeframe))
+        if last_date is None or last_date < last_closed:
+            return None
+        return self.candle_store.frame(pair, timeframe, candle_type, count)
+
+    def bot_loop_start(self, current_time: datetime, **kwargs) -> None:
+        # Freqtrade nemá callback na konec smyčky - změny z minulé iterace se zapíšou tady najednou
+        self.flush_trade_state()
+        # Hot-reload parametrů (jen stat souboru, dokud se nezmění)
+        if self.is_live_mode():
+            self.reload_strategy_params()
+            self.prune_pair_caches()
+            # Průběžný warm-start snapshot - po pádu/OOM killu podu zbyde nejvýš interval starý stav
+            if (self.snapshot_interval_seconds
+                    and time.monotonic() - self.snapshot_time >= self.snapshot_interval_seconds):
+                self.save_warm_start()
+
+    def prune_pair_caches(self) -> None:
+        # Páry vyřazené z whitelistu bez otevřeného tradu už freqtrade neanalyzuje - jejich stav jen drží paměť
+        active = set(self.dp.current_whitelist())
+        active.update(trade.pair for trade in Trade.get_open_trades())
+        for cache in (self.indicator_state, self.indicator_batch, self.volatility_state):
+            for pair in set(cache) - active:
+                del cache[pair]
+        for key in [key for key in self.informative_cache if key[0] not in active]:
+            del self.informative_cache[key]
+
+    def analyze(self, pairs: List[str]) -> None:
+        """
+        Plánovač analýzy po uzavření svíčky místo analýzy všech párů najednou.
+
+        Pořadí: páry s otevřeným tradem (čekající DCA nebo cena blízko SL před ostatními) se
+        analyzují hned, aby exit/DCA v téže smyčce viděly novou svíčku. Páry pro nové vstupy
+        dostanou termín rozložený v okně po uzavření svíčky (fáze podle bot_name posouvá boty
+        flotily proti sobě) a zpracují se v rámci rozpočtu smyčky. Do své analýzy pár nesmí
+        vstoupit na signálu předchozí svíčky - hlídá confirm_trade_entry.
+        """
+        if self.is_live_mode() and self.batch_indicators:
+            self.prepare_indicator_batch(pairs)
+        if not self.is_live_mode() or self.analysis_spread_ratio <= 0:
+            super().analyze(pairs)
+            return
+        started = time.monotonic()
+        now = datetime.datetime.now(datetime.timezone.utc)
+        candle = timeframe_to_prev_date(self.timeframe, now)
+        candle_open = self.analysis_candle_open(candle)
+        metrics = self.analysis_metrics
+        if metrics['candle'] != candle:
+            self.log_analysis_metrics()
+            metrics.update(candle=candle, peak_queue_depth=0, analyzed=0, urgent=0, lag_last=0.0, lag_max=0.0)
+
+        priorities = self.analysis_priorities(pairs)
+        urgent = sorted(priorities, key=priorities.get)
+        others = [pair for pair in pairs if pair not in priorities]
+        metrics['urgent'] = len(urgent)
+
+        # Urgentní páry vždy (bez nové svíčky je analyze_pair jen návrat nacachovaného dataframe)
+        pending = [pair for pair in urgent if self.analysis_pending(pair, candle_open)]
+        super().analyze(urgent)
+        for pair in pending:
+            self.record_analysis_lag(pair, candle_open, candle)
+
+        window = min(timeframe_to_seconds(self.timeframe) * self.analysis_spread_ratio,
+                     self.analysis_spread_max_seconds)
+        budget_start = time.monotonic()
+        for rank, pair in enumerate(others):
+            if not self.analysis_pending(pair, candle_open):
+                continue
+            due = candle + datetime.timedelta(seconds=window * (rank + self._analysis_phase) / len(others))
+            if now < due or time.monotonic() - budget_start > self.analysis_loop_budget_seconds:
+                # Termíny rostou s rankem - zbytek fronty počká na další smyčku
+                break
+            self.analyze_pair(pair)
+            self.record_analysis_lag(pair, candle_open, candle)
+
+        metrics['queue_depth'] = sum(bool(self.analysis_pending(pair, candle_open)) for pair in pairs)
+        metrics['peak_queue_depth'] = max(metrics['peak_queue_depth'], metrics['queue_depth'])
+        metrics['loop_seconds'] = time.monotonic() - started
+
+    def analysis_priorities(self, pairs: List[str]) -> dict:
+        """Pár s otevřeným tradem -> 0 (čeká DCA nebo poslední close blízko SL) / 1 (ostatní)."""
+        whitelist = set(pairs)
+        priorities = {}
+        for trade in Trade.get_open_trades():
+            if trade.pair not in whitelist:
+                continue
+            priority = 1
+            volatility = self.volatility_state.get(trade.pair)
+            if volatility is not None and len(volatility[2]):
+                close = volatility[2][-1]
+                stop = self.get_mk_sl(trade) or 0
+                if (trade.calc_profit_ratio(close) < -self.thresholds.get(trade.pair, 0.01)
+                        or close <= stop * (1 + self.analysis_stop_margin)):
+                    priority = 0
+            priorities[trade.pair] = min(priority, priorities.get(trade.pair, 1))
+        return priorities
+
+    def analysis_candle_open(self, candle: datetime) -> np.datetime64:
+        # Open date poslední uzavřené svíčky (naivní UTC jako dataframe['date'].values)
+        candle_open = pd.Timestamp(candle) - pd.Timedelta(seconds=timeframe_to_seconds(self.timeframe))
+        return candle_open.tz_convert(None).to_datetime64()
+
+    def analysis_pending(self, pair: str, candle_open: np.datetime64) -> bool:
+        # Poslední analyzovaný dataframe páru (store_volatility) ještě nemá poslední uzavřenou svíčku
+        volatility = self.volatility_state.get(pair)
+        return volatility is None or not len(volatility[0]) or volatility[0][-1] < candle_open
+
+    def record_analysis_lag(self, pair: str, candle_open: np.datetime64, candle: datetime) -> None:
+        if self.analysis_pending(pair, candle_open):
+            return  # Burza svíčku ještě nevrátila, pár zůstává ve frontě
+        lag = (datetime.datetime.now(datetime.timezone.utc) - candle).total_seconds()
+        metrics = self.analysis_metrics
+        metrics['analyzed'] += 1
+        metrics['lag_last'] = lag
+        metrics['lag_max'] = max(metrics['lag_max'], lag)
+
+    def log_analysis_metrics(self) -> None:
+        metrics = self.analysis_metrics
+        if metrics['candle'] is None or not metrics['analyzed']:
+            return
+        logging.info(f"Analysis {self.timeframe} candle {metrics['candle']}: {metrics['analyzed']} pairs "
+                     f"({metrics['urgent']} with open trades), max lag {metrics['lag_max']:.1f}s, "
+                     f"peak queue {metrics['peak_queue_depth']}, left in queue {metrics['queue_depth']}")
+
+    def load_trade_state(self) -> None:
+        """
+        Warm-load DCA stavu otevřených tradů z DB po restartu.
+        """
+        loaded = 0
+        for trade in Trade.get_open_trades():
+            state = self.get_trade_data(trade, "DCA_STATE")
+            if not state:
+                continue
+            for name, value in state.items():
+                if name in self.persisted_trade_state:
+                    getattr(self, name)[trade.pair] = value
+            loaded += 1
+        logging.info(f"Loaded DCA state for {loaded} open trades.")
+
+    def mark_trade_state_dirty(self, trade: Trade) -> None:
+        if self.is_live_mode():
+            self.dirty_trade_state[trade.id] = trade
+
+    def reset_trade_state(self, trade: Trade) -> None:
+        for name in self.persisted_trade_state:
+            getattr(self, name).pop(trade.pair, None)
+        self.mark_trade_state_dirty(trade)
+
+    def flush_trade_state(self) -> None:
+        """
+        Zapíše změněný DCA stav do CustomDataWrapper - jeden kompaktní záznam na trade
+        a nejvýš jeden zápis na trade za smyčku bez ohledu na počet změn.
+        """
+        if not self.dirty_trade_state:
+            return
+        dirty, self.dirty_trade_state = self.dirty_trade_state, {}
+        for trade in dirty.values():
+            state = {name: getattr(self, name)[trade.pair] for name in self.persisted_trade_state
+                     if trade.pair in getattr(self, name)}
+            try:
+                self.set_trade_data(trade, "DCA_STATE", state)
+            except Exception as e:
+                logging.error(f"Error saving DCA state for trade {trade.id}: {e}")
+
+    def snapshot_path(self) -> Optional[Path]:
+        """Config 'strategy_snapshot_dir' / FT_SNAPSHOT_DIR, jinak adresář sqlite DB (None bez souborové DB)."""
+        directory = self.config.get('strategy_snapshot_dir') or self.snapshot_dir
+        if not directory:
+            db_url = str(self.config.get('db_url', ''))
+            if not db_url.startswith('sqlite:///') or db_url.endswith(':memory:'):
+                return None
+            directory = Path(db_url[len('sqlite:///'):]).parent
+        return Path(directory) / self.snapshot_file_name
+
+    def save_warm_start(self, blocking: bool = False) -> None:
+        """
+        Snapshot svíček exchange (_klines) a indicator_state párů whitelistu. V hlavním vlákně
+        se jen posbírají reference na pole (rekurze jako kopie - step_indicators je mění na místě),
+        zápis běží ve vlákně, aby smyčka bota nečekala na disk. Soubor se přepisuje atomicky.
+        """
+        path = self.snapshot_path()
+        if path is None:
+            return
+        if self.snapshot_thread is not None and self.snapshot_thread.is_alive():
+            if not blocking:
+                return  # Předchozí zápis ještě běží
+            self.snapshot_thread.join()
+        self.snapshot_time = time.monotonic()
+        whitelist = set(self.dp.current_whitelist())
+        meta = {'version': self.snapshot_version, 'strategy': self.__class__.__name__,
+                'timeframe': self.timeframe, 'signature': list(self.indicator_signature()),
+                'compact': self.compact_dataframe, 'klines': [], 'states': []}
+        arrays = {}
+        for (pair, timeframe, candle_type), dataframe in list(self.dp._exchange._klines.items()):
+            if pair not in whitelist or dataframe.empty:
+                continue
+            index = len(meta['klines'])
+            meta['klines'].append([pair, timeframe, str(candle_type)])
+            for column in self.snapshot_ohlcv_columns:
+                arrays[f'k{index}_{column}'] = dataframe[column].values
+        for pair, state in list(self.indicator_state.items()):
+            if pair not in whitelist:
+                continue
+            index = len(meta['states'])
+            meta['states'].append([pair, list(state['recursive']), list(state['columns'])])
+            arrays[f's{index}_recursive'] = np.array(list(state['recursive'].values()), dtype=np.float64)
+            for column in ('date', 'open', 'high', 'low', 'close'):
+                arrays[f's{index}_{column}'] = state[column]
+            for number, values in enumerate(state['columns'].values()):
+                arrays[f's{index}_c{number}'] = values
+        if not meta['klines']:
+            return  # Bot ještě nic nestáhl - nepřepisovat dobrý snapshot prázdným
+        arrays['meta'] = np.array(json.dumps(meta))
+        if blocking:
+            self.write_warm_start(path, arrays)
+            return
+        self.snapshot_thread = threading.Thread(target=self.write_warm_start, args=(path, arrays),
+                                                name='strategy-snapshot', daemon=True)
+        self.snapshot_thread.start()
+
+    @staticmethod
+    def write_warm_start(path: Path, arrays: dict) -> None:
+        started = time.monotonic()
+        tmp_path = path.with_name(path.name + '.tmp')
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.error(f"Error writing warm-start snapshot {path}: {e}")
+            return
+        logging.info(f"Warm-start snapshot {path} written in {time.monotonic() - started:.2f}s "
+                     f"({path.stat().st_size / 2 ** 20:.1f} MB)")
+
+    def load_warm_start(self) -> None:
+        """
+        Obnoví cache svíček exchange a indicator_state ze snapshotu. Čas poslední svíčky jde do
+        _pairs_last_refresh_time: freqtrade pak u páru stáhne jen chybějící konec jedním voláním
+        (restart v téže svíčce žádným) a populate_indicators naváže inkrementálně. Příliš starý
+        snapshot nevadí - freqtrade cache zahodí ("Time jump detected") a přes
+        incremental_max_new_candles se indikátory přepočítají celé.
+        """
+        path = self.snapshot_path()
+        if path is None or not self.snapshot_interval_seconds or not path.is_file():
+            return
+        started = time.monotonic()
+        klines = {}
+        states = {}
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data['meta']))
+                if (meta.get('version') != self.snapshot_version or meta.get('strategy') != self.__class__.__name__
+                        or meta.get('timeframe') != self.timeframe):
+                    logging.info(f"Ignoring warm-start snapshot {path} (other version, strategy or timeframe)")
+                    return
+                for index, (pair, timeframe, candle_type) in enumerate(meta['klines']):
+                    columns = {column: data[f'k{index}_{column}'] for column in self.snapshot_ohlcv_columns}
+                    columns['date'] = pd.to_datetime(columns['date'], utc=True)
+                    klines[(pair, timeframe, CandleType(candle_type))] = DataFrame(columns)
+                # Jiné parametry / režim dataframe => svíčky platí, indikátory se přepočítají
+                if tuple(meta['signature']) == self.indicator_signature() and meta['compact'] == self.compact_dataframe:
+                    for index, (pair, recursive, columns) in enumerate(meta['states']):
+                        state = {'signature': self.indicator_signature(),
+                                 'recursive': dict(zip(recursive, data[f's{index}_recursive'].tolist())),
+                                 'columns': {name: data[f's{index}_c{number}'] for number, name in enumerate(columns)}}
+                        for column in ('date', 'open', 'high', 'low', 'close'):
+                            state[column] = data[f's{index}_{column}']
+                        states[pair] = state
+        except Exception as e:
+            logging.error(f"Error loading warm-start snapshot {path}: {e}")
+            return
+        exchange = self.dp._exchange
+        for key, dataframe in klines.items():
+            exchange._klines[key] = dataframe
+            exchange._pairs_last_refresh_time[key] = dataframe['date'].iloc[-1].value // 10 ** 6
+        self.indicator_state.update(states)
+        logging.info(f"Warm start from {path}: {len(klines)} candle series, {len(states)} indicator states "
+                     f"in {time.monotonic() - started:.2f}s")
+
     def generate_dca_orders(self, total_amount: float, num_currencies: int, num_dca_positions: int,
                             increment: float = 1.25, minimal_stake: float = 0) -> List[float]:
         try:
@@ -126,20 +1168,11 @@ class DailyBuyStrategy3_5_JPA(IStrategy):
         - Vysoká (ATR 2.5%) → 1x * 0.5 = 0.5x
         """
         try:
-            # Načti poslední ATR % ze self (uloženo v populate_indicators)
-            atr_percent = getattr(self, 'current_atr_percent', 1.0)
-
-            # Logika pro přiřazení base leveragu dle volatility (1-5x)
-            if atr_percent < 0.5:
-                base_leverage = 5.0  # Velmi nízká volatilita
-            elif atr_percent < 1.0:
-                base_leverage = 4.0  # Nízká volatilita
-            elif atr_percent < 1.5:
-                base_leverage = 3.0  # Normální volatilita
-            elif atr_percent < 2.0:
-                base_leverage = 2.0  # Vyšší volatilita
-            else:
-                base_leverage = 1.0  # Vysoká volatilita
+            # ATR % daného páru k poslední uzavřené svíčce (uloženo v populate_indicators)
+            atr_percent = self.atr_percent_at(pair, current_time)
+
+            # Base leverage dle volatility (1-5x) z tabulky atr_leverage_bands
+            base_leverage = self.base_leverage_for_atr(atr_percent)
 
             # Aplikuj hyperopt koeficient (0.1-0.9)
             final_leverage = base_leverage * self.lev_koef.value
@@ -153,26 +1186,6 @@ class DailyBuyStrategy3_5_JPA(IStrategy):
             logging.error(f"Error in leverage: {e}")
             return 1.5  # Fallback: konzervativní mid leverage
 
-    def calculate_swing(self, dataframe):
-        swing_low = pd.Series(
-            dataframe['low'].rolling(window=self.swing_window.value, min_periods=self.swing_min_periods.value).min(),
-            index=dataframe.index
-        )
-        swing_high = pd.Series(
-            dataframe['high'].rolling(window=self.swing_window.value, min_periods=self.swing_min_periods.value).max(),
-            index=dataframe.index
-        )
-        return swing_low, swing_high
-
-    def calculate_pivots(self, dataframe: DataFrame) -> Tuple[Series, Series, Series]:
-        # Calculate the pivot point (PP)
-        dataframe['pp'] = (dataframe['high'].shift(1) + dataframe['low'].shift(1) + dataframe['close'].shift(1)) / 3
-        # Calculate the first resistance (R1)
-        dataframe['r1'] = 2 * dataframe['pp'] - dataframe['low'].shift(1)
-        # Calculate the first support (S1)
-        dataframe['s1'] = 2 * dataframe['pp'] - dataframe['high'].shift(1)
-        return dataframe['pp'], dataframe['r1'], dataframe['s1']
-
     def custom_stake_amount(self, **kwargs) -> float:
         """
         Dynamická velikost sázky s optimálním money managementem a hyperoptovatelným koeficientem.
@@ -214,86 +1227,493 @@ class DailyBuyStrategy3_5_JPA(IStrategy):
             return self.config.get("min_stake_amount", 30)
 
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
-        dataframe['rsi'] = ta.RSI(dataframe, timeperiod=14)
-        macd = ta.MACD(dataframe)
-        dataframe['macd'] = macd['macd']
-        dataframe['macdsignal'] = macd['macdsignal']
-        dataframe['ema_short'] = ta.EMA(dataframe, timeperiod=self.buy_ema_short.value)
-        dataframe['ema_long'] = ta.EMA(dataframe, timeperiod=self.buy_ema_long.value)
-        dataframe['previous_close'] = dataframe['close'].shift(1)
-        dataframe['max_since_buy'] = dataframe['high'].cummax()
-        dataframe['atr'] = ta.ATR(dataframe, timeperiod=14)
-
-        # Calculate Pivot Points and Resistance/Support Levels
-        pp, r1, s1 = self.calculate_pivots(dataframe)
-        dataframe['pivot_point'] = pp
-        dataframe['resistance_1'] = r1
-        dataframe['support_1'] = s1
-
-        swing_low, swing_high = self.calculate_swing(dataframe)
-        dataframe['swing_low'] = swing_low
-        dataframe['swing_high'] = swing_high
+        if self.incremental_indicators and self.is_live_mode():
+            dataframe = self.populate_indicators_incremental(dataframe, metadata['pair'])
+        else:
+            self.drop_informative_cache(metadata['pair'])
+            dataframe = self.attach_indicators(dataframe, self.pair_indicator_columns(metadata['pair'], dataframe))
+            dataframe = self.compact_indicators(dataframe)
+            if self.hyperopt_precompute and self.config.get('runmode') == RunMode.HYPEROPT:
+                self.precompute_hyperopt_variants(dataframe, metadata['pair'])
+
+        self.store_volatility(metadata['pair'], dataframe)
+        return dataframe
+
+    def store_volatility(self, pair: str, dataframe: DataFrame) -> None:
+        # Jen reference na sloupce (bez kopie a bez dalšího průchodu), ATR % se počítá až v leverage()
+        self.volatility_state[pair] = (dataframe['date'].values, dataframe['atr'].values,
+                                       dataframe['close'].values)
+
+    def atr_percent_at(self, pair: str, current_time: datetime) -> float:
+        """
+        ATR % = (ATR / Close) * 100 poslední svíčky páru uzavřené před current_time.
+        Live bere poslední svíčku, backtest svíčku signálu (bez lookahead).
+        """
+        volatility = self.volatility_state.get(pair)
+        if volatility is None:
+            return 1.0  # Fallback na normální volatilitu
+        dates, atr, close = volatility
+
+        decision_time = pd.Timestamp(current_time)
+        if decision_time.tzinfo is not None:
+            decision_time = decision_time.tz_convert(None)
+        decision_time -= pd.Timedelta(seconds=timeframe_to_seconds(self.timeframe))
+        index = int(np.searchsorted(dates, decision_time.to_datetime64(), side='right')) - 1
+        if index < 0 or not close[index] > 0:
+            return 1.0
+        return (atr[index] / close[index]) * 100
+
+    def base_leverage_for_atr(self, atr_percent: float) -> float:
+        # Vyhledání pásma v tabulce atr_leverage_bands (NaN = vysoká volatilita jako dřív)
+        if np.isnan(atr_percent):
+            return self.atr_leverage_default
+        index = bisect.bisect_right(self._atr_band_limits, atr_percent)
+        return self._atr_band_leverage[index]
+
+    def advise_all_indicators(self, data: Dict[str, DataFrame]) -> Dict[str, DataFrame]:
+        """
+        Backtest/hyperopt: indikátory se počítají po batchích párů (compute_indicator_batch),
+        populate_indicators pak jen připojí předpočítané sloupce. Batch po batchi, aby
+        přechodná 2-D pole nedržela indikátory celého whitelistu najednou.
+        """
+        if not self.batch_indicators:
+            return super().advise_all_indicators(data)
+        result = {}
+        for group in self.indicator_batch_groups(data):
+            frames = {pair: data[pair] for pair in group}
+            self.indicator_batch.update(self.compute_indicator_batch(frames))
+            result.update(super().advise_all_indicators(frames))
+        return {pair: result[pair] for pair in data}
+
+    def prepare_indicator_batch(self, pairs: List[str]) -> None:
+        """
+        Live: páry, které v této smyčce čeká plný přepočet (bez inkrementálního stavu, typicky
+        start bota nebo nové páry whitelistu), spočítá jedním batchem ještě před analyze_pair.
+        Předpočítané sloupce čekají v self.indicator_batch, dokud je pár nespotřebuje.
+        """
+        now = datetime.datetime.now(datetime.timezone.utc)
+        candle_open = self.analysis_candle_open(timeframe_to_prev_date(self.timeframe, now))
+        for pair in set(self.indicator_batch) - set(pairs):
+            del self.indicator_batch[pair]
+        frames = {}
+        for pair in pairs:
+            if self.incremental_indicators and pair in self.indicator_state:
+                continue
+            if not self.analysis_pending(pair, candle_open):
+                continue
+            dataframe = self.dp.ohlcv(pair, self.timeframe, copy=False,
+                                      candle_type=self.config.get('candle_type_def', CandleType.SPOT))
+            if len(dataframe) == 0:
+                continue
+            cached = self.indicator_batch.get(pair)
+            if cached is None or cached[0] != self.indicator_batch_key(dataframe):
+                frames[pair] = dataframe
+        if len(frames) > 1:
+            self.indicator_batch.update(self.compute_indicator_batch(frames))
+
+    def indicator_batch_key(self, dataframe: DataFrame) -> tuple:
+        # Stejná délka, krajní svíčky a parametry => předpočítané sloupce patří tomuto dataframe
+        dates = dataframe['date'].values
+        close = dataframe['close'].values
+        return (len(dataframe), dates[0], dates[-1], close[0], close[-1], self.indicator_signature(),
+                self.compact_dataframe)
+
+    def indicator_batch_groups(self, frames: Dict[str, DataFrame]) -> List[List[str]]:
+        """Páry se stejnou délkou dataframe, rozdělené po nejvýše indicator_batch_max_cells buňkách."""
+        by_length = {}
+        for pair, dataframe in frames.items():
+            by_length.setdefault(len(dataframe), []).append(pair)
+        groups = []
+        for length, group in by_length.items():
+            size = max(1, self.indicator_batch_max_cells // max(length, 1))
+            groups += [group[i:i + size] for i in range(0, len(group), size)]
+        return groups
+
+    def compute_indicator_batch(self, frames: Dict[str, DataFrame]) -> Dict[str, Tuple[tuple, dict]]:
+        """
+        Plný výpočet indikátorů pro páry ve frames: OHLC stejně dlouhých párů se složí do 2-D
+        polí (páry x svíčky) a všechny sloupce se spočítají najednou (batch_indicator_columns).
+        Vrací pair -> (indicator_batch_key, {sloupec: řádek 2-D výsledku}).
+        """
+        result = {}
+        for group in self.indicator_batch_groups(frames):
+            arrays = [np.vstack([np.asarray(frames[pair][column].values, dtype=np.float64) for pair in group])
+                      for column in ('high', 'low', 'close')]
+            columns = self.batch_indicator_columns(*arrays)
+            for row, pair in enumerate(group):
+                result[pair] = (self.indicator_batch_key(frames[pair]),
+                                {name: values[row] for name, values in columns.items()})
+        return result
+
+    def batch_indicator_columns(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> dict:
+        """
+        Sloupce indikátorů pro 2-D pole (páry x svíčky), bitově stejné jako výpočet po jednom páru.
+
+        Rekurzivní indikátory (RSI, MACD, EMA, ATR) závisí na celé historii: volá se přímo
+        C funkce TA-Lib na řádek (souvislý pohled, bez pandas a abstract API). Okenní indikátory
+        (pivoty, swing, hh/ll/TTF přes _window_kernel, Bollinger přes pandas rolling po sloupcích)
+        a cummax/shift jdou vektorově přes všechny páry. Inkrementální protějšek pro nové
+        svíčky jsou step_indicators a step_window_indicators.
+        """
+        rows = close.shape[0]
+        recursive = {name: np.empty_like(close) for name in ('rsi', 'macd', 'macdsignal', 'ema_short', 'ema_long')}
+        atr = np.empty_like(close)
+        for row in range(rows):
+            recursive['rsi'][row] = talib.RSI(close[row], timeperiod=14)
+            macd, macdsignal, _ = talib.MACD(close[row], fastperiod=12, slowperiod=26, signalperiod=9)
+            recursive['macd'][row] = macd
+            recursive['macdsignal'][row] = macdsignal
+            recursive['ema_short'][row] = talib.EMA(close[row], timeperiod=self.buy_ema_short.value)
+            recursive['ema_long'][row] = talib.EMA(close[row], timeperiod=self.buy_ema_long.value)
+            atr[row] = talib.ATR(high[row], low[row], close[row], timeperiod=14)
+
+        columns = recursive
+        if not self.compact_dataframe:
+            previous_close = np.empty_like(close)
+            previous_close[:, :1] = np.nan
+            previous_close[:, 1:] = close[:, :-1]
+            columns['previous_close'] = previous_close
+        # cummax jako pandas: NaN zůstává NaN a maximum jde dál přes další hodnoty
+        max_since_buy = np.fmax.accumulate(high, axis=1)
+        max_since_buy[np.isnan(high)] = np.nan
+        columns['max_since_buy'] = max_since_buy
+        columns['atr'] = atr
+
+        # Pivot Points, Resistance/Support, swing high/low a hh/ll/TTF jedním průchodem
+        levels = dict(zip(WINDOW_KERNEL_ROWS, _window_kernel(
+            high, low, close, self.lookback_length.value, self.swing_window.value, self.swing_min_periods.value)))
+        ttf = levels.pop('ttf')
+        if self.compact_dataframe:
+            # Mezivýsledky TTF kompaktní režim nedrží
+            del levels['buyPower'], levels['sellPower']
+        columns.update(levels)
+        columns['ttf'] = ttf
+        if not self.compact_dataframe:
+            # Původní názvy (plot konfigurace), kompaktní režim drží jen pp/r1/s1
+            columns['pivot_point'] = levels['pp']
+            columns['resistance_1'] = levels['r1']
+            columns['support_1'] = levels['s1']
 
         # Add a resistance signal (for example, price approaching or crossing R1)
-        dataframe['res_signal_breaked'] = ((dataframe['close'] > dataframe['resistance_1']) & (
-                dataframe['close'] > dataframe['previous_close']))
-
-        bollinger = qtpylib.bollinger_bands(qtpylib.typical_price(dataframe), window=20, stds=2)
-        dataframe['bb_lowerband'] = bollinger['lower']
-        dataframe['bb_middleband'] = bollinger['mid']
-        dataframe['bb_upperband'] = bollinger['upper']
-        # CustomDataWrapper.set_custom_data(trade_id=40, key='test', value='ahoj')
-        # t = CustomDataWrapper.get_custom_data(trade_id=40, key='test')[0].value
-
-        # Calculate highest and lowest
-        dataframe['hh'] = dataframe['close'].rolling(window=self.lookback_length.value).max()
-        dataframe['ll'] = dataframe['close'].rolling(window=self.lookback_length.value).min()
-
-        # Calculate buy and sell power
-        dataframe['buyPower'] = dataframe['hh'] - dataframe['ll'].shift(self.lookback_length.value)
-        dataframe['sellPower'] = dataframe['hh'].shift(self.lookback_length.value) - dataframe['ll']
-
-        # Calculate TTF
-        dataframe['ttf'] = 200 * (dataframe['buyPower'] - dataframe['sellPower']) / (
-                dataframe['buyPower'] + dataframe['sellPower'])
-
-        # Calculate ATR percentage for dynamic leverage (5m timeframe)
-        # ATR % = (ATR / Close) * 100
-        close_price = dataframe['close'].iloc[-1]
-        atr_value = dataframe['atr'].iloc[-1]
-
-        if close_price > 0:
-            self.current_atr_percent = (atr_value / close_price) * 100
-        else:
-            self.current_atr_percent = 1.0  # Fallback na normální volatilitu
+        breaked = close > levels['r1']
+        breaked[:, 0] = False
+        breaked[:, 1:] &= close[:, 1:] > close[:, :-1]
+        columns['res_signal_breaked'] = breaked
+
+        # qtpylib.bollinger_bands(typical_price, window=20, stds=2): rolling po sloupcích = po párech
+        typical = DataFrame(((high + low + close) / 3.0).T)
+        mid = typical.rolling(window=20, min_periods=1).mean().values.T
+        std = typical.rolling(window=20, min_periods=1).std().values.T
+        columns['bb_lowerband'] = mid - std * 2
+        columns['bb_middleband'] = mid
+        columns['bb_upperband'] = mid + std * 2
+        return columns
+
+    def pair_indicator_columns(self, pair: str, dataframe: DataFrame) -> dict:
+        """Předpočítané sloupce z batche, pokud patří tomuto dataframe, jinak výpočet jen pro pár."""
+        key, columns = self.indicator_batch.pop(pair, (None, None))
+        if columns is None or key != self.indicator_batch_key(dataframe):
+            columns = self.compute_indicator_batch({pair: dataframe})[pair][1]
+        return columns
+
+    @staticmethod
+    def attach_indicators(dataframe: DataFrame, columns: dict) -> DataFrame:
+        # Jeden concat místo desítek vkládání sloupců (každé přestaví index sloupců)
+        existing = [name for name in columns if name in dataframe.columns]
+        if existing:
+            dataframe = dataframe.drop(columns=existing)
+        return pd.concat([dataframe, DataFrame(columns, index=dataframe.index)], axis=1)
+
+    def compact_indicators(self, dataframe: DataFrame) -> DataFrame:
+        """
+        Kompaktní režim: float64 indikátory -> float32. OHLCV zůstává float64 (ceny pro obchody,
+        zero-copy pohledy candle store), bool sloupce jsou bool už z porovnání.
+        Indikátory se počítají ve float64 a zaokrouhlí se až při uložení - rekurze inkrementálního
+        výpočtu (indicator_state) jedou dál v plné přesnosti.
+        """
+        if not self.compact_dataframe:
+            return dataframe
+        keep = ('open', 'high', 'low', 'close', 'volume') + tuple(self.compact_float64_columns)
+        columns = {name: np.float32 for name, dtype in dataframe.dtypes.items()
+                   if dtype == np.float64 and name not in keep}
+        return dataframe.astype(columns) if columns else dataframe
+
+    def calculate_ttf(self, dataframe: DataFrame, lookback: int) -> np.ndarray:
+        # Řádky hh, ll, buyPower, sellPower, ttf (hyperopt varianty pro libovolný lookback)
+        close = np.asarray(dataframe['close'].values, dtype=np.float64)
+        return _ttf_kernel(close, lookback, np.empty((5, len(close))))
+
+    def hyperopt_variant_params(self) -> dict:
+        # Sloupec -> parametr, na jehož hodnotě závisí (varianty pokrývají celý rozsah low..high)
+        return {'ema_short': self.buy_ema_short, 'ema_long': self.buy_ema_long,
+                'hh': self.lookback_length, 'll': self.lookback_length, 'ttf': self.lookback_length}
+
+    def compute_hyperopt_variant(self, dataframe: DataFrame, name: str, value: int) -> np.ndarray:
+        if name in ('ema_short', 'ema_long'):
+            return ta.EMA(dataframe, timeperiod=value).values
+        hh, ll, _, _, ttf = self.calculate_ttf(dataframe, value)
+        return {'hh': hh, 'll': ll, 'ttf': ttf}[name]
+
+    def hyperopt_variant_path(self, dataframe: DataFrame, pair: str) -> Path:
+        """
+        Prefix souborů s variantami. Klíč je obsahový (OHLC + rozsahy parametrů), takže
+        main proces i všechny workery najdou stejné soubory a změna dat vede na nové.
+        Hash dat se počítá jednou per dataframe páru (precompute v main procesu), memo
+        odejde do workerů s picklovanou strategií a epocha už jen vybírá sloupce.
+        """
+        dates = dataframe['date'].values
+        key = (pair, len(dataframe), dates[0], dates[-1]) if len(dataframe) else (pair, 0)
+        prefix = self.hyperopt_variant_paths.get(key)
+        if prefix is not None:
+            return prefix
+        digest = hashlib.sha1()
+        for column in ('date', 'high', 'low', 'close'):
+            digest.update(np.ascontiguousarray(dataframe[column].values).tobytes())
+        for name, param in self.hyperopt_variant_params().items():
+            digest.update(f'{name}:{param.low}:{param.high}'.encode())
+        slug = pair.replace('/', '_').replace(':', '_')
+        cache_dir = Path(self.config.get('user_data_dir', 'user_data')) / 'hyperopt_cache' / 'indicators'
+        prefix = cache_dir / f'{slug}-{self.timeframe}-{digest.hexdigest()[:16]}'
+        self.hyperopt_variant_paths[key] = prefix
+        return prefix
+
+    def precompute_hyperopt_variants(self, dataframe: DataFrame, pair: str) -> None:
+        """
+        Spočítá všechny varianty sloupců z hyperopt_variant_params() a uloží je jako 2-D pole
+        (n_variant, n_rows) do .npy. Každá varianta je souvislý řádek, výběr v epoše je jen slice.
+        Existující soubory (opakovaný běh nad stejnými daty) se znovu nepočítají.
+        """
+        prefix = self.hyperopt_variant_path(dataframe, pair)
+        prefix.parent.mkdir(parents=True, exist_ok=True)
+        computed = {}
+        for name, param in self.hyperopt_variant_params().items():
+            target = Path(f'{prefix}-{name}.npy')
+            if target.exists():
+                continue
+            tmp = Path(f'{target}.{os.getpid()}.tmp')
+            values = np.lib.format.open_memmap(tmp, mode='w+', dtype=np.float64,
+                                               shape=(param.high - param.low + 1, len(dataframe)))
+            for row, value in enumerate(range(param.low, param.high + 1)):
+                values[row] = self.compute_hyperopt_variant(dataframe, name, value)
+            values.flush()
+            del values
+            os.replace(tmp, target)
+            computed[name] = param.high - param.low + 1
+        if computed:
+            logging.info(f"Precomputed hyperopt indicator variants for {pair}: {computed}")
+
+    def select_hyperopt_variants(self, dataframe: DataFrame, pair: str) -> DataFrame:
+        """
+        Nastaví sloupce závislé na optimalizovaných parametrech podle hodnot aktuální epochy.
+        Bez předpočítaných souborů (nebo při nesouhlasu délky) se sloupec spočítá přímo.
+        """
+        prefix = self.hyperopt_variant_path(dataframe, pair)
+        for name, param in self.hyperopt_variant_params().items():
+            target = f'{prefix}-{name}.npy'
+            variants = self.hyperopt_variants.get(target)
+            if variants is None and os.path.exists(target):
+                variants = np.load(target, mmap_mode='r')
+                self.hyperopt_variants[target] = variants
+            if variants is not None and variants.shape[1] == len(dataframe):
+                dataframe[name] = variants[param.value - param.low]
+            else:
+                dataframe[name] = self.compute_hyperopt_variant(dataframe, name, param.value)
+        return dataframe
+
+    def indicator_window(self) -> int:
+        """
+        Nejdelší okno (včetně posunů), které potřebují okenní indikátory (batch_indicator_columns).
+        """
+        return self.window_length(self.swing_window.value, self.lookback_length.value)
+
+    @staticmethod
+    def window_length(swing_window: int, lookback: int) -> int:
+        # swing_window, Bollinger 20 a hh/ll posunuté o lookback, které TTF posouvá ještě jednou
+        return max(swing_window, 20, 2 * lookback) + 1
 
+    def indicator_signature(self) -> tuple:
+        # Změna kteréhokoli parametru znamená plný přepočet
+        return (self.buy_ema_short.value, self.buy_ema_long.value, self.lookback_length.value,
+                self.swing_window.value, self.swing_min_periods.value)
+
+    def populate_indicators_incremental(self, dataframe: DataFrame, pair: str) -> DataFrame:
+        """
+        Spočítá indikátory jen pro nově uzavřené svíčky a zbytek převezme z předchozího běhu.
+
+        Plný přepočet nastane, pokud:
+        - pro pár ještě není uložený stav nebo se změnily parametry,
+        - se přepsala historie (nesedí datum nebo OHLC v překryvu s posledním během),
+        - přibylo víc než incremental_max_new_candles svíček.
+        Plný přepočet zahodí i as-of merge vyššího timeframe (informative_cache) páru.
+
+        EMA/RSI/ATR/MACD pokračují z uložené rekurze a při posunu okna se znovu neinicializují.
+        """
+        state = self.indicator_state.get(pair)
+        overlap = self.incremental_overlap(state, dataframe)
+
+        if overlap is None:
+            self.drop_informative_cache(pair)
+            dataframe = self.attach_indicators(dataframe, self.pair_indicator_columns(pair, dataframe))
+            # Rekurze se seedují z float64 hodnot, uložené sloupce pak ukazují na kompaktní dataframe
+            self.seed_indicator_state(pair, dataframe)
+            dataframe = self.compact_indicators(dataframe)
+            if pair in self.indicator_state:
+                self.store_indicator_state(pair, self.indicator_state[pair], dataframe)
+            return dataframe
+
+        offset, new_count = overlap
+        columns = {name: values[offset:] for name, values in state['columns'].items()}
+
+        if new_count > 0:
+            new_values = self.step_indicators(state, dataframe, new_count)
+            columns = {name: np.concatenate([values, new_values[name]]) if name in new_values else values
+                       for name, values in columns.items()}
+        # cummax se váže na začátek okna, při posunu okna ho přepočítáme (je to jeden průchod bez rekurze)
+        columns['max_since_buy'] = np.maximum.accumulate(dataframe['high'].values)
+
+        dataframe = pd.concat([dataframe, DataFrame(columns, index=dataframe.index)], axis=1)
+        dataframe = self.compact_indicators(dataframe)
+        self.store_indicator_state(pair, state, dataframe)
         return dataframe
 
-    def populate_entry_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
-        conditions = []
+    def incremental_overlap(self, state: Optional[dict], dataframe: DataFrame) -> Optional[Tuple[int, int]]:
+        """
+        Vrátí (offset do uloženého stavu, počet nových svíček), nebo None pokud je nutný plný přepočet.
+        """
+        if state is None or state['signature'] != self.indicator_signature():
+            return None
 
-        # Získání dat vyššího časového rámce pro analýzu na více časových rámcích
-        level = self.timeframe_hierarchy[self.timeframe]
-        informative = self.dp.get_pair_dataframe(pair=metadata['pair'], timeframe=level)
+        overlap = _date_overlap(state['date'], dataframe['date'].values)
+        if overlap is None:
+            return None
 
-        if not informative.empty:
-            # Ujistěte se, že 'informative' je zarovnán s hlavním dataframe
-            informative = informative.reindex(dataframe.index, method='nearest')
-            # Nyní bezpečně porovnávejte uzavírací ceny, protože jsou zarovnané
-            conditions.append(dataframe['close'] < informative['close'].shift(1))
-        else:
-            logging.info(f"No data available for {metadata['pair']} in '{level}' timeframe. Skipping this condition.")
+        offset, overlap_len = overlap
+        new_count = len(dataframe) - overlap_len
+        if new_count > self.incremental_max_new_candles or overlap_len < self.indicator_window():
+            return None
 
-        conditions.append(
-            (
-                    (dataframe['volume'] > 0)
-                    # &
-                    # (dataframe['close'] < dataframe['open']) # &
-                    # (dataframe['macd'] > dataframe['macdsignal']) & (dataframe['ema_short'] > dataframe['ema_long'])
-            )
-        )
+        for column in ('open', 'high', 'low', 'close'):
+            if not np.array_equal(dataframe[column].values[:overlap_len], state[column][offset:]):
+                return None
+
+        return offset, new_count
 
-        final_condition = np.logical_and.reduce(conditions)
+    def step_indicators(self, state: dict, dataframe: DataFrame, new_count: int) -> dict:
+        """
+        Posune rekurzivní indikátory o new_count svíček a okenní indikátory přepočítá
+        jen nad koncem dataframe.
+        """
+        close = dataframe['close'].values[-new_count - 1:]
+        high = dataframe['high'].values[-new_count:]
+        low = dataframe['low'].values[-new_count:]
+        rec = state['recursive']
+        out = {name: np.empty(new_count) for name in
+               ('rsi', 'macd', 'macdsignal', 'ema_short', 'ema_long', 'previous_close', 'atr')}
+
+        for i in range(new_count):
+            prev_close, price = close[i], close[i + 1]
+            delta = price - prev_close
+            rec['rsi_gain'] = _wilder_step(rec['rsi_gain'], delta if delta > 0 else 0.0, 14)
+            rec['rsi_loss'] = _wilder_step(rec['rsi_loss'], -delta if delta < 0 else 0.0, 14)
+            total = rec['rsi_gain'] + rec['rsi_loss']
+            out['rsi'][i] = 100 * (rec['rsi_gain'] / total) if total != 0 else 0.0
+
+            rec['macd_fast'] = _ema_step(rec['macd_fast'], price, 12)
+            rec['macd_slow'] = _ema_step(rec['macd_slow'], price, 26)
+            macd_value = rec['macd_fast'] - rec['macd_slow']
+            rec['macdsignal'] = _ema_step(rec['macdsignal'], macd_value, 9)
+            out['macd'][i] = macd_value
+            out['macdsignal'][i] = rec['macdsignal']
+
+            rec['ema_short'] = _ema_step(rec['ema_short'], price, self.buy_ema_short.value)
+            rec['ema_long'] = _ema_step(rec['ema_long'], price, self.buy_ema_long.value)
+            out['ema_short'][i] = rec['ema_short']
+            out['ema_long'][i] = rec['ema_long']
+
+            true_range = max(high[i] - low[i], abs(high[i] - prev_close), abs(low[i] - prev_close))
+            rec['atr'] = _wilder_step(rec['atr'], true_range, 14)
+            out['atr'][i] = rec['atr']
+            out['previous_close'][i] = prev_close
+
+        out.update(self.step_window_indicators(dataframe, new_count))
+        return out
+
+    def step_window_indicators(self, dataframe: DataFrame, new_count: int) -> dict:
+        """
+        Okenní indikátory pro posledních new_count svíček přímo nad numpy poli.
+        Pivoty, swing a TTF počítá _window_kernel nad koncem dataframe (indicator_window svíček
+        před novými stačí na plná okna), Bollinger odpovídá qtpylib.
+        """
+        high = dataframe['high'].values
+        low = dataframe['low'].values
+        close = dataframe['close'].values
+        n = len(close)
+        start = max(n - new_count - self.indicator_window(), 0)
+        levels = _window_kernel(high[start:], low[start:], close[start:], self.lookback_length.value,
+                                self.swing_window.value, self.swing_min_periods.value)[:, -new_count:]
+        out = dict(zip(WINDOW_KERNEL_ROWS, levels))
+        out['res_signal_breaked'] = (close[-new_count:] > out['r1']) & (close[-new_count:] > close[-new_count - 1:-1])
+
+        typical = (high + low + close) / 3.0
+        for name in ('bb_lowerband', 'bb_middleband', 'bb_upperband'):
+            out[name] = np.empty(new_count)
+        for i in range(new_count):
+            t = n - new_count + i
+            window = typical[t - 19:t + 1]
+            mid = window.mean()
+            std = window.std(ddof=1)
+            out['bb_middleband'][i] = mid
+            out['bb_upperband'][i] = mid + std * 2
+            out['bb_lowerband'][i] = mid - std * 2
+
+        if not self.compact_dataframe:
+            out['pivot_point'] = out['pp']
+            out['resistance_1'] = out['r1']
+            out['support_1'] = out['s1']
+        return out
+
+    def seed_indicator_state(self, pair: str, dataframe: DataFrame) -> None:
+        """
+        Uloží stav po plném přepočtu. Dokud nejsou všechny rekurze zahřáté (NaN),
+        stav se neukládá a příští svíčka se počítá znovu celá.
+        """
+        close = dataframe['close'].values
+        rsi_gain, rsi_loss = _rsi_state(close, 14)
+        macd_fast, macd_slow = _macd_state(close)
+        last = dataframe.iloc[-1]
+        recursive = {
+            'rsi_gain': rsi_gain,
+            'rsi_loss': rsi_loss,
+            'macd_fast': macd_fast,
+            'macd_slow': macd_slow,
+            'macdsignal': last['macdsignal'],
+            'ema_short': last['ema_short'],
+            'ema_long': last['ema_long'],
+            'atr': last['atr'],
+        }
+        if any(pd.isna(value) for value in recursive.values()):
+            self.indicator_state.pop(pair, None)
+            return
+
+        indicator_columns = [name for name in dataframe.columns
+                             if name not in ('date', 'open', 'high', 'low', 'close', 'volume')]
+        state = {'signature': self.indicator_signature(), 'recursive': recursive,
+                 'columns': {name: None for name in indicator_columns}}
+        self.store_indicator_state(pair, state, dataframe)
+
+    def store_indicator_state(self, pair: str, state: dict, dataframe: DataFrame) -> None:
+        state['date'] = dataframe['date'].values
+        for column in ('open', 'high', 'low', 'close'):
+            state[column] = dataframe[column].values
+        state['columns'] = {name: dataframe[name].values for name in state['columns']}
+        self.indicator_state[pair] = state
+
+    def populate_entry_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        # Hyperopt: EMA/TTF pro parametry této epochy (používá je i populate_exit_trend)
+        if self.hyperopt_precompute and self.config.get('runmode') == RunMode.HYPEROPT:
+            dataframe = self.select_hyperopt_variants(dataframe, metadata['pair'])
+
+        final_condition = self.entry_condition(dataframe, metadata['pair'])
         dataframe.loc[final_condition, ['enter_long', 'enter_tag']] = (1, 'ALL_BUY')
         return dataframe
 
@@ -314,23 +1734,112 @@ class DailyBuyStrategy3_5_JPA(IStrategy):
 
         return dataframe
 
-    def populate_exit_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
-        # Příprava podmínek
-        conditions = [
+    def entry_condition(self, dataframe: DataFrame, pair: str) -> np.ndarray:
+        conditions = []
+
+        # Získání dat vyššího časového rámce pro analýzu na více časových rámcích
+        level = self.timeframe_hierarchy[self.timeframe]
+        informative = self.get_informative_dataframe(pair, level, dataframe)
+
+        if not informative.empty:
+            # Close poslední uzavřené svíčky vyššího timeframe, zarovnaná podle času (bez lookahead)
+            informative_close = self.merge_informative_close(pair, level, dataframe, informative)
+            conditions.append(dataframe['close'].values < informative_close)
+        else:
+            logging.info(f"No data available for {pair} in '{level}' timeframe. Skipping this condition.")
+
+        conditions.append(
             (
-                    (dataframe['close'] > dataframe['swing_high']) |
-                    (
-                            (dataframe['macd'] < dataframe['macdsignal']) &
-                            (dataframe['ema_short'] < dataframe['ema_long'])
-                    ) |
-                    (dataframe['ttf'] < self.lower_trigger_level.value)
-            ),
-            (dataframe['volume'] > 0)
-        ]
-        exit_condition = np.logical_and.reduce([cond.values for cond in conditions if isinstance(cond, pd.Series)])
+                    (dataframe['volume'].values > 0)
+                    # &
+                    # (dataframe['close'] < dataframe['open']) # &
+                    # (dataframe['macd'] > dataframe['macdsignal']) & (dataframe['ema_short'] > dataframe['ema_long'])
+            )
+        )
+
+        return np.logical_and.reduce(conditions)
+
+    def populate_exit_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        exit_condition = self.exit_condition(
+            dataframe['close'].values, dataframe['swing_high'].values,
+            dataframe['macd'].values, dataframe['macdsignal'].values,
+            dataframe['ema_short'].values < dataframe['ema_long'].values,
+            dataframe['ttf'].values < self.lower_trigger_level.value,
+            dataframe['volume'].values)
         dataframe.loc[exit_condition, ['exit_long', 'exit_tag']] = (1, 'macd_ema_exit')
         return dataframe
 
+    @staticmethod
+    def exit_condition(close: np.ndarray, swing_high: np.ndarray, macd: np.ndarray, macdsignal: np.ndarray,
+                       ema_bearish: np.ndarray, ttf_triggered: np.ndarray, volume: np.ndarray) -> np.ndarray:
+        """
+        Podmínka exitu nad numpy poli. ema_bearish (ema_short < ema_long) a ttf_triggered
+        (ttf < lower_trigger_level) můžou mít navíc první osu sad parametrů - broadcasting.
+        """
+        return (
+                (
+                        (close > swing_high) |
+                        ((macd < macdsignal) & ema_bearish) |
+                        ttf_triggered
+                ) &
+                (volume > 0)
+        )
+
+    def batch_signals(self, dataframe: DataFrame, metadata: dict,
+                      param_sets: List[dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Entry/exit signály pro víc sad parametrů najednou nad jedním párem (bez backtestu).
+
+        :param dataframe: výstup populate_indicators
+        :param param_sets: seznam dictů {název parametru: hodnota}, chybějící parametr má aktuální hodnotu
+        :return: (entry, exit) bool matice tvaru (n_params, n_candles)
+
+        Každá unikátní varianta EMA/TTF se spočítá jen jednou, prahy (lower_trigger_level)
+        se porovnávají broadcastingem po skupinách se stejným lookback_length.
+        Aktivní entry logika na parametrech nezávisí, entry je proto jen read-only broadcast
+        jednoho řádku (upper_trigger_level se používá jen ve vypnuté větvi populate_entry_trend).
+        """
+        def values(name: str) -> np.ndarray:
+            return np.array([params.get(name, getattr(self, name).value) for params in param_sets])
+
+        n_params, n_candles = len(param_sets), len(dataframe)
+        entry = np.broadcast_to(self.entry_condition(dataframe, metadata['pair']), (n_params, n_candles))
+
+        ema_pairs = np.stack([values('buy_ema_short'), values('buy_ema_long')], axis=1)
+        lookbacks = values('lookback_length')
+        lower = values('lower_trigger_level').astype(float)[:, None]
+
+        ema_short = {int(v): self.compute_hyperopt_variant(dataframe, 'ema_short', int(v))
+                     for v in np.unique(ema_pairs[:, 0])}
+        ema_long = {int(v): self.compute_hyperopt_variant(dataframe, 'ema_long', int(v))
+                    for v in np.unique(ema_pairs[:, 1])}
+        ema_bearish = np.empty((n_params, n_candles), dtype=bool)
+        for short, long in np.unique(ema_pairs, axis=0):
+            rows = (ema_pairs[:, 0] == short) & (ema_pairs[:, 1] == long)
+            ema_bearish[rows] = ema_short[int(short)] < ema_long[int(long)]
+
+        ttf_triggered = np.empty((n_params, n_candles), dtype=bool)
+        for lookback in np.unique(lookbacks):
+            rows = lookbacks == lookback
+            ttf = self.compute_hyperopt_variant(dataframe, 'ttf', int(lookback))
+            ttf_triggered[rows] = ttf[None, :] < lower[rows]
+
+        exit_signals = self.exit_condition(
+            dataframe['close'].values, dataframe['swing_high'].values,
+            dataframe['macd'].values, dataframe['macdsignal'].values,
+            ema_bearish, ttf_triggered, dataframe['volume'].values)
+        return entry, exit_signals
+
+    def confirm_trade_entry(self, pair: str, order_type: str, amount: float, rate: float,
+                            time_in_force: str, current_time: datetime, entry_tag: Optional[str],
+                            side: str, **kwargs) -> bool:
+        # Pár odložený plánovačem (analyze) má v DataProvideru ještě signál předchozí svíčky
+        if (self.is_live_mode() and self.analysis_spread_ratio > 0
+                and self.analysis_pending(pair, self.analysis_candle_open(timeframe_to_prev_date(self.timeframe)))):
+            logging.info(f"{pair}: entry skipped, analysis of the last candle is still scheduled")
+            return False
+        return True
+
     def confirm_trade_exit(self, pair: str, trade: Trade, order_type: str, amount: float,
                            rate: float, time_in_force: str, exit_reason: str,
                            current_time: datetime, **kwargs) -> bool:
@@ -340,19 +1849,16 @@ class DailyBuyStrategy3_5_JPA(IStrategy):
 
         if ('macd_ema_exit' in exit_reason) and (profit_ratio >= 0.005):
             # logging.info(f"[CTE] {pair}, Exit reason {exit_reason}, confirmed profit: {profit_ratio}")
-            if pair in self.thresholds.keys():
-                self.thresholds.pop(pair)
+            self.reset_trade_state(trade)
             return True
 
         if (('trailing' in exit_reason) or ('roi' in exit_reason)) and (profit_ratio >= 0.005):
             # logging.info(f"[CTE] {pair}, Exit reason {exit_reason}, confirmed profit: {profit_ratio}")
-            if pair in self.thresholds.keys():
-                self.thresholds.pop(pair)
+            self.reset_trade_state(trade)
             return True
 
         if 'force' in exit_reason or 'trigger' in exit_reason:
-            if pair in self.thresholds.keys():
-                self.thresholds.pop(pair)
+            self.reset_trade_state(trade)
             return True
 
         # if 'stop_loss' in exit_reason:
@@ -371,10 +1877,120 @@ class DailyBuyStrategy3_5_JPA(IStrategy):
         pass
 
     def informative_pairs(self):
+        # Při lokálním resamplingu se žádná další data z burzy nestahují
+        if self.informative_resample:
+            return []
         pairs = self.dp.current_whitelist()
-        informative_pairs = [(pair, timeframe) for pair in pairs for timeframe in self.timeframe_hierarchy.keys()]
+        informative_pairs = [(pair, timeframe) for pair in pairs for timeframe in self.informative_timeframes()]
         return informative_pairs
 
+    def informative_timeframes(self) -> List[str]:
+        """
+        Timeframy, které strategie opravdu čte (populate_entry_trend používá jen o úroveň vyšší).
+        Při přidání další závislosti ji stačí doplnit sem.
+        """
+        return [self.timeframe_hierarchy[self.timeframe]]
+
+    def get_informative_dataframe(self, pair: str, timeframe: str, dataframe: DataFrame) -> DataFrame:
+        if self.informative_resample:
+            return self.resample_informative(dataframe, timeframe)
+        # Zero-copy pohled do sdíleného storu místo kopie z DataProvideru
+        informative = self.fresh_store_frame(pair, timeframe, None)
+        if informative is not None:
+            return informative
+        return self.dp.get_pair_dataframe(pair=pair, timeframe=timeframe)
+
+    def merge_informative_close(self, pair: str, timeframe: str, dataframe: DataFrame,
+                                informative: DataFrame) -> np.ndarray:
+        """
+        As-of merge close ceny vyššího timeframe na base svíčky podle času.
+
+        Každá base svíčka dostane close poslední svíčky vyššího timeframe, která byla uzavřená
+        nejpozději v okamžiku uzavření base svíčky. Výsledek se drží per (pair, timeframe)
+        v self.informative_cache a při dalším volání se dopočítají jen nové řádky. Vrací pohled
+        do bufferu cache - jen pro okamžité porovnání, neukládat do dataframe.
+        """
+        key = (pair, timeframe)
+        dates = dataframe['date'].values
+        informative_dates = informative['date'].values
+        informative_close = informative['close'].values
+        cached = self.informative_cache.get(key)
+        overlap = _date_overlap(cached['date'], dates) if cached is not None else None
+        start = 0
+        if overlap is not None:
+            # Měnit se může jen poslední uložená svíčka vyššího timeframe a nové za ní. Přepsanou
+            # historii uprostřed okna hlídá populate_indicators_incremental (plný přepočet cache zahodí).
+            last_date, last_close = cached['informative_last']
+            start = int(np.searchsorted(informative_dates, last_date))
+            if (start >= len(informative_dates) or informative_dates[start] != last_date
+                    or informative_close[start] != last_close):
+                overlap = None
+
+        if overlap is None:
+            base_close = self.candle_close_times(dates, self.timeframe)
+            informative_close_times = self.candle_close_times(informative_dates, timeframe)
+            idx = np.searchsorted(informative_close_times, base_close, side='right') - 1
+            # Buffer s rezervou - další volání jen připíší nové řádky za aktuální okno
+            buffer = np.empty(2 * len(dates))
+            buffer[:len(dates)] = np.where(idx >= 0, informative_close[np.maximum(idx, 0)], np.nan)
+            cached = {'buffer': buffer, 'start': 0}
+        else:
+            offset, overlap_len = overlap
+            new_count = len(dates) - overlap_len
+            begin = cached['start'] + offset
+            if begin + len(dates) > len(cached['buffer']):
+                # Plný buffer: nový (vrácené pohledy do starého zůstanou platné), amortizovaně O(1)
+                buffer = np.empty(2 * len(dates))
+                buffer[:overlap_len] = cached['buffer'][begin:begin + overlap_len]
+                cached = {'buffer': buffer, 'start': 0}
+                begin = 0
+            else:
+                cached['start'] = begin
+            if new_count > 0:
+                # Close times jen pro nové řádky a svíčky vyššího timeframe od poslední uložené.
+                # Nová base svíčka uzavřená dřív než svíčka start má stejnou hodnotu jako poslední uložený řádek.
+                base_close = self.candle_close_times(dates[overlap_len:], self.timeframe)
+                informative_close_times = self.candle_close_times(informative_dates[start:], timeframe)
+                idx = np.searchsorted(informative_close_times, base_close, side='right') - 1
+                previous = cached['buffer'][begin + overlap_len - 1]
+                cached['buffer'][begin + overlap_len:begin + len(dates)] = np.where(
+                    idx >= 0, informative_close[start + np.maximum(idx, 0)], previous)
+
+        cached['date'] = dates
+        cached['informative_last'] = (informative_dates[-1], informative_close[-1])
+        self.informative_cache[key] = cached
+        return cached['buffer'][cached['start']:cached['start'] + len(dates)]
+
+    def drop_informative_cache(self, pair: str) -> None:
+        # Plný přepočet indikátorů (nový stav, přepsaná historie, skok v datech) platí i pro merge vyššího timeframe
+        for timeframe in self.informative_timeframes():
+            self.informative_cache.pop((pair, timeframe), None)
+
+    def candle_close_times(self, dates: np.ndarray, timeframe: str) -> np.ndarray:
+        # Čas uzavření svíčky = open date + délka timeframe (pevná délka v numpy, měsíc/týden přes pandas offset)
+        offset = pd.tseries.frequencies.to_offset(timeframe_to_resample_freq(timeframe))
+        if isinstance(offset, pd.offsets.Tick):
+            return dates.astype('datetime64[ns]') + np.timedelta64(offset.nanos, 'ns')
+        return (pd.DatetimeIndex(dates) + offset).values.astype('datetime64[ns]')
+
+    def resample_informative(self, dataframe: DataFrame, timeframe: str) -> DataFrame:
+        """
+        Složí svíčky vyššího timeframe z base dataframe. Poslední neuzavřená svíčka se zahodí,
+        aby výsledek odpovídal tomu, co by vrátil DataProvider (bez lookahead).
+        """
+        if dataframe.empty:
+            return DataFrame(columns=['date', 'open', 'high', 'low', 'close', 'volume'])
+
+        freq = timeframe_to_resample_freq(timeframe)
+        ohlcv = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+        resampled = dataframe.resample(freq, on='date', label='left', closed='left').agg(ohlcv).dropna()
+
+        to_offset = pd.tseries.frequencies.to_offset
+        base_close = dataframe['date'].iloc[-1] + to_offset(timeframe_to_resample_freq(self.timeframe))
+        if not resampled.empty and resampled.index[-1] + to_offset(freq) > base_close:
+            resampled = resampled.iloc[:-1]
+        return resampled.reset_index()
+
     def calculate_dca_amount_and_threshold(self, max_funds, last_threshold):
         """
         Vypočítá novou částku pro DCA a nový threshold pro start dalšího DCA.
@@ -431,7 +2047,7 @@ class DailyBuyStrategy3_5_JPA(IStrategy):
         last_candle = dataframe.iloc[-1]
         last_index = dataframe.index[-1]
 
-        dca_list = self.get_dca_list(trade)
+        dca_list = dcas
         if dca_list and current_rate > dca_list[-1]:
             logging.info(
                 f"Actual price {current_rate} is higher than last DCA price {dca_list[-1]}. DCA will not applied.")
@@ -449,6 +2065,9 @@ class DailyBuyStrategy3_5_JPA(IStrategy):
                                                                                         last_threshold)
                 # Uložení nového thresholdu do slovníku
                 self.thresholds[trade.pair] = new_threshold
+                self.dca_attempts[trade.pair] = self.dca_attempts.get(trade.pair, 0) + 1
+                self.last_dca_price[trade.pair] = current_rate
+                self.mark_trade_state_dirty(trade)
 
                 logging.info(
                     f"{current_time} - DCA triggered for {trade.pair}. Adjusting position with additional stake {new_dca_amount}")
@@ -458,28 +2077,55 @@ class DailyBuyStrategy3_5_JPA(IStrategy):
 
         return None
 
+    def order_filled(self, pair: str, trade: Trade, order: Order, current_time: datetime, **kwargs) -> None:
+        # Po exit orderu se trade uzavírá, cache se zahodí (případně se znovu načte z DB)
+        if order.ft_order_side == trade.exit_side or not trade.is_open:
+            self.trade_data_cache.pop(trade.id, None)
+
+    def get_trade_data(self, trade, key):
+        """
+        Write-through cache nad CustomDataWrapper. Po restartu je cache prázdná a hodnota
+        se líně načte z DB při prvním čtení. Chybějící záznam se cachuje jako None, chyba
+        čtení z DB se necachuje - další volání to zkusí znovu.
+        """
+        cached = self.trade_data_cache.setdefault(trade.id, {})
+        if self.metrics is not None:
+            self.metrics.count('dailybuy_custom_data_calls_total', 'get_trade_data')
+        if key not in cached:
+            if self.metrics is not None:
+                self.metrics.count('dailybuy_custom_data_db_calls_total', 'get_custom_data')
+            try:
+                records = CustomDataWrapper.get_custom_data(trade_id=trade.id, key=key)
+            except Exception as e:
+                logging.error(f"Error reading custom data {key} for trade {trade.id}: {e}")
+                return None
+            cached[key] = records[0].value if records else None
+        return cached[key]
+
+    def set_trade_data(self, trade, key, value):
+        if self.metrics is not None:
+            self.metrics.count('dailybuy_custom_data_calls_total', 'set_trade_data')
+            self.metrics.count('dailybuy_custom_data_db_calls_total', 'set_custom_data')
+        CustomDataWrapper.set_custom_data(trade_id=trade.id, key=key, value=value)
+        self.trade_data_cache.setdefault(trade.id, {})[key] = value
+
     def get_dca_list(self, trade):
-        try:
-            dcas = CustomDataWrapper.get_custom_data(trade_id=trade.id, key="DCA")[0].value
-            return dcas
-        except Exception as ex:
-            pass
-        return []
+        dcas = self.get_trade_data(trade, "DCA")
+        # Kopie, aby volající nemohl změnit obsah cache bez zápisu do DB
+        return list(dcas) if dcas else []
 
     def get_mk_sl(self, trade):
-        try:
-            sl = CustomDataWrapper.get_custom_data(trade_id=trade.id, key="SL")[0].value
-            return sl
-        except Exception as ex:
-            pass
-        return trade.stop_loss
+        sl = self.get_trade_data(trade, "SL")
+        if sl is None:
+            return trade.stop_loss
+        return sl
 
     def set_mk_sl(self, trade, current_rate):
         sl = current_rate * self.new_sl_coef.value
-        CustomDataWrapper.set_custom_data(trade_id=trade.id, key="SL", value=sl)
+        self.set_trade_data(trade, "SL", sl)
 
     def confirm_dca(self, current_rate, trade):
         dcas = self.get_dca_list(trade)
         dcas.append(current_rate)
         self.set_mk_sl(trade, current_rate)
-        CustomDataWrapper.set_custom_data(trade_id=trade.id, key="DCA", value=dcas)
+        self.set_trade_data(trade, "DCA", dcas)
@@ -11,12 +11,17 @@ KUBECONFIG=${KUBECONFIG:-$HOME/.kube/config}
 K8S_NODE=${K8S_NODE:-127.0.0.1}
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 TEMPLATE_FILE="${SCRIPT_DIR}/DailyBuyStrategy3_5_JPA_TEMPLATE.py"
+# Hyperopt parametry (freqtrade params JSON), bot je načítá za běhu z <user_data>/strategy_params.json
+PARAMS_FILE="${PARAMS_FILE:-${SCRIPT_DIR}/DailyBuyStrategy3_5_JPA.json}"
 DB_BASE_HOST_PATH="${DB_BASE_HOST_PATH:-/mnt/ft}"
 
 # Přepínače nasazení
 # DEPLOY=true  => provede kubectl apply (výchozí)
 # DEPLOY=false => pouze generuje YAML soubory
 DEPLOY=${DEPLOY:-true}
+# Manifesty se generují paralelně a kubectl apply běží jen pro boty se změněným obsahem
+# (sha256 posledního nasazení v <bot>/.applied.sha256); FORCE_APPLY=true => nasadit vše
+FORCE_APPLY=${FORCE_APPLY:-false}
 
 # Konstantní credentials (načítají se z prostředí nebo jsou placeholdery)
 EXCHANGE_KEY="${EXCHANGE_KEY:-K}"
@@ -27,6 +32,38 @@ API_USERNAME="${API_USERNAME:-freqtrade}"
 # Základní NodePort
 BASE_NODEPORT=30400
 
+# Páry celé flotily (bot whitelist i sdílený candle store)
+PAIRS_INPUT="${PAIRS_INPUT:-BTC/USDT:USDT,ETH/USDT:USDT}"
+
+# Sdílený svíčkový store na nodu (candle_store.py) - jeden zapisovatel, boty čtou read-only mmap
+# CANDLE_STORE=false => každý bot stahuje svíčky z burzy sám (původní chování)
+CANDLE_STORE=${CANDLE_STORE:-true}
+CANDLE_STORE_HOST_PATH="${CANDLE_STORE_HOST_PATH:-/mnt/ft_candles}"
+CANDLE_STORE_DIR="${SCRIPT_DIR}/bots_dailybuy_candles"
+
+# Prometheus /metrics strategie (latence callbacků, DB volání, fronta analýzy); 0 => vypnuto
+# Ve FLEET_MODE=single má každý bot vlastní port STRATEGY_METRICS_PORT + index bota
+STRATEGY_METRICS_PORT=${STRATEGY_METRICS_PORT:-9090}
+
+# Kompaktní dataframe strategie (float32 indikátory bez duplicitních sloupců, ~40 % méně paměti)
+COMPACT_DATAFRAME=${COMPACT_DATAFRAME:-true}
+
+# Režim nasazení flotily
+# FLEET_MODE=bots   => jeden Bot CRD (pod) na timeframe (výchozí)
+# FLEET_MODE=single => jeden pod se všemi timeframy (fleet_runner.py): boty jako fork potomci
+#                      jednoho supervisoru, každý s vlastní DB, user_data a API portem;
+#                      candle store běží v témže podu nad sdíleným tmpfs
+FLEET_MODE=${FLEET_MODE:-bots}
+FLEET_NAME="dailybuy-fleet"
+FLEET_DIR="${SCRIPT_DIR}/bots_dailybuy_fleet"
+FLEET_CPU_REQUEST="${FLEET_CPU_REQUEST:-2000m}"
+FLEET_CPU_LIMIT="${FLEET_CPU_LIMIT:-4000m}"
+FLEET_MEMORY_REQUEST="${FLEET_MEMORY_REQUEST:-3Gi}"
+FLEET_MEMORY_LIMIT="${FLEET_MEMORY_LIMIT:-6Gi}"
+FLEET_BOTS=()
+FLEET_BOT_DIRS=()
+FLEET_NODEPORTS=()
+
 # Summary accumulator
 SUMMARY=""
 
@@ -55,88 +92,469 @@ TIMEFRAME_FILTER=${TIMEFRAME:-all}
 # --- HELPER FUNKCE ---
 b64encode() { echo -n "$1" | base64 -w 0; }
 
-# Injektáž hyperopt parametrů do dočasného souboru strategie
-inject_params_into_temp() {
-    local temp_strategy=$1
-    local params_json=$2
-    
+# JWT secret z dříve vygenerovaného manifestu (nebo ze Secretu v clusteru). Nový jen pro nového
+# bota - jinak se Secret mění při každém běhu a operátor restartuje pod (studený start).
+existing_jwt_secret() {
+    local manifest=$1
+    local secret_name=$2
+    local namespace=$3
+    local value="" decoded=""
+    if [ -f "$manifest" ]; then
+        value=$(sed -n 's/^  jwt_secret_key: //p' "$manifest" | head -1)
+    fi
+    if [ -z "$value" ] && [ "${DEPLOY}" = "true" ] && command -v kubectl >/dev/null 2>&1; then
+        value=$(KUBECONFIG="${KUBECONFIG}" kubectl get secret "$secret_name" -n "$namespace" \
+            --request-timeout=5s -o jsonpath='{.data.jwt_secret_key}' 2>/dev/null || true)
+    fi
+    if [ -n "$value" ]; then
+        decoded=$(echo -n "$value" | base64 -d 2>/dev/null || true)
+    fi
+    if [ -n "$decoded" ]; then
+        echo -n "$decoded"
+    else
+        openssl rand -hex 32
+    fi
+}
+
+# kubectl apply jen při změně obsahu manifestů; hash se uloží až po úspěšném nasazení
+apply_manifests() {
+    local dir=$1
+    shift
+    local hash_file="${dir}/.applied.sha256"
+    local hash file
+    local args=()
+    hash=$(cat "$@" | sha256sum | cut -d' ' -f1)
+    if [ "${FORCE_APPLY}" != "true" ] && [ -f "$hash_file" ] && [ "$(cat "$hash_file")" = "$hash" ]; then
+        echo "   ⏭️  Beze změny (${hash:0:12}), nasazení přeskočeno: ${dir}"
+        return 0
+    fi
+    if ! command -v kubectl >/dev/null 2>&1; then
+        echo "   ⚠️ kubectl nenalezen, přeskočeno nasazení."
+        return 0
+    fi
+    for file in "$@"; do
+        args+=(-f "$file")
+    done
+    echo "   🚀 Nasazuji na ${K8S_NODE} přes kubectl apply -f ${dir}/ (${hash:0:12})"
+    KUBECONFIG="${KUBECONFIG}" kubectl apply "${args[@]}"
+    echo "$hash" > "$hash_file"
+}
+
+# Informative timeframe strategie (timeframe_hierarchy v šabloně)
+informative_timeframe() {
+    case "$1" in
+        1m) echo "5m" ;;
+        5m) echo "15m" ;;
+        15m) echo "1h" ;;
+        1h) echo "4h" ;;
+        4h) echo "1d" ;;
+        1d) echo "1w" ;;
+        *) echo "1M" ;;
+    esac
+}
+
+# Zapisovatel sdíleného candle store (ConfigMap se skriptem + Deployment s 1 replikou)
+generate_candle_store() {
+    local tf pair timeframes="" pairs_args="" timeframes_args=""
+    for tf in "${TIMEFRAME_CONFIG[@]}"; do
+        timeframes+="${tf}\n$(informative_timeframe "$tf")\n"
+    done
+    timeframes=$(echo -e "$timeframes" | sort -u | xargs)
+
+    IFS=',' read -ra STORE_PAIRS <<< "$PAIRS_INPUT"
+    for pair in "${STORE_PAIRS[@]}"; do
+        pairs_args+="\"${pair}\", "
+    done
+    for tf in $timeframes; do
+        timeframes_args+="\"${tf}\", "
+    done
+
+    mkdir -p "$CANDLE_STORE_DIR" "$CANDLE_STORE_HOST_PATH"
+    chmod -R 777 "$CANDLE_STORE_HOST_PATH" 2>/dev/null || true
+
+    cat > "${CANDLE_STORE_DIR}/candle-store.yaml" <<EOF
+apiVersion: v1
+kind: ConfigMap
+metadata:
+  name: dailybuy-candle-store-script
+  namespace: default
+data:
+  candle_store.py: |
+$(sed 's/[[:space:]]*$//' "${SCRIPT_DIR}/candle_store.py" | sed 's/^/    /')
+---
+apiVersion: apps/v1
+kind: Deployment
+metadata:
+  name: dailybuy-candle-store
+  namespace: default
+spec:
+  replicas: 1
+  strategy:
+    type: Recreate
+  selector:
+    matchLabels:
+      app.kubernetes.io/name: dailybuy-candle-store
+  template:
+    metadata:
+      labels:
+        app.kubernetes.io/name: dailybuy-candle-store
+    spec:
+      nodeSelector:
+        kubernetes.io/hostname: debian
+      containers:
+        - name: candle-store
+          image: freqtradeorg/freqtrade:develop
+          command: ["python3", "/candle_store/candle_store.py"]
+          args: ["--root", "/freqtrade/candle_store", "--exchange", "bybit", "--trading-mode", "futures",
+                 "--pairs", ${pairs_args%, }, "--timeframes", ${timeframes_args%, }]
+          resources:
+            requests:
+              cpu: "100m"
+              memory: "256Mi"
+            limits:
+              cpu: "500m"
+              memory: "512Mi"
+          volumeMounts:
+            - name: script
+              mountPath: /candle_store
+            - name: candle-store
+              mountPath: /freqtrade/candle_store
+      volumes:
+        - name: script
+          configMap:
+            name: dailybuy-candle-store-script
+        - name: candle-store
+          hostPath:
+            path: ${CANDLE_STORE_HOST_PATH}
+            type: DirectoryOrCreate
+EOF
+    echo "   ✅ Candle store YAML vygenerován: ${CANDLE_STORE_DIR}"
+    SUMMARY+="dailybuy-candle-store -> ${CANDLE_STORE_HOST_PATH} (${timeframes})\n"
+
+    if [ "${DEPLOY}" = "true" ]; then
+        apply_manifests "$CANDLE_STORE_DIR" "${CANDLE_STORE_DIR}/candle-store.yaml"
+    fi
+}
+
+# Instalace parametrů strategie (freqtrade params JSON) do data adresáře bota.
+# Strategie je čte za běhu (reload_strategy_params) - zdrojový kód v bot.yaml se parametry nemění.
+install_strategy_params() {
+    local params_json=$1
+    local target=$2
+
     if [ ! -f "$params_json" ]; then
+        echo "   ℹ️  Parametry ${params_json} neexistují, bot jede s defaulty strategie"
         return 0
     fi
-    
-    python3 - <<PYSCRIPT
+
+    if ! python3 - "$params_json" <<'PYSCRIPT'
 import json
 import sys
-import re
 
 try:
-    with open("$params_json", 'r') as f:
+    with open(sys.argv[1]) as f:
         data = json.load(f)
-        params_data = data.get('parameters', data.get('params', {}))
-except Exception as e:
-    sys.exit(0)
+except (OSError, ValueError) as e:
+    sys.exit(f"nelze načíst: {e}")
+if data.get('strategy_name') != 'DailyBuyStrategy3_5_JPA':
+    sys.exit(f"strategy_name {data.get('strategy_name')!r} nepatří k DailyBuyStrategy3_5_JPA")
+if data.get('ft_stratparam_v') != 1:
+    sys.exit(f"nepodporovaná verze ft_stratparam_v {data.get('ft_stratparam_v')!r}")
+if not isinstance(data.get('params'), dict):
+    sys.exit("chybí sekce params")
+PYSCRIPT
+    then
+        echo "   ❌ Neplatné parametry ${params_json}, ponechávám původní ${target}"
+        return 1
+    fi
 
-if not params_data:
-    sys.exit(0)
+    # Shodný obsah nepřepisovat - nové mtime by u bota vyvolalo zbytečný reload
+    if cmp -s "$params_json" "$target"; then
+        echo "   ✅ Parametry beze změny: ${target}"
+        return 0
+    fi
 
-try:
-    with open("$temp_strategy", 'r') as f:
-        content = f.read()
-except Exception as e:
-    sys.exit(1)
-
-buy_params = params_data.get("buy", {})
-sell_params = params_data.get("sell", {})
-roi_params = params_data.get("roi", {})
-
-if roi_params:
-    roi_dict = "{" + ", ".join(
-        f'"{k}": {v}' for k, v in sorted(roi_params.items())
-    ) + "}"
-    pattern = r'minimal_roi\s*=\s*\{[^}]*\}'
-    replacement = f'minimal_roi = {roi_dict}'
-    content = re.sub(pattern, replacement, content)
-
-if buy_params:
-    for param_name, param_value in buy_params.items():
-        pattern = (
-            rf'({re.escape(param_name)}\s*=\s*'
-            r'(?:Decimal|Int|Categorical)Parameter\([^)]*'
-            r'default\s*=\s*)[^,\)]+(\s*[,\)])'
-        )
-        replacement = rf'\g<1>{param_value}\g<2>'
-        content = re.sub(pattern, replacement, content)
-
-if sell_params:
-    for param_name, param_value in sell_params.items():
-        pattern = (
-            rf'({re.escape(param_name)}\s*=\s*'
-            r'(?:Decimal|Int|Categorical)Parameter\([^)]*'
-            r'default\s*=\s*)[^,\)]+(\s*[,\)])'
-        )
-        replacement_value = str(param_value)
-        if isinstance(param_value, str):
-            replacement_value = f'"{param_value}"'
-        replacement = rf'\g<1>{replacement_value}\g<2>'
-        content = re.sub(pattern, replacement, content)
-
-with open("$temp_strategy", 'w') as f:
-    f.write(content)
-PYSCRIPT
+    # Atomická výměna - bot může soubor číst právě teď
+    cp "$params_json" "${target}.tmp"
+    mv -f "${target}.tmp" "$target"
+    echo "   ✅ Parametry nainstalovány: ${target}"
 }
 
-PORT_OFFSET=0
+# Config jednoho bota pro FLEET_MODE=single (stejné hodnoty jako config v bot.yaml)
+generate_fleet_bot_config() {
+    local api_port=$1
+    local pairs_json
+    pairs_json=$(printf '"%s", ' "${PAIRS_ARRAY[@]}")
+    cat <<EOF
+{
+  "bot_name": "${BOT_NAME}",
+  "initial_state": "running",
+  "max_open_trades": ${MAX_OPEN_TRADES},
+  "stake_currency": "USDT",
+  "stake_amount": "${STAKE_AMOUNT}",
+  "tradable_balance_ratio": ${BALANCE_RATIO},
+  "fiat_display_currency": "${FIAT_DISPLAY}",
+  "timeframe": "${TIMEFRAME}",
+  "dry_run": true,
+  "dry_run_wallet": 10000,
+  "trading_mode": "${TRADING_MODE}",
+  "margin_mode": "${MARGIN_MODE}",
+  "use_exit_signal": ${USE_EXIT_SIGNAL},
+  "unfilledtimeout": {"entry": 30, "exit": 30},
+  "entry_pricing": {"price_side": "other", "use_order_book": true, "order_book_top": 1},
+  "exit_pricing": {"price_side": "other", "use_order_book": true, "order_book_top": 1},
+  "order_types": {
+    "entry": "market",
+    "exit": "market",
+    "stoploss": "market",
+    "stoploss_on_exchange": ${STOPLOSS_ON_EXCHANGE}
+  },
+  "exchange": {
+    "name": "bybit",
+    "pair_whitelist": [${pairs_json%, }]
+  },
+  "pairlists": [{"method": "StaticPairList"}],
+  "telegram": {"enabled": false},
+  "api_server": {
+    "enabled": true,
+    "listen_ip_address": "0.0.0.0",
+    "listen_port": ${api_port}
+  },
+  "strategy_metrics_port": ${2:-0},
+  "strategy_compact_dataframe": ${COMPACT_DATAFRAME},
+  "db_url": "sqlite:////freqtrade/db_persist/${BOT_NAME}/database.db"
+}
+EOF
+}
 
-for BOT_DIR_NAME in "${!TIMEFRAME_CONFIG[@]}"; do
+# Jeden pod pro celou flotilu: Secret + ConfigMap (runner, store, strategie, configy) + Deployment + Service
+generate_fleet() {
+    local i name tf timeframes="" config_items="" config_data="" bot_args="" ports="" service_ports=""
+    local volumes="" mounts="" store_args="" store_env="" pairs_args="" timeframes_args=""
+    local jwt_secret
+    jwt_secret=$(existing_jwt_secret "${FLEET_DIR}/fleet.yaml" "${FLEET_NAME}-secret" default)
+
+    for i in "${!FLEET_BOTS[@]}"; do
+        name="${FLEET_BOTS[$i]}"
+        tf="${name#dailybuy-}"
+        timeframes+="${tf}\n$(informative_timeframe "$tf")\n"
+        config_items+="
+              - key: ${name}.json
+                path: configs/${name}.json"
+        config_data+="
+  ${name}.json: |
+$(sed 's/^/    /' "${FLEET_DIR}/configs/${name}.json")"
+        bot_args+="\"--bot\", \"${name}=/fleet/configs/${name}.json\", "
+        ports+="
+            - name: ${name}
+              containerPort: $((8081 + i))"
+        service_ports+="
+    - name: ${name}
+      port: $((8081 + i))
+      targetPort: $((8081 + i))
+      nodePort: ${FLEET_NODEPORTS[$i]}"
+        if [ "${STRATEGY_METRICS_PORT}" != "0" ]; then
+            ports+="
+            - name: metrics-${tf}
+              containerPort: $((STRATEGY_METRICS_PORT + i))"
+            service_ports+="
+    - name: metrics-${tf}
+      port: $((STRATEGY_METRICS_PORT + i))
+      targetPort: $((STRATEGY_METRICS_PORT + i))"
+        fi
+        volumes+="
+        - name: data-${name}
+          hostPath:
+            path: ${SCRIPT_DIR}/${FLEET_BOT_DIRS[$i]}/data
+            type: DirectoryOrCreate"
+        mounts+="
+            - name: data-${name}
+              mountPath: /freqtrade/user_data/${name}"
+    done
+    timeframes=$(echo -e "$timeframes" | sort -u | xargs)
+
+    if [ "${STRATEGY_METRICS_PORT}" != "0" ]; then
+        # Prometheus scrape anotace (port prvního bota, ostatní jsou vyjmenované v ports Service)
+        METRICS_ANNOTATIONS_YAML="
+  annotations:
+    prometheus.io/scrape: \"true\"
+    prometheus.io/port: \"${STRATEGY_METRICS_PORT}\"
+    prometheus.io/path: /metrics"
+    else
+        METRICS_ANNOTATIONS_YAML=""
+    fi
+
+    if [ "${CANDLE_STORE}" = "true" ]; then
+        IFS=',' read -ra STORE_PAIRS <<< "$PAIRS_INPUT"
+        for pair in "${STORE_PAIRS[@]}"; do
+            pairs_args+="\"${pair}\", "
+        done
+        for tf in $timeframes; do
+            timeframes_args+="\"${tf}\", "
+        done
+        store_args="
+                 \"--candle-store-root\", \"/freqtrade/candle_store\", \"--exchange\", \"bybit\",
+                 \"--pairs\", ${pairs_args%, }, \"--timeframes\", ${timeframes_args%, },"
+        store_env="
+            - name: FT_CANDLE_STORE
+              value: /freqtrade/candle_store"
+        volumes+="
+        - name: candle-store
+          emptyDir:
+            medium: Memory
+            sizeLimit: 256Mi"
+        mounts+="
+            - name: candle-store
+              mountPath: /freqtrade/candle_store"
+    fi
+
+    cat > "${FLEET_DIR}/fleet.yaml" <<EOF
+apiVersion: v1
+kind: Secret
+metadata:
+  name: ${FLEET_NAME}-secret
+  namespace: default
+data:
+  api_password: $(b64encode "$API_PASSWORD")
+  api_username: $(b64encode "$API_USERNAME")
+  exchange_key: $(b64encode "$EXCHANGE_KEY")
+  exchange_secret: $(b64encode "$EXCHANGE_SECRET")
+  jwt_secret_key: $(b64encode "$jwt_secret")
+type: Opaque
+---
+apiVersion: v1
+kind: ConfigMap
+metadata:
+  name: ${FLEET_NAME}-files
+  namespace: default
+data:
+  fleet_runner.py: |
+$(sed 's/[[:space:]]*$//' "${SCRIPT_DIR}/fleet_runner.py" | sed 's/^/    /')
+  candle_store.py: |
+$(sed 's/[[:space:]]*$//' "${SCRIPT_DIR}/candle_store.py" | sed 's/^/    /')
+  ${FLEET_STRATEGY_CLASS_NAME}.py: |
+$(sed 's/^[[:space:]]*$//' "${FLEET_DIR}/configs/${FLEET_STRATEGY_CLASS_NAME}.py" | sed 's/[[:space:]]*$//' | sed 's/^/    /')${config_data}
+---
+apiVersion: apps/v1
+kind: Deployment
+metadata:
+  name: ${FLEET_NAME}
+  namespace: default
+spec:
+  replicas: 1
+  strategy:
+    type: Recreate
+  selector:
+    matchLabels:
+      app.kubernetes.io/name: ${FLEET_NAME}
+  template:
+    metadata:
+      labels:
+        app.kubernetes.io/name: ${FLEET_NAME}
+    spec:
+      nodeSelector:
+        kubernetes.io/hostname: debian
+      terminationGracePeriodSeconds: 90
+      containers:
+        - name: fleet
+          image: freqtradeorg/freqtrade:develop
+          command: ["python3", "/fleet/fleet_runner.py"]
+          args: ["--strategy", "${FLEET_STRATEGY_CLASS_NAME}", "--strategy-path", "/fleet/strategies",
+                 ${bot_args}${store_args}
+                 "--user-data-root", "/freqtrade/user_data"]
+          env:
+            - name: FREQTRADE__API_SERVER__USERNAME
+              valueFrom:
+                secretKeyRef:
+                  name: ${FLEET_NAME}-secret
+                  key: api_username
+            - name: FREQTRADE__API_SERVER__PASSWORD
+              valueFrom:
+                secretKeyRef:
+                  name: ${FLEET_NAME}-secret
+                  key: api_password
+            - name: FREQTRADE__API_SERVER__JWT_SECRET_KEY
+              valueFrom:
+                secretKeyRef:
+                  name: ${FLEET_NAME}-secret
+                  key: jwt_secret_key
+            - name: FREQTRADE__API_SERVER__WS_TOKEN
+              valueFrom:
+                secretKeyRef:
+                  name: ${FLEET_NAME}-secret
+                  key: jwt_secret_key
+            - name: FREQTRADE__EXCHANGE__KEY
+              valueFrom:
+                secretKeyRef:
+                  name: ${FLEET_NAME}-secret
+                  key: exchange_key
+            - name: FREQTRADE__EXCHANGE__SECRET
+              valueFrom:
+                secretKeyRef:
+                  name: ${FLEET_NAME}-secret
+                  key: exchange_secret${store_env}
+          ports:${ports}
+          resources:
+            requests:
+              cpu: "${FLEET_CPU_REQUEST}"
+              memory: "${FLEET_MEMORY_REQUEST}"
+            limits:
+              cpu: "${FLEET_CPU_LIMIT}"
+              memory: "${FLEET_MEMORY_LIMIT}"
+          volumeMounts:
+            - name: files
+              mountPath: /fleet
+            - name: database-dir
+              mountPath: /freqtrade/db_persist
+            - name: dshm
+              mountPath: /dev/shm${mounts}
+      volumes:
+        - name: files
+          configMap:
+            name: ${FLEET_NAME}-files
+            items:
+              - key: fleet_runner.py
+                path: fleet_runner.py
+              - key: candle_store.py
+                path: candle_store.py
+              - key: ${FLEET_STRATEGY_CLASS_NAME}.py
+                path: strategies/${FLEET_STRATEGY_CLASS_NAME}.py${config_items}
+        - name: database-dir
+          hostPath:
+            path: ${DB_BASE_HOST_PATH}
+            type: DirectoryOrCreate
+        - name: dshm
+          emptyDir:
+            medium: Memory${volumes}
+---
+apiVersion: v1
+kind: Service
+metadata:
+  name: ${FLEET_NAME}-service
+  namespace: default${METRICS_ANNOTATIONS_YAML}
+spec:
+  type: NodePort
+  selector:
+    app.kubernetes.io/name: ${FLEET_NAME}
+  ports:${service_ports}
+EOF
+    echo "   ✅ Fleet YAML vygenerován: ${FLEET_DIR}/fleet.yaml (${#FLEET_BOTS[@]} botů v jednom podu)"
+
+    if [ "${DEPLOY}" = "true" ]; then
+        echo "   ℹ️  Per-timeframe boty (pokud běží) zastav: ./stop_bots_daily.sh all"
+        apply_manifests "$FLEET_DIR" "${FLEET_DIR}/fleet.yaml"
+    fi
+}
+
+# Manifesty jednoho bota (bot.yaml, secret.yaml, service.yaml, ve FLEET_MODE=single jen config).
+# Běží na pozadí pro všechny timeframy naráz, výstup jde do logu a vypíše se v pořadí botů.
+render_bot() {
+    BOT_DIR_NAME=$1
+    PORT_OFFSET=$2
     BOT_DIR_PATH="${SCRIPT_DIR}/${BOT_DIR_NAME}"
     TIMEFRAME="${TIMEFRAME_CONFIG[$BOT_DIR_NAME]}"
     BOT_NAME="dailybuy-${TIMEFRAME}"
 
-    # Filtr pro specifický timeframe
-    if [ "$TIMEFRAME_FILTER" != "all" ] && [ "$TIMEFRAME_FILTER" != "$TIMEFRAME" ]; then
-        continue
-    fi
-
     if [ ! -d "$BOT_DIR_PATH" ]; then
         echo "   ⚠️  Složka neexistuje: $BOT_DIR_PATH - vytvářím..."
         mkdir -p "$BOT_DIR_PATH"
@@ -149,15 +567,12 @@ for BOT_DIR_NAME in "${!TIMEFRAME_CONFIG[@]}"; do
     NAMESPACE="default"
     STAKE_AMOUNT="unlimited"
     FIAT_DISPLAY="USD"
-    PAIRS_INPUT="BTC/USDT:USDT,ETH/USDT:USDT"
     MAX_OPEN_TRADES=5
     BALANCE_RATIO=0.95
     MARGIN_MODE="isolated"
     STOPLOSS_ON_EXCHANGE="true"
     USE_EXIT_SIGNAL="true"
     TRADING_MODE="futures"
-    
-    STARTUP_CANDLES=100
 
     # LEVERAGE pro PERPETUAL FUTURES (vyšší pro futures)
     case "$TIMEFRAME" in
@@ -174,8 +589,8 @@ for BOT_DIR_NAME in "${!TIMEFRAME_CONFIG[@]}"; do
     # Přiřazení portu podle pořadí
     CURRENT_NODEPORT=$((BASE_NODEPORT + PORT_OFFSET))
 
-    JWT_SECRET=$(openssl rand -hex 32)
     SECRET_NAME="${BOT_NAME}-secret"
+    JWT_SECRET=$(existing_jwt_secret "${BOT_DIR_PATH}/secret.yaml" "$SECRET_NAME" "$NAMESPACE")
 
     # pair_whitelist YAML blok
     PAIRS_YAML=""
@@ -186,27 +601,50 @@ for BOT_DIR_NAME in "${!TIMEFRAME_CONFIG[@]}"; do
 
     INCLUDE_TIMEFRAMES_YAML="          - ${TIMEFRAME}"
 
-    # 3) PŘÍPRAVA STRATEGIE (dočasný soubor)
-    TEMP_STRATEGY_FILE="${BOT_DIR_PATH}/temp_strategy_gen.py"
-    cp "$TEMPLATE_FILE" "$TEMP_STRATEGY_FILE"
-
-    # Injekce hyperopt parametrů (pokud existuje)
-    HYPEROPT_PARAMS_FILE="${SCRIPT_DIR}/DailyBuyStrategy3_5_JPA.json"
-    if [ -f "$HYPEROPT_PARAMS_FILE" ]; then
-        inject_params_into_temp "$TEMP_STRATEGY_FILE" "$HYPEROPT_PARAMS_FILE"
+    # Env pro strategii: kompaktní dataframe, Prometheus metriky, sdílený candle store
+    BOT_ENV_YAML=""
+    if [ "${COMPACT_DATAFRAME}" = "true" ]; then
+        BOT_ENV_YAML+="
+      - name: FT_COMPACT_DATAFRAME
+        value: \"1\""
     fi
-
-    # Nahrazení placeholderů
-    sed -i "s|{{LEVERAGE}}|${LEVERAGE}|g" "$TEMP_STRATEGY_FILE"
-    sed -i "s|{{CLASS_NAME}}|DailyBuyStrategy3_5_JPA|g" "$TEMP_STRATEGY_FILE"
-
-    STRATEGY_CLASS_NAME=$(grep "class .*\(IStrategy\)" "$TEMP_STRATEGY_FILE" | head -1 | sed 's/class \([a-zA-Z0-9_]*\)(IStrategy).*/\1/') || true
-    if [ -z "${STRATEGY_CLASS_NAME:-}" ]; then
-        STRATEGY_CLASS_NAME=$(grep -o "class [a-zA-Z0-9_]*" "$TEMP_STRATEGY_FILE" | head -1 | awk '{print $2}') || true
+    if [ "${STRATEGY_METRICS_PORT}" != "0" ]; then
+        BOT_ENV_YAML+="
+      - name: FT_METRICS_PORT
+        value: \"${STRATEGY_METRICS_PORT}\""
+        METRICS_ANNOTATIONS_YAML="
+  annotations:
+    prometheus.io/scrape: \"true\"
+    prometheus.io/port: \"${STRATEGY_METRICS_PORT}\"
+    prometheus.io/path: /metrics"
+        METRICS_SERVICE_PORT_YAML="
+    - name: metrics
+      port: ${STRATEGY_METRICS_PORT}
+      targetPort: ${STRATEGY_METRICS_PORT}"
+    else
+        METRICS_ANNOTATIONS_YAML=""
+        METRICS_SERVICE_PORT_YAML=""
     fi
-    if [ -z "${STRATEGY_CLASS_NAME:-}" ]; then
-        STRATEGY_CLASS_NAME="DailyBuyStrategy3_5_JPA"
+
+    # Sdílený candle store: env pro strategii + read-only hostPath mount
+    if [ "${CANDLE_STORE}" = "true" ]; then
+        BOT_ENV_YAML+="
+      - name: FT_CANDLE_STORE
+        value: /freqtrade/candle_store"
+        CANDLE_STORE_VOLUME_YAML="
+      - name: candle-store
+        hostPath:
+          path: ${CANDLE_STORE_HOST_PATH}
+          type: DirectoryOrCreate"
+        CANDLE_STORE_MOUNT_YAML="
+      - name: candle-store
+        mountPath: /freqtrade/candle_store
+        readOnly: true"
+    else
+        CANDLE_STORE_VOLUME_YAML=""
+        CANDLE_STORE_MOUNT_YAML=""
     fi
+    BOT_ENV_YAML="${BOT_ENV_YAML:- []}"
 
     # 4) ADRESÁŘE
     mkdir -p "${BOT_DIR_PATH}/data"
@@ -216,6 +654,21 @@ for BOT_DIR_NAME in "${!TIMEFRAME_CONFIG[@]}"; do
     chmod -R 777 /mnt/ft_etc 2>/dev/null || true
     chmod -R 777 "${DB_BASE_HOST_PATH}/${BOT_NAME}" 2>/dev/null || true
 
+    # Parametry strategie: data/ je user_data bota (hostPath), strategie si je hlídá a přenačítá
+    install_strategy_params "$PARAMS_FILE" "${BOT_DIR_PATH}/data/strategy_params.json" || true
+
+    # Jeden pod pro všechny timeframy: tady jen config bota, YAML vznikne po smyčce (generate_fleet)
+    if [ "${FLEET_MODE}" = "single" ]; then
+        FLEET_METRICS_PORT=0
+        if [ "${STRATEGY_METRICS_PORT}" != "0" ]; then
+            FLEET_METRICS_PORT=$((STRATEGY_METRICS_PORT + PORT_OFFSET))
+        fi
+        generate_fleet_bot_config $((8081 + PORT_OFFSET)) "${FLEET_METRICS_PORT}" \
+            > "${FLEET_DIR}/configs/${BOT_NAME}.json"
+        echo "   ✅ Config vygenerován: ${FLEET_DIR}/configs/${BOT_NAME}.json"
+        return 0
+    fi
+
     # 5) GENERACE bot.yaml
      cat > "${BOT_DIR_PATH}/bot.yaml" <<EOF
 apiVersion: freqtrade.io/v1alpha1
@@ -230,7 +683,7 @@ spec:
   pvc:
     enabled: false
   deployment:
-    env: []
+    env:${BOT_ENV_YAML}
     nodeSelector:
       kubernetes.io/hostname: debian
     resources:
@@ -251,14 +704,14 @@ spec:
           type: DirectoryOrCreate
       - name: dshm
         emptyDir:
-          medium: Memory
+          medium: Memory${CANDLE_STORE_VOLUME_YAML}
     volumeMounts:
       - name: user-data
         mountPath: /freqtrade/user_data
       - name: database-dir
         mountPath: /freqtrade/db_persist
       - name: dshm
-        mountPath: /dev/shm
+        mountPath: /dev/shm${CANDLE_STORE_MOUNT_YAML}
   exchange: bybit
   database: sqlite:////freqtrade/db_persist/database.db
   config:
@@ -340,11 +793,8 @@ $(echo -e "$PAIRS_YAML")
     source: |
 EOF
 
-    # Část 2: Strategie (odsazená a přilepená nakonec)
-    sed 's/^[[:space:]]*$//' "$TEMP_STRATEGY_FILE" | sed 's/[[:space:]]*$//' | sed 's/^/      /' >> "${BOT_DIR_PATH}/bot.yaml"
-
-    # Úklid dočasné strategie
-    rm -f "$TEMP_STRATEGY_FILE"
+    # Část 2: Strategie (odsazená a přilepená nakonec) - šablona beze změn, parametry jsou v data/
+    sed 's/^[[:space:]]*$//' "$TEMPLATE_FILE" | sed 's/[[:space:]]*$//' | sed 's/^/      /' >> "${BOT_DIR_PATH}/bot.yaml"
 
     # --- SECRET.YAML ---
     cat > "${BOT_DIR_PATH}/secret.yaml" <<EOF
@@ -368,34 +818,104 @@ apiVersion: v1
 kind: Service
 metadata:
   name: ${BOT_NAME}-service
-  namespace: ${NAMESPACE}
+  namespace: ${NAMESPACE}${METRICS_ANNOTATIONS_YAML}
 spec:
   type: NodePort
   selector:
     app.kubernetes.io/name: ${BOT_NAME}
   ports:
-    - port: 8081
+    - name: api
+      port: 8081
       targetPort: 8081
-      nodePort: ${CURRENT_NODEPORT}
+      nodePort: ${CURRENT_NODEPORT}${METRICS_SERVICE_PORT_YAML}
 EOF
 
     echo "   ✅ YAML vygenerován: ${BOT_DIR_PATH}"
-    BOT_URL="http://${K8S_NODE}:${CURRENT_NODEPORT}/trade"
-    SUMMARY+="${BOT_NAME} -> ${BOT_URL}\n"
+}
 
-    # 6) NASAZENÍ (volitelné)
-    if [ "${DEPLOY}" = "true" ]; then
-        if command -v kubectl >/dev/null 2>&1; then
-            echo "   🚀 Nasazuji na ${K8S_NODE} přes kubectl apply -f ${BOT_DIR_PATH}/"
-            KUBECONFIG="${KUBECONFIG}" kubectl apply -f "${BOT_DIR_PATH}/"
-        else
-            echo "   ⚠️ kubectl nenalezen, přeskočeno nasazení."
-        fi
+PORT_OFFSET=0
+
+# Ve FLEET_MODE=single běží zapisovatel candle store uvnitř fleet podu
+if [ "${CANDLE_STORE}" = "true" ] && [ "${FLEET_MODE}" != "single" ]; then
+    echo "----------------------------------------"
+    echo "🔍 Zpracovávám: sdílený candle store (${CANDLE_STORE_HOST_PATH})"
+    generate_candle_store
+fi
+
+# Třída strategie - šablona jde do všech botů beze změn (parametry čte strategie z strategy_params.json)
+STRATEGY_CLASS_NAME=$(grep "class .*\(IStrategy\)" "$TEMPLATE_FILE" | head -1 | sed 's/class \([a-zA-Z0-9_]*\)(IStrategy).*/\1/') || true
+if [ -z "${STRATEGY_CLASS_NAME:-}" ]; then
+    STRATEGY_CLASS_NAME=$(grep -o "class [a-zA-Z0-9_]*" "$TEMPLATE_FILE" | head -1 | awk '{print $2}') || true
+fi
+if [ -z "${STRATEGY_CLASS_NAME:-}" ]; then
+    STRATEGY_CLASS_NAME="DailyBuyStrategy3_5_JPA"
+fi
+
+if [ "${FLEET_MODE}" = "single" ]; then
+    mkdir -p "${FLEET_DIR}/configs"
+    cp "$TEMPLATE_FILE" "${FLEET_DIR}/configs/${STRATEGY_CLASS_NAME}.py"
+    FLEET_STRATEGY_CLASS_NAME="${STRATEGY_CLASS_NAME}"
+fi
+
+RENDER_LOG_DIR=$(mktemp -d)
+trap 'rm -rf "$RENDER_LOG_DIR"' EXIT
+RENDERED_BOTS=()
+RENDER_PIDS=()
+
+for BOT_DIR_NAME in "${!TIMEFRAME_CONFIG[@]}"; do
+    TIMEFRAME="${TIMEFRAME_CONFIG[$BOT_DIR_NAME]}"
+    BOT_NAME="dailybuy-${TIMEFRAME}"
+
+    # Filtr pro specifický timeframe
+    if [ "$TIMEFRAME_FILTER" != "all" ] && [ "$TIMEFRAME_FILTER" != "$TIMEFRAME" ]; then
+        continue
     fi
 
+    # NodePort podle pořadí se přiděluje tady, aby nezávisel na tom, který render doběhne dřív
+    CURRENT_NODEPORT=$((BASE_NODEPORT + PORT_OFFSET))
+    render_bot "$BOT_DIR_NAME" "$PORT_OFFSET" > "${RENDER_LOG_DIR}/${BOT_DIR_NAME}.log" 2>&1 &
+    RENDER_PIDS+=($!)
+    RENDERED_BOTS+=("${BOT_DIR_NAME}")
+
+    if [ "${FLEET_MODE}" = "single" ]; then
+        FLEET_BOTS+=("${BOT_NAME}")
+        FLEET_BOT_DIRS+=("${BOT_DIR_NAME}")
+        FLEET_NODEPORTS+=("${CURRENT_NODEPORT}")
+        SUMMARY+="${BOT_NAME} -> http://${K8S_NODE}:${CURRENT_NODEPORT}/trade (${FLEET_NAME})\n"
+    else
+        SUMMARY+="${BOT_NAME} -> http://${K8S_NODE}:${CURRENT_NODEPORT}/trade\n"
+    fi
     PORT_OFFSET=$((PORT_OFFSET + 1))
+done
 
+# Výstup renderů v pořadí botů; chyba kteréhokoli renderu ukončí skript ještě před nasazením
+RENDER_FAILED=0
+for i in "${!RENDERED_BOTS[@]}"; do
+    if ! wait "${RENDER_PIDS[$i]}"; then
+        RENDER_FAILED=1
+        echo "   ❌ Generování selhalo: ${RENDERED_BOTS[$i]}" >> "${RENDER_LOG_DIR}/${RENDERED_BOTS[$i]}.log"
+    fi
+    cat "${RENDER_LOG_DIR}/${RENDERED_BOTS[$i]}.log"
 done
+if [ "$RENDER_FAILED" -ne 0 ]; then
+    exit 1
+fi
+
+# 6) NASAZENÍ (volitelné) - jen boti se změněnými manifesty
+if [ "${FLEET_MODE}" != "single" ] && [ "${DEPLOY}" = "true" ]; then
+    echo "----------------------------------------"
+    for BOT_DIR_NAME in "${RENDERED_BOTS[@]}"; do
+        BOT_DIR_PATH="${SCRIPT_DIR}/${BOT_DIR_NAME}"
+        apply_manifests "$BOT_DIR_PATH" "${BOT_DIR_PATH}/bot.yaml" "${BOT_DIR_PATH}/secret.yaml" \
+            "${BOT_DIR_PATH}/service.yaml"
+    done
+fi
+
+if [ "${FLEET_MODE}" = "single" ] && [ ${#FLEET_BOTS[@]} -gt 0 ]; then
+    echo "----------------------------------------"
+    echo "🔍 Zpracovávám: ${FLEET_NAME} (${#FLEET_BOTS[@]} timeframů v jednom podu)"
+    generate_fleet
+fi
 
 echo "========================================"
 if [ "${DEPLOY}" = "true" ]; then
@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarky DailyBuyStrategy3_5_JPA nad syntetickými OHLCV daty se seedem.
+
+Scénáře (páry × svíčky na pár):
+  - 1x1k, 1x100k, 1x1m, 10x1k, 200x1k: populate_indicators, populate_entry_trend,
+    populate_exit_trend v backtest runmode (vyšší timeframe se resampluje z base svíček)
+    a memory_mb = paměť analyzovaných dataframe všech párů (MB, menší je lepší)
+  - callbacks: custom_exit, adjust_trade_position, confirm_trade_exit, leverage,
+    custom_stake_amount - --calls volání každého (dry-run, trady a CustomData v in-memory SQLite)
+  - backtest-10x10k: indikátory + signály + DCA žebřík (dca_simulator.simulate_dca)
+
+Výsledek fáze je nejlepší čas z --repeat běhů v sekundách (minimum nejméně trpí šumem).
+Stejný seed => stejná data i stejné pořadí volání, čísla jsou porovnatelná mezi commity.
+
+Použití (uvnitř freqtrade prostředí):
+    python3 benchmark.py                                   # tabulka výsledků
+    python3 benchmark.py --save benchmark_baseline.json    # nový baseline
+    python3 benchmark.py --compare benchmark_baseline.json --threshold 20   # exit 1 při regresi
+    python3 benchmark.py --scenarios 1x1k callbacks --repeat 5
+    python3 benchmark.py --compact --compare benchmark_baseline.json   # kompaktní dataframe (float32)
+    python3 benchmark.py --no-batch --scenarios 200x1k                 # indikátory po jednom páru
+    python3 benchmark.py --self-test [--compact]           # inkrementální indikátory == plný přepočet
+"""
+import argparse
+import gc
+import importlib.util
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+# název -> (páry, svíček na pár)
+FRAME_SCENARIOS = {
+    '1x1k': (1, 1_000),
+    '1x100k': (1, 100_000),
+    '1x1m': (1, 1_000_000),
+    '10x1k': (10, 1_000),
+    '200x1k': (200, 1_000),
+}
+BACKTEST_SCENARIO = ('backtest-10x10k', 10, 10_000)
+CALLBACKS = ('custom_exit', 'adjust_trade_position', 'confirm_trade_exit', 'leverage', 'custom_stake_amount')
+SCENARIOS = [*FRAME_SCENARIOS, 'callbacks', BACKTEST_SCENARIO[0]]
+
+
+def make_ohlcv(rows, seed, timeframe='5m'):
+    """Náhodná procházka (log-normální výnosy) ve formátu dataframe freqtrade (date ms UTC)."""
+    from freqtrade.exchange import timeframe_to_seconds
+
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.002, rows)))
+    open_ = np.concatenate([[100.0], close[:-1]])
+    wick = np.abs(rng.normal(0.0, 0.0015, rows)) * close
+    dates = pd.date_range('2024-01-01', periods=rows, freq=pd.Timedelta(seconds=timeframe_to_seconds(timeframe)),
+                          tz='UTC').as_unit('ms')
+    return pd.DataFrame({
+        'date': dates,
+        'open': open_,
+        'high': np.maximum(open_, close) + wick,
+        'low': np.minimum(open_, close) - wick,
+        'close': close,
+        'volume': rng.lognormal(3.0, 1.0, rows),
+    })
+
+
+def make_pairs(n_pairs, rows, seed, timeframe):
+    return {f"P{i:03d}/USDT:USDT": make_ohlcv(rows, seed + i, timeframe) for i in range(n_pairs)}
+
+
+_strategy_module = None
+
+
+def load_strategy(strategy_file, runmode, timeframe, compact=False, batch=True):
+    from freqtrade.enums import CandleType
+
+    global _strategy_module
+    if _strategy_module is None:
+        spec = importlib.util.spec_from_file_location('benchmark_strategy', strategy_file)
+        _strategy_module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(_strategy_module)
+    config = {
+        'runmode': runmode,
+        'timeframe': timeframe,
+        'dry_run': True,
+        'stake_currency': 'USDT',
+        'trading_mode': 'futures',
+        'margin_mode': 'isolated',
+        'candle_type_def': CandleType.FUTURES,
+        'bot_name': 'benchmark',
+    }
+    strategy = _strategy_module.DailyBuyStrategy3_5_JPA(config)
+    strategy.timeframe = timeframe
+    # Vyšší timeframe z base svíček - benchmark nepotřebuje DataProvider ani data na disku
+    strategy.informative_resample = True
+    strategy.compact_dataframe = compact
+    strategy.batch_indicators = batch
+    return strategy
+
+
+def best_of(repeat, func):
+    """
+    Minimum časů z `repeat` běhů; func(timings) zapisuje do dictu fáze -> sekundy.
+    GC je během běhu vypnutý (jako timeit) - jinak by čas záležel na tom, co běželo předtím.
+    """
+    best = {}
+    for _ in range(repeat):
+        timings = {}
+        gc.collect()
+        gc.disable()
+        try:
+            func(timings)
+        finally:
+            gc.enable()
+        for name, seconds in timings.items():
+            best[name] = min(best.get(name, seconds), seconds)
+    return best
+
+
+def populate(strategy, frames, timings=None):
+    """populate_indicators / entry / exit přes všechny páry, časy fází do timings."""
+    timings = {} if timings is None else timings
+    # Čistý stav - jinak by další běh jen dopočítal merge vyššího timeframe z cache
+    strategy.informative_cache.clear()
+    strategy.volatility_state.clear()
+    inputs = {pair: frame.copy() for pair, frame in frames.items()}
+    results = {}
+    for stage, method in (('populate_indicators', strategy.populate_indicators),
+                          ('populate_entry_trend', strategy.populate_entry_trend),
+                          ('populate_exit_trend', strategy.populate_exit_trend)):
+        start = time.perf_counter()
+        if stage == 'populate_indicators' and strategy.batch_indicators:
+            # Jako advise_all_indicators v backtestu: všechny páry jedním cross-pair batchem
+            strategy.indicator_batch.update(strategy.compute_indicator_batch(inputs))
+        for pair, frame in inputs.items():
+            results[pair] = method(results.get(pair, frame), {'pair': pair})
+        timings[stage] = time.perf_counter() - start
+    timings['memory_mb'] = sum(df.memory_usage(deep=True).sum() for df in results.values()) / 1e6
+    return results
+
+
+def bench_frames(args, n_pairs, rows):
+    from freqtrade.enums import RunMode
+
+    frames = make_pairs(n_pairs, rows, args.seed, args.timeframe)
+    strategy = load_strategy(args.strategy_file, RunMode.BACKTEST, args.timeframe, args.compact, not args.no_batch)
+    return best_of(args.repeat, lambda timings: populate(strategy, frames, timings))
+
+
+class FixedWallets:
+    """Wallet s pevným zůstatkem - benchmark callbacků bez burzy."""
+
+    def __init__(self, total):
+        self.total = total
+
+    def get_total_stake_amount(self):
+        return self.total
+
+    def get_available_stake_amount(self):
+        return self.total * 0.5
+
+
+def bench_callbacks(args):
+    """Callbacky nad otevřenými trady v in-memory SQLite (CustomData zápisy/čtení jako v dry-runu)."""
+    from freqtrade.data.dataprovider import DataProvider
+    from freqtrade.enums import CandleType, RunMode, TradingMode
+    from freqtrade.persistence import Trade, init_db
+
+    pairs = make_pairs(10, 1_000, args.seed, args.timeframe)
+
+    def run(timings):
+        init_db('sqlite://')
+        strategy = load_strategy(args.strategy_file, RunMode.DRY_RUN, args.timeframe, args.compact, not args.no_batch)
+        analyzed = populate(load_strategy(args.strategy_file, RunMode.BACKTEST, args.timeframe, args.compact,
+                                          not args.no_batch), pairs)
+        strategy.dp = DataProvider(strategy.config, None)
+        strategy.wallets = FixedWallets(5000.0)
+        trades = []
+        for pair, dataframe in analyzed.items():
+            strategy.dp._set_cached_df(pair, args.timeframe, dataframe, CandleType.FUTURES)
+            strategy.store_volatility(pair, dataframe)
+            open_rate = float(dataframe['close'].iloc[-1])
+            trade = Trade(pair=pair, exchange='bybit', open_rate=open_rate, amount=1.0, stake_amount=open_rate,
+                          open_date=dataframe['date'].iloc[-1].to_pydatetime(), fee_open=0.0005, fee_close=0.0005,
+                          is_open=True, leverage=1.0, trading_mode=TradingMode.FUTURES,
+                          liquidation_price=open_rate * 0.5, stop_loss=open_rate * 0.5)
+            Trade.session.add(trade)
+            trades.append(trade)
+        Trade.commit()
+
+        rng = np.random.default_rng(args.seed)
+        # Kurzy kolem open_rate (-15 % .. +5 %) - adjust_trade_position projde i větví DCA
+        moves = rng.uniform(0.85, 1.05, args.calls)
+        now = datetime.now(timezone.utc)
+        calls = {
+            'custom_exit': lambda trade, rate: strategy.custom_exit(
+                trade.pair, trade, now, rate, trade.calc_profit_ratio(rate)),
+            'adjust_trade_position': lambda trade, rate: strategy.adjust_trade_position(
+                trade, now, rate, trade.calc_profit_ratio(rate), 5.0, 1000.0, rate, rate,
+                trade.calc_profit_ratio(rate), trade.calc_profit_ratio(rate)),
+            'confirm_trade_exit': lambda trade, rate: strategy.confirm_trade_exit(
+                trade.pair, trade, 'market', trade.amount, rate, 'GTC', 'exit_signal', now),
+            'leverage': lambda trade, rate: strategy.leverage(
+                trade.pair, now, rate, 1.0, 10.0, None, 'long'),
+            'custom_stake_amount': lambda trade, rate: strategy.custom_stake_amount(
+                pair=trade.pair, current_time=now, current_rate=rate, proposed_stake=100.0,
+                min_stake=5.0, max_stake=1000.0, leverage=1.0, entry_tag=None, side='long'),
+        }
+        for name in CALLBACKS:
+            call = calls[name]
+            start = time.perf_counter()
+            for i, move in enumerate(moves):
+                trade = trades[i % len(trades)]
+                call(trade, trade.open_rate * move)
+            timings[name] = time.perf_counter() - start
+        strategy.flush_trade_state()
+        Trade.session.remove()
+
+    return best_of(args.repeat, run)
+
+
+def bench_backtest(args, n_pairs, rows):
+    """Signály strategie + DCA žebřík přes všechny páry najednou (bez freqtrade backtestu a burzy)."""
+    from freqtrade.enums import RunMode
+
+    sys.path.insert(0, str(SCRIPT_DIR))
+    from dca_simulator import simulate_dca
+
+    frames = make_pairs(n_pairs, rows, args.seed, args.timeframe)
+    strategy = load_strategy(args.strategy_file, RunMode.BACKTEST, args.timeframe, args.compact, not args.no_batch)
+
+    def run(timings):
+        start = time.perf_counter()
+        analyzed = list(populate(strategy, frames).values())
+        ohlc = {c: np.vstack([df[c].values for df in analyzed]) for c in ('open', 'high', 'low', 'close')}
+        entries = np.vstack([df['enter_long'].fillna(0).values.astype(bool) for df in analyzed])
+        signal = np.vstack([df['res_signal_breaked'].values.astype(bool) for df in analyzed])
+        simulate_dca(ohlc['open'], ohlc['high'], ohlc['low'], ohlc['close'], entries=entries, signal=signal,
+                     take_profit=strategy.minimal_roi['0'])
+        timings['total'] = time.perf_counter() - start
+
+    return best_of(args.repeat, run)
+
+
+def run_benchmarks(args):
+    results = {}
+    for scenario in args.scenarios:
+        started = time.perf_counter()
+        if scenario in FRAME_SCENARIOS:
+            timings = bench_frames(args, *FRAME_SCENARIOS[scenario])
+        elif scenario == 'callbacks':
+            timings = bench_callbacks(args)
+        else:
+            timings = bench_backtest(args, *BACKTEST_SCENARIO[1:])
+        for stage, seconds in timings.items():
+            results[f"{scenario}/{stage}"] = seconds
+        print(f"  {scenario:<18} {time.perf_counter() - started:8.1f}s", file=sys.stderr)
+    return results
+
+
+def environment():
+    import freqtrade
+
+    return {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'freqtrade': freqtrade.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def metric_unit(name):
+    # memory_mb je v MB, ostatní výsledky jsou časy v sekundách
+    return 'MB' if name.endswith('memory_mb') else 's'
+
+
+def compare(results, baseline, threshold, min_delta, min_delta_mb):
+    """
+    Vypíše srovnání s baseline, vrací seznam regresí: delta > threshold % a zároveň absolutně
+    > min_delta s (časy) nebo > min_delta_mb MB (paměť).
+    """
+    regressions = []
+    print(f"{'benchmark':<44}{'baseline':>12}{'current':>12}{'unit':>5}{'delta':>9}")
+    for name, value in results.items():
+        unit = metric_unit(name)
+        base = baseline['results'].get(name)
+        if base is None:
+            print(f"{name:<44}{'-':>12}{value:>12.4f}{unit:>5}{'new':>9}")
+            continue
+        delta = (value - base) / base * 100 if base > 0 else 0.0
+        regressed = delta > threshold and value - base > (min_delta_mb if unit == 'MB' else min_delta)
+        mark = '  REGRESSION' if regressed else ''
+        print(f"{name:<44}{base:>12.4f}{value:>12.4f}{unit:>5}{delta:>+8.1f}%{mark}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def self_test(args, window=1_000, candles=600):
+    """
+    Inkrementální indikátory (dry-run) proti plnému přepočtu na posuvném okně.
+
+    Okno window svíček se posouvá o 1-3 svíčky (populate_indicators_incremental / step_indicators /
+    step_window_indicators), jednou o víc než incremental_max_new_candles a jednou s přepsanou
+    historií (oba případy musí spadnout do plného přepočtu). Reference je plný přepočet od
+    svíčky, kde se inkrementální stav naposledy seedoval - rekurze (EMA/RSI/ATR/MACD) pak mají
+    stejný začátek. Jen max_since_buy se váže na začátek okna.
+    """
+    from freqtrade.enums import RunMode
+
+    pair = 'P000/USDT:USDT'
+    data = make_ohlcv(window + candles, args.seed, args.timeframe)
+    live = load_strategy(args.strategy_file, RunMode.DRY_RUN, args.timeframe, args.compact, not args.no_batch)
+    full = load_strategy(args.strategy_file, RunMode.BACKTEST, args.timeframe, args.compact, not args.no_batch)
+    steps = {'incremental': 0, 'full': 0}
+    step_indicators, seed_indicator_state = live.step_indicators, live.seed_indicator_state
+
+    def counted_step(*a):
+        steps['incremental'] += 1
+        return step_indicators(*a)
+
+    def counted_seed(*a):
+        steps['full'] += 1
+        return seed_indicator_state(*a)
+
+    live.step_indicators, live.seed_indicator_state = counted_step, counted_seed
+
+    def analyze(strategy, frame):
+        metadata = {'pair': pair}
+        frame = strategy.populate_indicators(frame.reset_index(drop=True), metadata)
+        frame = strategy.populate_entry_trend(frame, metadata)
+        return strategy.populate_exit_trend(frame, metadata)
+
+    def matches(frame, anchor):
+        result = analyze(live, frame)
+        full.informative_cache.clear()
+        reference = analyze(full, data.iloc[anchor:end]).iloc[-window:].reset_index(drop=True)
+        reference['max_since_buy'] = np.maximum.accumulate(frame['high'].values)
+        indicators = [name for name in result.columns if name not in
+                      ('date', 'open', 'high', 'low', 'close', 'volume', 'enter_long', 'enter_tag',
+                       'exit_long', 'exit_tag')]
+        close = all(np.allclose(result[name].values.astype(float), reference[name].values.astype(float),
+                                rtol=1e-6, atol=1e-9, equal_nan=True) for name in indicators)
+        signals = [np.array_equal(result[name].fillna(0).values, reference[name].fillna(0).values)
+                   for name in ('enter_long', 'exit_long')]
+        return close, signals[0], signals[1]
+
+    rng = np.random.default_rng(args.seed)
+    gap = live.incremental_max_new_candles + 1
+    results = []
+    anchor, end = 0, window
+    while end <= len(data) - gap - 1:
+        results.append(matches(data.iloc[end - window:end], anchor))
+        end += int(rng.integers(1, 4))
+    checks = {
+        'incremental path used': steps['incremental'] == len(results) - 1 and steps['full'] == 1,
+        'indicators allclose to full recompute': all(r[0] for r in results),
+        'enter_long identical': all(r[1] for r in results),
+        'exit_long identical': all(r[2] for r in results),
+    }
+
+    # Skok o víc než incremental_max_new_candles => plný přepočet nad oknem
+    end = len(data) - 1
+    full_runs = steps['full']
+    jumped = matches(data.iloc[end - window:end], end - window)
+    checks['gap > incremental_max_new_candles recomputes'] = steps['full'] == full_runs + 1 and all(jumped)
+
+    # Přepsaná svíčka v překryvu (burza opravila historii) => plný přepočet
+    data = data.copy()
+    data.loc[end - 10, 'close'] *= 1.001
+    end += 1
+    full_runs = steps['full']
+    rewritten = matches(data.iloc[end - window:end], end - window)
+    checks['rewritten history recomputes'] = steps['full'] == full_runs + 1 and all(rewritten)
+
+    # Pár vyřazený z whitelistu (bez otevřeného tradu) => bot_loop_start zahodí jeho per-pair stav
+    from freqtrade.persistence import init_db
+    init_db('sqlite://')
+    caches = (live.indicator_state, live.volatility_state, live.informative_cache)
+    live.dp = SimpleNamespace(current_whitelist=lambda: [pair])
+    live.prune_pair_caches()
+    kept = all(caches)
+    live.dp = SimpleNamespace(current_whitelist=lambda: [])
+    live.prune_pair_caches()
+    checks['removed pair caches pruned'] = kept and not any(caches)
+
+    for name, ok in checks.items():
+        print(f"{'OK  ' if ok else 'FAIL'} {name}")
+    return 0 if all(checks.values()) else 1
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="DailyBuyStrategy3_5_JPA micro-benchmarks with regression gate")
+    parser.add_argument('--strategy-file', dest='strategy_file',
+                        default=str(SCRIPT_DIR / 'DailyBuyStrategy3_5_JPA_TEMPLATE.py'))
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument('--timeframe', default='5m')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--compact', action='store_true', help="kompaktní dataframe strategie (float32)")
+    parser.add_argument('--no-batch', dest='no_batch', action='store_true',
+                        help="indikátory po jednom páru místo cross-pair batche")
+    parser.add_argument('--calls', type=int, default=2000, help="volání každého callbacku na běh")
+    parser.add_argument('--save', default=None, help="uloží výsledky jako baseline JSON")
+    parser.add_argument('--compare', default=None, help="baseline JSON pro srovnání")
+    parser.add_argument('--threshold', type=float, default=20.0, help="max. povolené zpomalení v %%")
+    parser.add_argument('--min-delta', dest='min_delta', type=float, default=0.001,
+                        help="s - menší absolutní zpomalení se nepočítá jako regrese (šum)")
+    parser.add_argument('--min-delta-mb', dest='min_delta_mb', type=float, default=0.5,
+                        help="MB - menší absolutní nárůst memory_mb se nepočítá jako regrese")
+    parser.add_argument('--self-test', dest='self_test', action='store_true',
+                        help="inkrementální (dry-run) indikátory proti plnému přepočtu, exit 1 při rozdílu")
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    if args.self_test:
+        return self_test(args)
+    print(f"Benchmark {len(args.scenarios)} scenarios, repeat {args.repeat}, seed {args.seed}", file=sys.stderr)
+    results = run_benchmarks(args)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'meta': {**environment(), 'seed': args.seed, 'repeat': args.repeat, 'calls': args.calls,
+                                'timeframe': args.timeframe, 'compact': args.compact,
+                                'no_batch': args.no_batch}, 'results': results}, f, indent=2)
+            f.write('\n')
+        print(f"Baseline saved to {args.save}", file=sys.stderr)
+
+    if not args.compare:
+        for name, value in results.items():
+            print(f"{name:<44}{value:>12.4f} {metric_unit(name)}")
+        return 0
+
+    try:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    except Exception as e:
+        logging.error(f"Error reading baseline {args.compare}: {e}")
+        return 2
+    meta = baseline.get('meta', {})
+    for key in ('seed', 'calls', 'timeframe', 'compact', 'no_batch'):
+        if key in meta and meta[key] != getattr(args, key):
+            print(f"Warning: baseline {key}={meta[key]} differs from current {getattr(args, key)}", file=sys.stderr)
+    regressions = compare(results, baseline, args.threshold, args.min_delta, args.min_delta_mb)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0f} %: {', '.join(regressions)}")
+        return 1
+    print(f"\nNo regression over {args.threshold:.0f} %")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Sdílený svíčkový store na nodu - jediný zapisovatel pro všechny Daily boty.
+
+Proces stahuje z burzy uzavřené svíčky pro páry × timeframy celé flotily a připisuje je
+do memory-mapped sloupcových souborů. Boty (DailyBuyStrategy3_5_JPA, SharedCandleStore)
+soubory mapují read-only a místo vlastního stahování z Bybitu čtou zero-copy pohledy.
+
+Formát série (<root>/<pair>-<timeframe>-<candle_type>):
+  - <série>.gNNNN.npy  float64 pole (sloupce, kapacita), date jako int64 ns
+  - <série>.json       {"file", "length", "columns", "date_unit", "capacity"}
+    (date_unit = rozlišení, ve kterém čtenář date vrací - stejné jako dataframe freqtrade)
+Zápis: nejdřív se zapíšou a flushnou nové řádky, pak se .json atomicky přepíše (os.replace).
+Čtenář tak vidí vždy jen kompletní řádky. Při zaplnění kapacity vznikne nová generace
+s posledními --keep svíčkami; stará se smaže (otevřené mmapy čtenářů zůstávají platné).
+
+Použití (uvnitř freqtrade prostředí):
+    python3 candle_store.py --root /freqtrade/candle_store --exchange bybit \\
+        --pairs BTC/USDT:USDT ETH/USDT:USDT --timeframes 5m 15m 1h 4h 1d 1w
+"""
+import argparse
+import fcntl
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger("candle_store")
+
+COLUMNS = ['date', 'open', 'high', 'low', 'close', 'volume']
+
+
+def series_name(pair, timeframe, candle_type):
+    # Stejné pojmenování jako SharedCandleStore.series_name ve strategii
+    return f"{pair.replace('/', '_').replace(':', '_')}-{timeframe}-{candle_type}"
+
+
+class CandleStoreWriter:
+    def __init__(self, root, keep=5000):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.keep = keep
+        self.buffers = {}
+        # Jediný zapisovatel na store - druhý proces skončí hned při startu
+        self.lock_file = (self.root / '.writer.lock').open('w')
+        try:
+            fcntl.flock(self.lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise RuntimeError(f"Another candle store writer is running on {self.root}")
+
+    def meta(self, name):
+        path = self.root / f"{name}.json"
+        if not path.is_file():
+            return None
+        with path.open() as f:
+            return json.load(f)
+
+    def write_meta(self, name, meta):
+        path = self.root / f"{name}.json"
+        tmp_path = path.with_suffix('.tmp')
+        with tmp_path.open('w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, path)
+
+    def buffer(self, name, meta):
+        cached = self.buffers.get(name)
+        if cached is None or cached[0] != meta['file']:
+            cached = (meta['file'], np.load(self.root / meta['file'], mmap_mode='r+'))
+            self.buffers[name] = cached
+        return cached[1]
+
+    def last_date(self, pair, timeframe, candle_type):
+        name = series_name(pair, timeframe, candle_type)
+        meta = self.meta(name)
+        if not meta or not meta['length']:
+            return None
+        return int(self.buffer(name, meta)[0, meta['length'] - 1].view(np.int64))
+
+    def rewrite(self, name, meta, rows, date_unit):
+        """Nová generace souboru s posledními `keep` řádky starých dat + novými řádky."""
+        if meta:
+            old = np.array(self.buffer(name, meta)[:, max(0, meta['length'] - self.keep):meta['length']])
+            rows = np.concatenate([old, rows], axis=1)
+            generation = int(meta['file'].rsplit('.g', 1)[1].split('.')[0]) + 1
+        else:
+            generation = 0
+        capacity = max(2 * self.keep, rows.shape[1] + self.keep)
+        file_name = f"{name}.g{generation:04d}.npy"
+        buffer = np.lib.format.open_memmap(self.root / file_name, mode='w+', dtype=np.float64,
+                                           shape=(len(COLUMNS), capacity))
+        buffer[:, :rows.shape[1]] = rows
+        buffer.flush()
+        self.buffers[name] = (file_name, buffer)
+        self.write_meta(name, {'file': file_name, 'length': rows.shape[1], 'columns': COLUMNS,
+                               'date_unit': date_unit, 'capacity': capacity})
+        if meta:
+            (self.root / meta['file']).unlink(missing_ok=True)
+
+    def append(self, pair, timeframe, candle_type, dataframe):
+        """Připíše uzavřené svíčky novější než poslední uložená. Vrací počet nových řádků."""
+        name = series_name(pair, timeframe, candle_type)
+        meta = self.meta(name)
+        dates = dataframe['date'].values.astype('datetime64[ns]').view(np.int64)
+        last = self.last_date(pair, timeframe, candle_type)
+        new = dates > last if last is not None else np.ones(len(dates), dtype=bool)
+        if not new.any():
+            return 0
+        rows = np.empty((len(COLUMNS), int(new.sum())), dtype=np.float64)
+        rows[0].view(np.int64)[:] = dates[new]
+        for i, column in enumerate(COLUMNS[1:], start=1):
+            rows[i] = dataframe[column].values[new]
+
+        if meta is None or meta['length'] + rows.shape[1] > meta['capacity']:
+            self.rewrite(name, meta, rows, dataframe['date'].dt.unit)
+        else:
+            buffer = self.buffer(name, meta)
+            buffer[:, meta['length']:meta['length'] + rows.shape[1]] = rows
+            buffer.flush()
+            meta['length'] += rows.shape[1]
+            self.write_meta(name, meta)
+        return rows.shape[1]
+
+
+def build_exchange(args):
+    from freqtrade.enums import CandleType, RunMode
+    from freqtrade.resolvers import ExchangeResolver
+
+    config = {
+        'runmode': RunMode.DRY_RUN,
+        'dry_run': True,
+        'trading_mode': args.trading_mode,
+        'margin_mode': 'isolated' if args.trading_mode == 'futures' else '',
+        'candle_type_def': CandleType.get_default(args.trading_mode),
+        'stake_currency': args.stake_currency,
+        'timeframe': args.timeframes[0],
+        'exchange': {'name': args.exchange, 'key': '', 'secret': '', 'pair_whitelist': args.pairs,
+                     'ccxt_config': {}, 'ccxt_async_config': {}},
+    }
+    return ExchangeResolver.load_exchange(config, validate=False, load_leverage_tiers=False)
+
+
+def stale_series(writer, pairs, timeframes, candle_type, now):
+    """(pair, timeframe, candle_type), kterým ve storu chybí poslední uzavřená svíčka."""
+    from freqtrade.exchange import timeframe_to_prev_date, timeframe_to_seconds
+
+    stale = []
+    for timeframe in timeframes:
+        last_closed = timeframe_to_prev_date(timeframe, now).timestamp() - timeframe_to_seconds(timeframe)
+        for pair in pairs:
+            last = writer.last_date(pair, timeframe, candle_type.value)
+            if last is None or last // 10**9 < last_closed:
+                stale.append((pair, timeframe, candle_type))
+    return stale
+
+
+def run(args):
+    from freqtrade.enums import CandleType
+    from freqtrade.exchange import timeframe_to_next_date
+    from freqtrade.util import dt_now
+
+    writer = CandleStoreWriter(args.root, args.keep)
+    exchange = build_exchange(args)
+    candle_type = CandleType.get_default(args.trading_mode)
+    logger.info(f"Candle store {args.root}: {len(args.pairs)} pairs x {args.timeframes}")
+    while True:
+        try:
+            stale = stale_series(writer, args.pairs, args.timeframes, candle_type, dt_now())
+            if stale:
+                frames = exchange.refresh_latest_ohlcv(stale, drop_incomplete=True)
+                for (pair, timeframe, c_type), dataframe in frames.items():
+                    added = writer.append(pair, timeframe, c_type.value, dataframe)
+                    if added:
+                        logger.info(f"{pair} {timeframe}: +{added} candles")
+        except Exception as e:
+            logging.error(f"Candle store update failed: {e}")
+        if args.once:
+            return 0
+        now = dt_now()
+        if stale_series(writer, args.pairs, args.timeframes, candle_type, now):
+            # Burza poslední svíčku ještě nevrátila (nebo chyba) - krátký retry
+            time.sleep(args.retry)
+            continue
+        # Další probuzení: nejbližší uzavření svíčky + prodleva, než ji burza vrátí
+        wake = min(timeframe_to_next_date(tf, now) for tf in args.timeframes)
+        time.sleep((wake - now).total_seconds() + args.delay)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Single-writer shared candle store for the bot fleet")
+    parser.add_argument('--root', default=os.environ.get('FT_CANDLE_STORE', '/freqtrade/candle_store'))
+    parser.add_argument('--exchange', default='bybit')
+    parser.add_argument('--trading-mode', dest='trading_mode', default='futures')
+    parser.add_argument('--stake-currency', dest='stake_currency', default='USDT')
+    parser.add_argument('--pairs', nargs='+', required=True)
+    parser.add_argument('--timeframes', nargs='+', default=['5m', '15m', '1h', '4h', '1d', '1w'])
+    parser.add_argument('--keep', type=int, default=5000, help="svíček na sérii po kompakci")
+    parser.add_argument('--delay', type=float, default=3.0, help="s po uzavření svíčky")
+    parser.add_argument('--retry', type=float, default=10.0, help="s mezi pokusy, když burza svíčku ještě nemá")
+    parser.add_argument('--once', action='store_true', help="jedna aktualizace a konec")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(message)s")
+    sys.exit(run(parse_args(sys.argv[1:])))
@@ -0,0 +1,518 @@
+#!/usr/bin/env python3
+"""
+Vektorizovaný simulátor DCA žebříku DailyBuyStrategy3_5_JPA pro rychlý screening parametrů.
+
+Kopíruje logiku strategie bez freqtrade backtestu:
+  - vstupní stake jako custom_stake_amount (balance * 0.5 / 2 / (max_dca_count + 1) * stake_amount_coef)
+  - trigger jako adjust_trade_position na open svíčky: ztráta (s poplatky) pod thresholdem páru,
+    cena < 99 % posledního DCA, index předchozí svíčky % dca_candles_modulo == 0
+    a res_signal_breaked na předchozí (poslední uzavřené) svíčce
+  - threshold jako self.thresholds strategie: per pár od 1 %, po DCA 3 %, 5 %, ...
+    (calculate_dca_amount_and_threshold), zpět na 1 % až exitem potvrzeným v confirm_trade_exit;
+    parametr dca_threshold strategie nepoužívá, simulátor proto také ne
+  - výše DCA jako calculate_dca_amount_and_threshold z volných prostředků (sizing='wallet')
+  - stop po DCA jako set_mk_sl / custom_exit (open <= cena DCA * new_sl_coef) se jen počítá -
+    confirm_trade_exit strategie exit custom_stop_loss odmítá a trade běží dál
+    (stop_exits=True ho pro screening opravdu zavře)
+  - počet DCA strategie nijak neomezuje (max_dca_count jen dělí vstupní stake),
+    strop max_dca je jen volitelný pro screening
+
+Výše DCA (sizing):
+  'wallet' - 0.2 * volné prostředky * 0.8 ** level (přesně jako adjust_trade_position, default)
+  'ladder' - k-tý DCA = vstupní stake * dca_inc ** k (žebřík generate_dca_orders - strategie ho
+             neobchoduje, slouží jen pro screening dca_inc)
+
+Nemodeluje se: trailing a stoploss freqtrade (jen přes exits), ROI jen na close (take_profit), likvidace,
+funding fees, min/max stake burzy a zaokrouhlení amount. Shodu se strategií ověří
+--check-backtest nad výsledkem freqtrade backtestu (vstupy a exity se převezmou z backtestu).
+
+Screening (vstupy = enter_long strategie, take profit = její minimal_roi na close):
+    python3 dca_simulator.py <data_dir> <timeframe> [param=v1,v2,... ...]
+    python3 dca_simulator.py user_data/data/bybit/futures 5m stake_amount_coef=0.5,1 new_sl_coef=0.7,0.8
+    python3 dca_simulator.py user_data/data/bybit/futures 5m dca_inc=1.2,1.5,2 --sizing ladder
+    python3 dca_simulator.py user_data/data/bybit/futures 5m --entries always --take-profit 0.02
+    python3 dca_simulator.py --check-backtest <backtest-result.zip> <data_dir> <startup_candle_count>
+"""
+import argparse
+import itertools
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Defaulty parametrů strategie (viz DailyBuyStrategy3_5_JPA_TEMPLATE.py)
+DEFAULT_PARAMS = {
+    'dca_inc': 1.5,
+    'max_dca_count': 10,
+    'dca_candles_modulo': 3,
+    'new_sl_coef': 0.75,
+    'stake_amount_coef': 1.0,
+    'leverage': 1.0,
+}
+# Počáteční threshold páru (self.thresholds.get(pair, 0.01) v adjust_trade_position)
+INITIAL_THRESHOLD = 0.01
+
+
+def res_signal_breaked(high, low, close):
+    """Close nad R1 (pivot z předchozí svíčky) a zároveň nad předchozím close - jako ve strategii."""
+    prev_high = np.roll(high, 1, axis=-1)
+    prev_low = np.roll(low, 1, axis=-1)
+    prev_close = np.roll(close, 1, axis=-1)
+    r1 = 2 * (prev_high + prev_low + prev_close) / 3 - prev_low
+    signal = (close > r1) & (close > prev_close)
+    signal[..., 0] = False
+    return signal
+
+
+def expand_params(params, n_sets=None):
+    """Doplní defaulty a převede každý parametr na 1-D pole délky n_sets (skaláry se rozkopírují)."""
+    merged = {**DEFAULT_PARAMS, **(params or {})}
+    lengths = {np.size(v) for v in merged.values() if np.ndim(v) > 0}
+    if n_sets is None:
+        n_sets = max(lengths) if lengths else 1
+    if lengths - {n_sets}:
+        raise ValueError(f"Parameter arrays must have the same length, got {sorted(lengths)}")
+    return {k: np.broadcast_to(np.asarray(v, dtype=float), (n_sets,)).copy() for k, v in merged.items()}
+
+
+def simulate_dca(open_, high, low, close, params=None, entries=None, signal=None,
+                 wallet=5000.0, min_stake=30.0, take_profit=None, sizing='wallet',
+                 exits=None, entry_leverage=None, fee=0.0, index_offset=0, max_dca=None,
+                 tradable_balance_ratio=1.0, stop_exits=False, exit_profit=None):
+    """
+    Simuluje DCA žebřík pro P párů × N sad parametrů najednou.
+
+    Pořadí na svíčce jako ve freqtrade backtestu: vstup na open, adjust_trade_position (DCA)
+    na open, custom_exit (stop po DCA) / exits na open, volitelný take profit na close.
+    Exity (exits, take profit) se berou jako potvrzené confirm_trade_exit - vynulují threshold páru.
+
+    :param open_, high, low, close: pole (P, T) nebo (T,); NaN = chybějící svíčka páru
+    :param params: dict název -> skalár nebo pole (N,), chybějící se doplní z DEFAULT_PARAMS
+    :param entries: bool (P, T) vstupní signály (vstup na open další svíčky),
+                    None = jeden trade per pár od první svíčky
+    :param signal: bool (P, T) res_signal_breaked, None = spočítá se z OHLC
+    :param wallet: počáteční balance (dry_run_wallet), roste o realizovaný zisk
+    :param take_profit: profit ratio na close, při kterém se trade uzavře (None = bez TP), nebo
+                        ROI tabulka {svíčky od vstupu: profit ratio} (minimal_roi převedená na svíčky)
+    :param sizing: 'wallet' nebo 'ladder', viz docstring modulu
+    :param exits: bool (P, T) vynucený exit na open svíčky (např. exity z backtestu)
+    :param exit_profit: (P, T) realizovaný zisk exitů z exits (profit_abs backtestu včetně ceny
+                        exitu ROI/trailing a funding fees), None = zisk na open svíčky
+    :param entry_leverage: (P, T) leverage tradu otevřeného na svíčce, None = parametr leverage
+    :param fee: poplatek za stranu, ztráta pro trigger DCA je s poplatky jako trade.calc_profit_ratio
+    :param index_offset: index první svíčky v dataframe strategie (skalár nebo (P,)) pro dca_candles_modulo
+    :param max_dca: volitelný strop počtu DCA na trade (strategie žádný nemá)
+    :param tradable_balance_ratio: podíl balance k obchodování (get_total_stake_amount)
+    :param stop_exits: stop po DCA trade zavře (strategie ho v confirm_trade_exit odmítá)
+    :return: dict polí (N, P): trades, fills, stop_hits, take_profits, avg_entry a entry_rate
+             (průměrná a vstupní cena posledního tradu), max_stake, profit (realizovaný zisk),
+             unrealized (zisk otevřeného tradu na poslední close), open (trade otevřený na konci
+             dat), threshold (poslední threshold páru);
+             fill_log = seznam (svíčka, sada, pár, stake) všech DCA
+    """
+    open_, high, low, close = (np.atleast_2d(np.asarray(a, dtype=float)) for a in (open_, high, low, close))
+    n_pairs, n_candles = close.shape
+    if signal is None:
+        signal = res_signal_breaked(high, low, close)
+    signal = np.atleast_2d(np.asarray(signal, dtype=bool))
+    if entries is not None:
+        entries = np.atleast_2d(np.asarray(entries, dtype=bool))
+    if exits is not None:
+        exits = np.atleast_2d(np.asarray(exits, dtype=bool))
+    if entry_leverage is not None:
+        entry_leverage = np.atleast_2d(np.asarray(entry_leverage, dtype=float))
+    if exit_profit is not None:
+        exit_profit = np.atleast_2d(np.asarray(exit_profit, dtype=float))
+    index_offset = np.broadcast_to(np.asarray(index_offset, dtype=np.int64), (n_pairs,))
+
+    p = expand_params(params)
+    n_sets = len(p['dca_inc'])
+    col = {k: v[:, None] for k, v in p.items()}  # (N, 1) pro broadcasting přes páry
+
+    shape = (n_sets, n_pairs)
+    balance = np.full((n_sets, 1), float(wallet))
+    in_trade = np.zeros(shape, dtype=bool)
+    stake = np.zeros(shape)
+    entry_stake = np.zeros(shape)
+    amount = np.zeros(shape)
+    leverage = np.ones(shape)
+    last_dca = np.full(shape, np.nan)
+    stop = np.full(shape, -np.inf)
+    threshold = np.full(shape, INITIAL_THRESHOLD)
+    dca_count = np.zeros(shape)
+    out = {k: np.zeros(shape, dtype=int) for k in ('trades', 'fills', 'stop_hits', 'take_profits')}
+    out['avg_entry'] = np.full(shape, np.nan)
+    out['entry_rate'] = np.full(shape, np.nan)
+    out['max_stake'] = np.zeros(shape)
+    out['profit'] = np.zeros(shape)
+    opened = np.zeros(shape, dtype=np.int64)
+    if isinstance(take_profit, dict):
+        roi_candles = np.array(sorted(take_profit), dtype=np.int64)
+        roi_ratios = np.array([take_profit[k] for k in sorted(take_profit)], dtype=float)
+    out['fill_log'] = []
+    started = np.zeros(shape, dtype=bool)
+    pending_entry = np.zeros(n_pairs, dtype=bool)
+    # DCA může nastat jen po svíčce se signálem alespoň u jednoho páru - ostatní svíčky se přeskočí
+    signal_any = signal.any(axis=0)
+
+    def profit_ratio(price):
+        # trade.calc_profit_ratio: (close_value / open_value - 1) * leverage, poplatek na obou stranách
+        open_value = np.where(in_trade, stake, np.nan) * (1 + fee)
+        return (amount * price * (1 - fee) / open_value - 1) * leverage
+
+    def close_trades(closed, price, realized=None):
+        nonlocal balance, in_trade, threshold
+        profit = np.where(closed, stake * profit_ratio(price) if realized is None else realized, 0.0)
+        balance = balance + profit.sum(axis=1, keepdims=True)
+        out['profit'] += profit
+        # confirm_trade_exit -> reset_trade_state: další trade páru začíná na 1 %
+        threshold = np.where(closed, INITIAL_THRESHOLD, threshold)
+        out['avg_entry'] = np.where(closed, stake / np.where(amount > 0, amount, np.nan), out['avg_entry'])
+        in_trade = in_trade & ~closed
+
+    for t in range(n_candles):
+        rate = open_[:, t]
+        valid = ~np.isnan(rate) & ~np.isnan(close[:, t])
+
+        # Vstup na open svíčky (signál z předchozí svíčky nebo začátek dat)
+        if entries is None:
+            enter = ~in_trade & ~started & valid[None, :]
+        else:
+            enter = ~in_trade & (pending_entry & valid)[None, :]
+        if enter.any():
+            # custom_stake_amount z celkových prostředků (včetně realizovaného zisku)
+            initial_stake = np.maximum(balance * tradable_balance_ratio * 0.5 / 2.0
+                                       / (col['max_dca_count'] + 1) * col['stake_amount_coef'], min_stake)
+            entry_lev = col['leverage'] if entry_leverage is None else entry_leverage[:, t][None, :]
+            in_trade |= enter
+            entry_stake = np.where(enter, initial_stake, entry_stake)
+            stake = np.where(enter, entry_stake, stake)
+            amount = np.where(enter, entry_stake / rate[None, :], amount)
+            leverage = np.where(enter, entry_lev, leverage)
+            last_dca = np.where(enter, np.nan, last_dca)
+            stop = np.where(enter, -np.inf, stop)
+            dca_count = np.where(enter, 0, dca_count)
+            opened = np.where(enter, t, opened)
+            out['entry_rate'] = np.where(enter, rate[None, :], out['entry_rate'])
+            started |= enter
+            out['trades'] += enter
+            out['max_stake'] = np.maximum(out['max_stake'], np.where(enter, stake, 0))
+        if entries is not None:
+            pending_entry = entries[:, t] & valid
+
+        # DCA trigger - stejné pořadí podmínek jako adjust_trade_position
+        if t > 0 and signal_any[t - 1]:
+            can_dca = (in_trade & valid[None, :]
+                       & ~(rate[None, :] >= last_dca * 0.99)
+                       & (profit_ratio(rate[None, :]) < -threshold)
+                       & ((t - 1 + index_offset[None, :]) % col['dca_candles_modulo'] == 0)
+                       & signal[None, :, t - 1])
+            if max_dca is not None:
+                can_dca &= dca_count < max_dca
+            # Páry po jednom jako freqtrade - DCA prvního páru sníží volné prostředky dalšího
+            for pair in np.flatnonzero(can_dca.any(axis=0)):
+                fire = can_dca[:, pair]
+                level = np.floor((threshold[:, pair] * 100 - 1) // 2)
+                if sizing == 'wallet':
+                    # get_available_stake_amount: prostředky k obchodování minus stake otevřených tradů
+                    free = balance[:, 0] * tradable_balance_ratio - np.where(in_trade, stake, 0).sum(axis=1)
+                    dca_stake = 0.2 * np.maximum(free, 0) * 0.8 ** level
+                else:
+                    dca_stake = entry_stake[:, pair] * p['dca_inc'] ** (dca_count[:, pair] + 1)
+                price = rate[pair]
+                stake[:, pair] = np.where(fire, stake[:, pair] + dca_stake, stake[:, pair])
+                amount[:, pair] = np.where(fire, amount[:, pair] + dca_stake / price, amount[:, pair])
+                last_dca[:, pair] = np.where(fire, price, last_dca[:, pair])
+                stop[:, pair] = np.where(fire, price * p['new_sl_coef'], stop[:, pair])
+                threshold[:, pair] = np.where(fire, (1 + 2 * (level + 1)) / 100, threshold[:, pair])
+                dca_count[:, pair] += fire
+                out['fills'][:, pair] += fire
+                out['max_stake'][:, pair] = np.maximum(out['max_stake'][:, pair], np.where(fire, stake[:, pair], 0))
+                out['fill_log'].extend((t, i, pair, dca_stake[i]) for i in np.flatnonzero(fire))
+
+        # Exit na open: custom stop po DCA (custom_exit) a vynucené exity
+        if exits is not None or out['fills'].any():
+            price = rate[None, :]
+            active = in_trade & valid[None, :]
+            stopped = active & (price <= stop)
+            out['stop_hits'] += stopped
+            closed = stopped if stop_exits else np.zeros(shape, dtype=bool)
+            realized = None
+            if exits is not None:
+                closed = closed | (active & exits[None, :, t])
+                if exit_profit is not None:
+                    realized = np.where(exits[None, :, t], exit_profit[:, t][None, :], stake * profit_ratio(price))
+            if closed.any():
+                close_trades(closed, price, realized)
+
+        # Volitelný take profit na close (ROI tabulka podle stáří tradu jako minimal_roi)
+        if take_profit is not None:
+            price = close[:, t][None, :]
+            if isinstance(take_profit, dict):
+                step = np.searchsorted(roi_candles, t - opened, side='right') - 1
+                target = np.where(step >= 0, roi_ratios[np.maximum(step, 0)], np.inf)
+            else:
+                target = take_profit
+            tp = in_trade & valid[None, :] & (profit_ratio(price) >= target)
+            out['take_profits'] += tp
+            if tp.any():
+                close_trades(tp, price)
+
+    out['avg_entry'] = np.where(in_trade, stake / np.where(amount > 0, amount, np.nan), out['avg_entry'])
+    # Poslední platná close páru (na konci dat může pár chybět)
+    last_close = np.array([row[~np.isnan(row)][-1] if (~np.isnan(row)).any() else np.nan for row in close])
+    out['unrealized'] = np.where(in_trade, stake * profit_ratio(last_close[None, :]), 0.0)
+    out['open'] = in_trade
+    out['threshold'] = threshold
+    return out
+
+
+def load_ohlcv(data_dir, timeframe, pairs=None):
+    """Načte feather soubory freqtrade a zarovná je podle data do polí (P, T), 'date' = společný index."""
+    import pandas as pd
+
+    files = sorted(Path(data_dir).glob(f"*-{timeframe}*.feather"))
+    frames = {}
+    for path in files:
+        pair, _, candle_type = path.stem.partition(f"-{timeframe}")
+        # Mark/funding/index svíčky futures mají stejný prefix - jen obchodované svíčky
+        if candle_type not in ('', '-futures', '-spot'):
+            continue
+        if pairs and pair not in pairs:
+            continue
+        frames[pair] = pd.read_feather(path).set_index('date')
+    if not frames:
+        raise FileNotFoundError(f"No {timeframe} feather data in {data_dir}")
+    index = sorted(set().union(*(df.index for df in frames.values())))
+    arrays = {c: np.vstack([frames[p][c].reindex(index).values for p in frames])
+              for c in ('open', 'high', 'low', 'close', 'volume')}
+    arrays['date'] = pd.DatetimeIndex(index).tz_convert(None).values.astype('datetime64[ms]')
+    return list(frames), arrays
+
+
+def load_strategy(strategy_file, timeframe):
+    """
+    Strategie jako v backtestu: parametry a minimal_roi z <strategie>.json vedle souboru,
+    vyšší timeframe se resampluje z base svíček (bez DataProvideru).
+    """
+    import importlib.util
+
+    from freqtrade.enums import CandleType, RunMode
+
+    strategy_file = Path(strategy_file)
+    spec = importlib.util.spec_from_file_location('dca_simulator_strategy', strategy_file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    strategy_class = module.DailyBuyStrategy3_5_JPA
+    strategy_class.__file__ = str(strategy_file)
+    config = {
+        'runmode': RunMode.BACKTEST,
+        'timeframe': timeframe,
+        'dry_run': True,
+        'stake_currency': 'USDT',
+        'trading_mode': 'futures',
+        'margin_mode': 'isolated',
+        'candle_type_def': CandleType.FUTURES,
+    }
+    strategy = strategy_class(config)
+    strategy.ft_set_special_params_from_file()
+    strategy.ft_load_hyper_params()
+    strategy.timeframe = timeframe
+    strategy.informative_resample = True
+    return strategy
+
+
+def roi_candles(minimal_roi, timeframe):
+    """minimal_roi {minuty: ratio} -> {svíčky od vstupu: ratio} pro take_profit simulate_dca."""
+    from freqtrade.exchange import timeframe_to_minutes
+
+    minutes = timeframe_to_minutes(timeframe)
+    return {-(-int(k) // minutes): float(v) for k, v in minimal_roi.items()}
+
+
+def strategy_entries(strategy, pairs, ohlc):
+    """enter_long strategie (populate_indicators + populate_entry_trend) zarovnaný na pole (P, T)."""
+    import pandas as pd
+
+    entries = np.zeros(ohlc['close'].shape, dtype=bool)
+    for row, pair in enumerate(pairs):
+        valid = ~np.isnan(ohlc['close'][row])
+        frame = pd.DataFrame({'date': pd.DatetimeIndex(ohlc['date'][valid]).tz_localize('UTC'),
+                              **{c: ohlc[c][row][valid] for c in ('open', 'high', 'low', 'close', 'volume')}})
+        metadata = {'pair': pair}
+        frame = strategy.populate_entry_trend(strategy.populate_indicators(frame, metadata), metadata)
+        entries[row, valid] = frame['enter_long'].fillna(0).values == 1
+    return entries
+
+
+def parse_grid(args):
+    grid = {}
+    for arg in args:
+        name, _, values = arg.partition('=')
+        if name not in DEFAULT_PARAMS or not values:
+            raise ValueError(f"Unknown parameter '{arg}', expected one of {sorted(DEFAULT_PARAMS)}")
+        grid[name] = [float(v) for v in values.split(',')]
+    combos = list(itertools.product(*grid.values())) or [()]
+    return {name: np.array([c[i] for c in combos]) for i, name in enumerate(grid)}, len(combos)
+
+
+def check_backtest(result_path, data_dir, startup_candles, overrides=None, tolerance=0.01):
+    """
+    Parita se strategií: přehraje freqtrade backtest (export zip) v simulátoru se stejnými vstupy,
+    exity a leverage tradů a porovná DCA ordery backtestu se simulací: svíčky DCA musí sedět
+    přesně, stake v mediánu do tolerance (jednotlivé ordery posouvá zaokrouhlení amount burzy
+    a trady otevřené na konci backtestu, které export neobsahuje, ale váží volné prostředky).
+    Realizovaný zisk tradů se převezme z backtestu (ROI/trailing ceny a funding fees simulátor
+    nemodeluje), aby volné prostředky pro výši DCA odpovídaly. Parametry strategie a config
+    se berou ze zipu, overrides je přebijí.
+
+    :param startup_candles: startup_candle_count backtestu (log "Strategy using startup_candle_count")
+    :return: 0 = DCA sedí, 1 = rozdíl
+    """
+    import json
+    import zipfile
+
+    from freqtrade.data.btanalysis import load_backtest_stats
+    from freqtrade.exchange import timeframe_to_seconds
+    from freqtrade.misc import pair_to_filename
+
+    stats = load_backtest_stats(result_path)
+    name, result = next(iter(stats['strategy'].items()))
+    with zipfile.ZipFile(result_path) as archive:
+        files = archive.namelist()
+        config = json.loads(archive.read(next(f for f in files if f.endswith('_config.json'))))
+        params_file = next((f for f in files if f.endswith(f'_{name}.json')), None)
+        strategy_params = json.loads(archive.read(params_file))['params'] if params_file else {}
+    params = {k: v for space in ('buy', 'sell') for k, v in (strategy_params.get(space) or {}).items()
+              if k in DEFAULT_PARAMS}
+    params.update(overrides or {})
+
+    trades = result['trades']
+    pairs = sorted({trade['pair'] for trade in trades})
+    names, ohlc = load_ohlcv(data_dir, result['timeframe'], {pair_to_filename(pair) for pair in pairs})
+    rows = [names.index(pair_to_filename(pair)) for pair in pairs]
+    # Stejný rozsah jako backtest: od startup svíček před začátkem do konce timerange
+    timeframe_ms = timeframe_to_seconds(result['timeframe']) * 1000
+    dates = ohlc['date'].astype(np.int64)
+    first = np.searchsorted(dates, result['backtest_start_ts'] - startup_candles * timeframe_ms)
+    last = np.searchsorted(dates, result['backtest_end_ts'], side='right')
+    ohlc = {c: ohlc[c][rows, first:last] for c in ('open', 'high', 'low', 'close')}
+    dates = dates[first:last]
+
+    shape = ohlc['close'].shape
+    entries = np.zeros(shape, dtype=bool)
+    exits = np.zeros(shape, dtype=bool)
+    leverage = np.ones(shape)
+    profit = np.zeros(shape)
+    expected = {}
+    for trade in trades:
+        row = pairs.index(trade['pair'])
+        opened = np.searchsorted(dates, trade['open_timestamp'])
+        entries[row, opened - 1] = True
+        closed = np.searchsorted(dates, trade['close_timestamp'])
+        exits[row, closed] = True
+        profit[row, closed] = trade['profit_abs']
+        leverage[row, opened] = trade['leverage']
+        for order in [o for o in trade['orders'] if o['ft_is_entry']][1:]:
+            expected[(row, int(np.searchsorted(dates, order['order_filled_timestamp'])))] = \
+                order['cost'] / trade['leverage']
+    # Index dataframe strategie začíná první svíčkou páru v načtených datech
+    index_offset = -np.argmax(~np.isnan(ohlc['close']), axis=1)
+
+    out = simulate_dca(ohlc['open'], ohlc['high'], ohlc['low'], ohlc['close'], params=params,
+                       entries=entries, exits=exits, exit_profit=profit, entry_leverage=leverage,
+                       fee=trades[0]['fee_open'] if trades else 0.0, index_offset=index_offset,
+                       wallet=result['starting_balance'],
+                       tradable_balance_ratio=config.get('tradable_balance_ratio', 0.99),
+                       min_stake=config.get('min_stake_amount', 30))
+    simulated = {(pair, t): stake for t, _, pair, stake in out['fill_log']}
+
+    def label(key):
+        return f"{pairs[key[0]]} {np.datetime64(int(dates[key[1]]), 'ms')}"
+
+    missing = sorted(set(expected) - set(simulated))
+    extra = sorted(set(simulated) - set(expected))
+    common = sorted(set(expected) & set(simulated))
+    deviations = np.array([abs(simulated[k] / expected[k] - 1) for k in common] or [0.0])
+    deviation = float(np.median(deviations))
+    print(f"{name}: {len(trades)} tradů, DCA backtest {len(expected)}, simulátor {len(simulated)}, "
+          f"shodná svíčka {len(common)}, odchylka stake medián {100 * deviation:.2f} % "
+          f"/ max {100 * deviations.max():.2f} %")
+    for key in missing[:10]:
+        print(f"  jen backtest:  {label(key)} stake {expected[key]:.4f}")
+    for key in extra[:10]:
+        print(f"  jen simulátor: {label(key)} stake {simulated[key]:.4f}")
+    ok = not missing and not extra and deviation <= tolerance
+    print(f"{'OK  ' if ok else 'FAIL'} parita DCA se strategií "
+          f"(svíčky DCA přesně, medián odchylky stake <= {100 * tolerance:.0f} %)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--check-backtest':
+        if len(sys.argv) < 5:
+            print("Usage: dca_simulator.py --check-backtest <backtest-result.zip> <data_dir> "
+                  "<startup_candle_count> [param=value ...]")
+            sys.exit(1)
+        overrides, _ = parse_grid(sys.argv[5:])
+        sys.exit(check_backtest(sys.argv[2], sys.argv[3], int(sys.argv[4]),
+                                {k: float(v[0]) for k, v in overrides.items()}))
+
+    parser = argparse.ArgumentParser(description="DCA ladder screening over freqtrade feather data")
+    parser.add_argument('data_dir')
+    parser.add_argument('timeframe')
+    parser.add_argument('grid', nargs='*', help="param=v1,v2,... (kombinace všech hodnot)")
+    parser.add_argument('--sizing', choices=('wallet', 'ladder'), default='wallet',
+                        help="výše DCA, viz docstring (dca_inc se uplatní jen s 'ladder')")
+    parser.add_argument('--take-profit', dest='take_profit', default='roi',
+                        help="'roi' = minimal_roi strategie (default), 'none' nebo profit ratio na close")
+    parser.add_argument('--entries', choices=('strategy', 'always', 'first'), default='strategy',
+                        help="strategy = enter_long strategie, always = nový trade hned po exitu, "
+                             "first = jeden trade per pár od začátku dat")
+    parser.add_argument('--strategy-file', dest='strategy_file',
+                        default=str(Path(__file__).resolve().parent / 'user_data' / 'strategies'
+                                    / 'DailyBuyStrategy3_5_JPA.py'),
+                        help="strategie pro --entries strategy a --take-profit roi (+ její .json)")
+    parser.add_argument('--stop-exits', dest='stop_exits', action='store_true',
+                        help="stop po DCA trade zavře (strategie ho v confirm_trade_exit odmítá)")
+    args = parser.parse_args()
+
+    pairs, ohlc = load_ohlcv(args.data_dir, args.timeframe)
+    grid, n_sets = parse_grid(args.grid)
+    strategy = None
+    if args.entries == 'strategy' or args.take_profit == 'roi':
+        strategy = load_strategy(args.strategy_file, args.timeframe)
+
+    if args.take_profit == 'roi':
+        take_profit = roi_candles(strategy.minimal_roi, args.timeframe)
+    elif args.take_profit == 'none':
+        take_profit = None
+    else:
+        take_profit = float(args.take_profit)
+    if args.entries == 'strategy':
+        entries = strategy_entries(strategy, pairs, ohlc)
+    elif args.entries == 'always':
+        entries = np.ones(ohlc['close'].shape, dtype=bool)
+    else:
+        entries = None
+
+    result = simulate_dca(ohlc['open'], ohlc['high'], ohlc['low'], ohlc['close'], params=grid,
+                          entries=entries, take_profit=take_profit, sizing=args.sizing,
+                          stop_exits=args.stop_exits)
+    params = expand_params(grid, n_sets)
+
+    print(f"{len(pairs)} párů, {ohlc['close'].shape[1]} svíček, {n_sets} sad parametrů, sizing '{args.sizing}', "
+          f"vstupy '{args.entries}', take profit {take_profit if take_profit is not None else 'žádný'} "
+          f"(bez trailing/stoploss freqtrade)")
+    if 'dca_inc' in grid and args.sizing == 'wallet':
+        print("⚠️  dca_inc se se sizing 'wallet' neuplatní - použij --sizing ladder")
+    # avg_entry % = průměrná cena posledního tradu vůči vstupní ceně (o kolik DCA snížily průměr), průměr přes páry
+    discount = 100 * np.nanmean(result['avg_entry'] / result['entry_rate'] - 1, axis=1)
+    names = list(grid) or ['dca_inc']
+    print(" ".join(f"{n:>18}" for n in names) + f"{'trades':>8}{'fills':>8}{'stops':>8}{'tps':>8}"
+          f"{'max_stake':>12}{'avg_entry%':>11}{'pnl':>12}{'open_pnl':>12}")
+    for i in range(n_sets):
+        print(" ".join(f"{params[n][i]:>18.4g}" for n in names)
+              + f"{result['trades'][i].sum():>8}{result['fills'][i].sum():>8}{result['stop_hits'][i].sum():>8}"
+              + f"{result['take_profits'][i].sum():>8}{result['max_stake'][i].max():>12.2f}"
+              + f"{discount[i]:>11.2f}{result['profit'][i].sum():>12.2f}{result['unrealized'][i].sum():>12.2f}")
@@ -0,0 +1,524 @@
+#!/usr/bin/env python3
+"""
+Inkrementální stahovač svíčkových dat - náhrada smyčky `docker run ... download-data` per timeframe.
+
+  - Pro každý pár × timeframe × candle typ načte existující data a spočítá díry
+    (před prvním / po posledním záznamu a výpadky uvnitř) v rámci --timerange.
+  - Stahuje jen chybějící intervaly; všechny stránky všech párů běží souběžně
+    (--concurrency requestů najednou), requesty rovnoměrně rozložené podle rate limitu burzy.
+  - Vyšší timeframy (--derive) se neskládají z burzy, ale lokálně resamplem z nejhrubšího
+    stahovaného timeframu, který je dělí (15m/1h/4h/1d/1w z 5m, případně z 1m).
+  - V futures módu se dotahují i funding_rate a mark svíčky potřebné pro backtest.
+  - Intervaly, které burza prokazatelně nemá (před listingem, výpadky), se zapisují
+    do <datadir>/.download_state.json a další běh se na ně už neptá.
+  - S --strategy se začátek posune o warm-up strategie (startup_candle_count, pro --spaces
+    z horních mezí optimalizovaných parametrů), aby první svíčka --timerange měla ustálené indikátory.
+
+Použití (uvnitř freqtrade prostředí, např. docker s --entrypoint python3):
+    python3 download_data.py -c user_data/config.json --pairs BTC/USDT:USDT ETH/USDT:USDT \\
+        --timerange 20250101-20260208 --fetch 5m --derive 15m 1h 2h 4h 1d 1w \\
+        --strategy DailyBuyStrategy3_5_JPA --timeframe 5m --spaces all
+
+    python3 download_data.py --self-test    # test proti lokální fake burze (bez sítě)
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("download_data")
+
+STATE_FILE = '.download_state.json'
+OHLCV_AGG = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+
+
+def to_ms(dates):
+    return dates.values.astype('datetime64[ms]').astype(np.int64)
+
+
+def subtract_ranges(ranges, known):
+    """Odečte od intervalů [since, until) intervaly `known` (již ověřené jako prázdné)."""
+    result = []
+    for since, until in ranges:
+        parts = [(since, until)]
+        for k_since, k_until in known:
+            parts = [piece for s, u in parts for piece in (
+                ((s, min(u, k_since)), (max(s, k_until), u)) if k_since < u and k_until > s else ((s, u),)
+            ) if piece[0] < piece[1]]
+        result += parts
+    return result
+
+
+def missing_ranges(dates_ms, start_ms, end_ms, timeframe_ms, known=(), internal=True):
+    """
+    Chybějící intervaly [since, until) v rozsahu start-end pro seřazené open časy svíček (ms).
+    internal=False hlídá jen začátek a konec (funding rate / mark nemusí mít hustotu timeframu).
+    """
+    if len(dates_ms) == 0:
+        ranges = [(start_ms, end_ms)]
+    else:
+        first, last = int(dates_ms[0]), int(dates_ms[-1])
+        ranges = [(start_ms, first), (last + timeframe_ms, end_ms)]
+        if internal:
+            gaps = np.flatnonzero(np.diff(dates_ms) > timeframe_ms)
+            ranges += [(int(dates_ms[i]) + timeframe_ms, int(dates_ms[i + 1])) for i in gaps]
+    ranges = [(max(s, start_ms), min(u, end_ms)) for s, u in ranges]
+    return sorted(subtract_ranges([(s, u) for s, u in ranges if s < u], known))
+
+
+def resample_ohlcv(dataframe, timeframe, base_timeframe):
+    """
+    Složí svíčky vyššího timeframe z base dat (label/closed left jako burza, týden od pondělí).
+    Neúplná první a neuzavřená poslední svíčka se zahodí - stejně jako resample_informative strategie.
+    """
+    from freqtrade.exchange import timeframe_to_resample_freq
+
+    if dataframe.empty:
+        return pd.DataFrame(columns=['date', *OHLCV_AGG])
+    to_offset = pd.tseries.frequencies.to_offset
+    freq = timeframe_to_resample_freq(timeframe)
+    resampled = dataframe.resample(freq, on='date', label='left', closed='left').agg(OHLCV_AGG).dropna()
+
+    base_close = dataframe['date'].iloc[-1] + to_offset(timeframe_to_resample_freq(base_timeframe))
+    complete = ((resampled.index >= dataframe['date'].iloc[0])
+                & (resampled.index + to_offset(freq) <= base_close))
+    return resampled[complete].reset_index()
+
+
+def merge_candles(existing, new):
+    if existing is None or existing.empty:
+        return new.reset_index(drop=True)
+    if new.empty:
+        return existing
+    merged = pd.concat([existing, new], ignore_index=True)
+    return merged.drop_duplicates('date', keep='last').sort_values('date').reset_index(drop=True)
+
+
+class RateLimiter:
+    """Rozloží requesty rovnoměrně: nejvýše jeden request za rate_limit_ms (jako ccxt throttle)."""
+
+    def __init__(self, rate_limit_ms):
+        self.interval = rate_limit_ms / 1000
+        self.last = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        # Serializované přes lock - rozestup se měří od skutečného uvolnění předchozího requestu
+        async with self.lock:
+            delay = self.last + self.interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.last = time.monotonic()
+
+
+class FreqtradeSource:
+    """Stránky svíček přes freqtrade Exchange (ccxt async, retry, funding rate / mark svíčky)."""
+
+    def __init__(self, config):
+        from freqtrade.resolvers import ExchangeResolver
+
+        self.exchange = ExchangeResolver.load_exchange(config, validate=False)
+        self.rate_limit_ms = self.exchange._api_async.rateLimit or 50
+
+    def candle_limit(self, timeframe, candle_type):
+        return self.exchange.ohlcv_candle_limit(timeframe, candle_type)
+
+    def extra_series(self):
+        from freqtrade.enums import CandleType
+
+        return [(self.exchange.get_option('funding_fee_timeframe'), CandleType.FUNDING_RATE),
+                (self.exchange.get_option('mark_ohlcv_timeframe'), CandleType.MARK)]
+
+    async def fetch(self, pair, timeframe, candle_type, since_ms):
+        _, _, _, data, _ = await self.exchange._async_get_candle_history(
+            pair, timeframe, candle_type, since_ms)
+        return data
+
+    def run(self, coroutine):
+        with self.exchange._loop_lock:
+            return self.exchange.loop.run_until_complete(coroutine)
+
+    def close(self):
+        self.exchange.close()
+
+
+class FakeExchange:
+    """
+    Lokální fake burza pro test stahovače bez sítě. Cena je deterministická funkce času
+    (high/low přes minutové body), takže 15m složené z 5m musí sedět přesně na 15m z "burzy".
+    listed = {pair: ms} první dostupná svíčka, holes = [(since, until)] výpadky burzy.
+    Počítá requesty a porušení rate limitu.
+    """
+
+    def __init__(self, now_ms, listed=None, holes=(), limit=1000, rate_limit_ms=2):
+        self.now_ms = now_ms
+        self.listed = listed or {}
+        self.holes = list(holes)
+        self.limit = limit
+        self.rate_limit_ms = rate_limit_ms
+        self.requests = 0
+        self.violations = 0
+        self.last_request = None
+
+    def candle_limit(self, timeframe, candle_type):
+        return self.limit
+
+    def extra_series(self):
+        from freqtrade.enums import CandleType
+
+        return [('1h', CandleType.FUNDING_RATE), ('1h', CandleType.MARK)]
+
+    @staticmethod
+    def price(pair, minutes):
+        phase = zlib.crc32(pair.encode()) % 1000
+        return 100 + 10 * np.sin((minutes + phase) / 720) + np.sin((minutes + phase) / 37)
+
+    def candles(self, pair, timeframe, candle_type, since_ms, count):
+        from freqtrade.enums import CandleType
+        from freqtrade.exchange import timeframe_to_msecs
+
+        tf_ms = timeframe_to_msecs(timeframe)
+        start = max(-(-since_ms // tf_ms) * tf_ms, self.listed.get(pair, 0))
+        start = -(-start // tf_ms) * tf_ms
+        dates = np.arange(start, start + count * tf_ms, tf_ms, dtype=np.int64)
+        # Jen uzavřené svíčky, bez výpadků burzy
+        dates = dates[dates + tf_ms <= self.now_ms]
+        for since, until in self.holes:
+            dates = dates[(dates < since) | (dates >= until)]
+        if candle_type == CandleType.FUNDING_RATE:
+            return [[int(d), 0.0001] for d in dates]
+
+        step = tf_ms // 60000
+        minutes = dates[:, None] // 60000 + np.arange(step)[None, :]
+        prices = self.price(pair, minutes)
+        volume = (1.0 + minutes % 7).sum(axis=1)
+        return [[int(d), o, h, l, c, v] for d, o, h, l, c, v in zip(
+            dates, prices[:, 0], prices.max(axis=1), prices.min(axis=1), prices[:, -1], volume)]
+
+    async def fetch(self, pair, timeframe, candle_type, since_ms):
+        now = time.monotonic()
+        if self.last_request is not None and (now - self.last_request) * 1000 < self.rate_limit_ms * 0.9:
+            self.violations += 1
+        self.last_request = now
+        self.requests += 1
+        await asyncio.sleep(0)
+        return self.candles(pair, timeframe, candle_type, since_ms, self.limit)
+
+    def run(self, coroutine):
+        return asyncio.run(coroutine)
+
+    def close(self):
+        pass
+
+
+class Downloader:
+    def __init__(self, source, datadir, trading_mode='futures', data_format=None, concurrency=8):
+        from freqtrade.data.history import get_datahandler
+
+        self.source = source
+        self.datadir = Path(datadir)
+        self.datadir.mkdir(parents=True, exist_ok=True)
+        self.trading_mode = trading_mode
+        self.handler = get_datahandler(self.datadir, data_format)
+        self.concurrency = concurrency
+        self.state_path = self.datadir / STATE_FILE
+        self.state = self.load_state()
+        self.stats = {'series': 0, 'updated': 0, 'ranges': 0, 'requests': 0, 'candles': 0, 'derived': 0}
+
+    def load_state(self):
+        if not self.state_path.is_file():
+            return {}
+        try:
+            with self.state_path.open() as f:
+                return json.load(f)
+        except Exception as e:
+            logging.error(f"Error reading {self.state_path}: {e}")
+            return {}
+
+    def save_state(self):
+        tmp_path = self.state_path.with_suffix('.tmp')
+        with tmp_path.open('w') as f:
+            json.dump(self.state, f, indent=1, sort_keys=True)
+        tmp_path.replace(self.state_path)
+
+    def load(self, pair, timeframe, candle_type):
+        return self.handler._ohlcv_load(pair, timeframe, timerange=None, candle_type=candle_type)
+
+    def plan(self, pairs, timeframes):
+        from freqtrade.enums import CandleType
+
+        candle_type = CandleType.get_default(self.trading_mode)
+        series = [(pair, tf, candle_type) for pair in pairs for tf in timeframes]
+        if self.trading_mode == 'futures':
+            series += [(pair, tf, ct) for pair in pairs for tf, ct in self.source.extra_series()]
+        return series
+
+    async def fetch_page(self, pair, timeframe, candle_type, since_ms):
+        async with self.semaphore:
+            await self.limiter.wait()
+            self.stats['requests'] += 1
+            return await self.source.fetch(pair, timeframe, candle_type, since_ms)
+
+    async def fetch_range(self, pair, timeframe, candle_type, since_ms, until_ms):
+        from freqtrade.exchange import timeframe_to_msecs
+
+        page_ms = timeframe_to_msecs(timeframe) * self.source.candle_limit(timeframe, candle_type)
+        pages = await asyncio.gather(*(
+            self.fetch_page(pair, timeframe, candle_type, since)
+            for since in range(since_ms, until_ms, page_ms)
+        ))
+        return [row for page in pages for row in page if since_ms <= row[0] < until_ms]
+
+    async def download_series(self, pair, timeframe, candle_type, start_ms, end_ms):
+        from freqtrade.data.converter import ohlcv_to_dataframe
+        from freqtrade.enums import CandleType
+        from freqtrade.exchange import timeframe_to_msecs
+
+        tf_ms = timeframe_to_msecs(timeframe)
+        # Jen uzavřené svíčky - poslední rozpracovaná by se při dalším běhu musela přepsat
+        end_ms = min(end_ms, int(time.time() * 1000) // tf_ms * tf_ms)
+        key = f"{pair}|{timeframe}|{candle_type.value}"
+        known = self.state.get(key, [])
+        existing = self.load(pair, timeframe, candle_type)
+        internal = candle_type in (CandleType.SPOT, CandleType.FUTURES)
+        ranges = missing_ranges(to_ms(existing['date']), start_ms, end_ms, tf_ms, known, internal)
+        if not ranges:
+            return 0
+
+        fetched = await asyncio.gather(*(
+            self.fetch_range(pair, timeframe, candle_type, since, until) for since, until in ranges))
+        rows = [row for chunk in fetched for row in chunk]
+        for (since, until), chunk in zip(ranges, fetched):
+            # Co burza v intervalu nevrátila, nemá - další běh se už neptá (kromě konce dat,
+            # kde svíčky můžou ještě přibýt)
+            returned = np.array([row[0] for row in chunk], dtype=np.int64)
+            empty = missing_ranges(returned, since, until, tf_ms, internal=internal)
+            known += [[s, u] for s, u in empty if u < end_ms]
+        if known:
+            self.state[key] = sorted(known)
+
+        self.stats['ranges'] += len(ranges)
+        if not rows:
+            return 0
+        new = ohlcv_to_dataframe(rows, timeframe, pair, fill_missing=False,
+                                 drop_incomplete=False, candle_type=candle_type)
+        self.handler.ohlcv_store(pair, timeframe, merge_candles(existing, new), candle_type)
+        return len(new)
+
+    async def download_all(self, series, start_ms, end_ms):
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.limiter = RateLimiter(self.source.rate_limit_ms)
+        results = await asyncio.gather(*(
+            self.download_series(pair, tf, ct, start_ms, end_ms) for pair, tf, ct in series
+        ), return_exceptions=True)
+        for (pair, timeframe, candle_type), result in zip(series, results):
+            if isinstance(result, BaseException):
+                logging.error(f"Download of {pair} {timeframe} {candle_type.value} failed: {result!r}")
+                continue
+            if result:
+                self.stats['updated'] += 1
+                self.stats['candles'] += result
+                logger.info(f"{pair} {timeframe} {candle_type.value}: +{result} candles")
+
+    def derive(self, pairs, fetch_timeframes, derive_timeframes):
+        """Vyšší timeframy resamplem z nejhrubšího stahovaného timeframu, který je dělí."""
+        from freqtrade.enums import CandleType
+        from freqtrade.exchange import timeframe_to_seconds
+
+        candle_type = CandleType.get_default(self.trading_mode)
+        for timeframe in derive_timeframes:
+            seconds = timeframe_to_seconds(timeframe)
+            bases = [tf for tf in fetch_timeframes
+                     if timeframe_to_seconds(tf) < seconds and seconds % timeframe_to_seconds(tf) == 0]
+            if not bases:
+                logging.error(f"Cannot derive {timeframe} from {fetch_timeframes}")
+                continue
+            base = max(bases, key=timeframe_to_seconds)
+            for pair in pairs:
+                base_df = self.load(pair, base, candle_type)
+                if base_df.empty:
+                    continue
+                resampled = resample_ohlcv(base_df, timeframe, base)
+                if resampled.empty:
+                    continue
+                existing = self.load(pair, timeframe, candle_type)
+                self.handler.ohlcv_store(pair, timeframe, merge_candles(existing, resampled), candle_type)
+                self.stats['derived'] += 1
+
+    def run(self, pairs, fetch_timeframes, derive_timeframes, start_ms, end_ms):
+        series = self.plan(pairs, fetch_timeframes)
+        self.stats['series'] = len(series)
+        started = time.monotonic()
+        try:
+            self.source.run(self.download_all(series, start_ms, end_ms))
+        finally:
+            self.save_state()
+        self.derive(pairs, fetch_timeframes, [tf for tf in derive_timeframes if tf not in fetch_timeframes])
+        self.stats['seconds'] = round(time.monotonic() - started, 2)
+        logger.info(f"Download done: {self.stats}")
+        return self.stats
+
+
+def self_test():
+    """Dva běhy proti FakeExchange: první stáhne díry, druhý nesmí poslat jediný request."""
+    from freqtrade.enums import CandleType
+
+    day_ms = 86400 * 1000
+    start_ms = 1735689600000  # 2025-01-01
+    end_ms = start_ms + 10 * day_ms
+    pairs = ['BTC/USDT:USDT', 'ETH/USDT:USDT', 'NEW/USDT:USDT']
+    exchange = FakeExchange(now_ms=int(time.time() * 1000),
+                            listed={'NEW/USDT:USDT': start_ms + 3 * day_ms},
+                            holes=[(start_ms + 5 * day_ms, start_ms + 5 * day_ms + 3600 * 1000)])
+    derive_timeframes = ['15m', '1h', '4h', '1d', '1w']
+
+    with tempfile.TemporaryDirectory() as datadir:
+        first = Downloader(exchange, datadir, concurrency=4).run(
+            pairs, ['5m'], derive_timeframes, start_ms, end_ms)
+        # Existující data s dírou uprostřed: smaže se den a doplní se jen ten
+        downloader = Downloader(exchange, datadir)
+        df = downloader.load('BTC/USDT:USDT', '5m', CandleType.FUTURES)
+        cut = (df['date'] >= pd.Timestamp(start_ms + day_ms, unit='ms', tz='UTC')) & \
+              (df['date'] < pd.Timestamp(start_ms + 2 * day_ms, unit='ms', tz='UTC'))
+        downloader.handler.ohlcv_store('BTC/USDT:USDT', '5m', df[~cut].reset_index(drop=True),
+                                       CandleType.FUTURES)
+        refill = downloader.run(pairs, ['5m'], [], start_ms, end_ms)
+        second = Downloader(exchange, datadir).run(pairs, ['5m'], derive_timeframes, start_ms, end_ms)
+
+        checks = {
+            'first run downloaded all series': first['updated'] == 3 * len(pairs),
+            'gap refill fetched one range': refill['ranges'] == 1 and refill['candles'] == 288,
+            'second run sent no requests': second['requests'] == 0,
+            'rate limit respected': exchange.violations == 0,
+        }
+        for tf in ('15m', '1h'):
+            derived = downloader.load('ETH/USDT:USDT', tf, CandleType.FUTURES)
+            rows = exchange.candles('ETH/USDT:USDT', tf, CandleType.FUTURES, start_ms,
+                                    (end_ms - start_ms) // (900000 if tf == '15m' else 3600000))
+            expected = np.array([row[1:] for row in rows if row[0] < end_ms])
+            checks[f'{tf} resample equals exchange candles'] = (
+                len(derived) == len(expected)
+                and np.allclose(derived[list(OHLCV_AGG)].values, expected))
+        listed = downloader.load('NEW/USDT:USDT', '5m', CandleType.FUTURES)
+        checks['pre-listing range skipped'] = to_ms(listed['date'])[0] == start_ms + 3 * day_ms
+
+    for name, ok in checks.items():
+        print(f"{'OK  ' if ok else 'FAIL'} {name}")
+    return 0 if all(checks.values()) else 1
+
+
+def strategy_startup(config, strategy, timeframe=None, spaces=None):
+    """
+    Warm-up strategie: (startup_candle_count, ms). Freqtrade v backtestu/hyperoptu odečítá
+    startup svíčky od začátku timerange pro každý čtený timeframe zvlášť, takže posun je
+    startup × nejdelší z nich (timeframe strategie + informative, pokud se neskládá z base svíček).
+    """
+    import copy
+
+    from freqtrade.enums import RunMode
+    from freqtrade.exchange import timeframe_to_msecs
+    from freqtrade.resolvers import StrategyResolver
+
+    config = copy.deepcopy(config)
+    config['strategy'] = strategy
+    if timeframe:
+        config['timeframe'] = timeframe
+    # V hyperopt režimu strategie počítá warm-up z horních mezí parametrů optimalizovaných ve spaces
+    config['runmode'] = RunMode.HYPEROPT if spaces else RunMode.BACKTEST
+    if spaces:
+        config['spaces'] = spaces
+    loaded = StrategyResolver.load_strategy(config)
+    timeframes = [loaded.timeframe]
+    if not getattr(loaded, 'informative_resample', False):
+        timeframes += getattr(loaded, 'informative_timeframes', list)()
+    startup = loaded.startup_candle_count
+    return startup, startup * max(timeframe_to_msecs(tf) for tf in timeframes)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Gap-aware parallel candle downloader")
+    parser.add_argument('-c', '--config', action='append')
+    parser.add_argument('--userdir', '--user-data-dir', dest='user_data_dir', default=None)
+    parser.add_argument('--datadir', default=None)
+    parser.add_argument('--exchange', default=None)
+    parser.add_argument('--pairs', nargs='+', default=None, help="default: pair_whitelist z configu")
+    parser.add_argument('--timerange', default=None, help="YYYYMMDD-YYYYMMDD")
+    parser.add_argument('--fetch', nargs='+', default=['5m'], help="timeframy stahované z burzy")
+    parser.add_argument('--derive', nargs='+', default=['15m', '1h', '2h', '4h', '1d', '1w'],
+                        help="timeframy skládané lokálně z --fetch")
+    parser.add_argument('--concurrency', type=int, default=8, help="souběžných requestů")
+    parser.add_argument('--rate-limit-ms', dest='rate_limit_ms', type=int, default=None,
+                        help="minimální rozestup requestů (default: rateLimit z ccxt)")
+    parser.add_argument('--strategy', default=None,
+                        help="posunout začátek o warm-up strategie (startup_candle_count)")
+    parser.add_argument('--strategy-path', dest='strategy_path', default=None)
+    parser.add_argument('--timeframe', default=None, help="timeframe strategie (default: z configu)")
+    parser.add_argument('--spaces', nargs='+', default=None,
+                        help="hyperopt spaces - warm-up z horních mezí optimalizovaných parametrů")
+    parser.add_argument('--startup-candles', dest='startup_candles', type=int, default=None,
+                        help="pevný warm-up ve svíčkách --timeframe místo výpočtu strategií")
+    parser.add_argument('--self-test', dest='self_test', action='store_true')
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    from freqtrade.configuration import Configuration, TimeRange
+    from freqtrade.enums import RunMode
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(message)s")
+    args = parse_args(argv)
+    if args.self_test:
+        return self_test()
+    if not args.config or not args.timerange:
+        print("Missing -c/--config or --timerange")
+        return 1
+
+    cli = {'config': args.config, 'user_data_dir': args.user_data_dir, 'datadir': args.datadir,
+           'exchange': args.exchange, 'strategy_path': args.strategy_path}
+    config = Configuration({k: v for k, v in cli.items() if v is not None},
+                           RunMode.UTIL_EXCHANGE).get_config()
+    pairs = args.pairs or config['exchange']['pair_whitelist']
+    timerange = TimeRange.parse_timerange(args.timerange)
+    start_ms = timerange.startts * 1000
+    end_ms = timerange.stopts * 1000 if timerange.stopts else int(time.time() * 1000)
+
+    if args.startup_candles is not None:
+        from freqtrade.exchange import timeframe_to_msecs
+
+        startup = args.startup_candles
+        startup_ms = startup * timeframe_to_msecs(args.timeframe or config['timeframe'])
+    elif args.strategy:
+        try:
+            startup, startup_ms = strategy_startup(config, args.strategy, args.timeframe, args.spaces)
+        except Exception as e:
+            logger.warning(f"Cannot load strategy {args.strategy} for warm-up, downloading timerange only: {e}")
+            startup, startup_ms = 0, 0
+    else:
+        startup, startup_ms = 0, 0
+    if startup_ms:
+        start_ms -= startup_ms
+        logger.info(f"Warm-up {startup} candles: download starts at "
+                    f"{pd.Timestamp(start_ms, unit='ms', tz='UTC')}")
+
+    source = FreqtradeSource(config)
+    if args.rate_limit_ms is not None:
+        source.rate_limit_ms = args.rate_limit_ms
+    try:
+        downloader = Downloader(source, config['datadir'], config.get('trading_mode', 'spot'),
+                                config.get('dataformat_ohlcv'), args.concurrency)
+        downloader.run(pairs, args.fetch, args.derive, start_ms, end_ms)
+    finally:
+        source.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Jeden pod pro celou Daily flotilu - všechny timeframy z TIMEFRAME_CONFIG pod jedním supervisorem.
+
+Freqtrade drží globální stav per interpret (Trade.session, singleton ApiServer, PairLocks.timeframe),
+takže dva boty v jednom procesu by sdílely DB i API. Supervisor proto jednou naimportuje
+freqtrade, pandas, TA-Lib, ccxt a FastAPI a boty spouští jako fork() potomky:
+kód a importované moduly sdílí copy-on-write stránky, každý bot má vlastní wallet, trades DB,
+user_data a API port (z vlastního configu).
+
+Svíčky pro všechny timeframy stahuje jediný potomek candle_store.py (--candle-store-root);
+strategie je čte ze sdíleného mmap (FT_CANDLE_STORE), takže každá svíčka se z burzy stáhne
+a uloží jednou pro celou flotilu.
+
+Potomek, který skončí, se restartuje s exponenciálním backoffem. SIGTERM/SIGINT supervisoru
+se přepošle botům jako SIGINT (freqtrade po něm korektně ukončí worker).
+
+Použití (uvnitř freqtrade image):
+    python3 fleet_runner.py --strategy DailyBuyStrategy3_5_JPA --strategy-path /fleet/strategies \\
+        --bot dailybuy-5m=/fleet/dailybuy-5m.json --bot dailybuy-1h=/fleet/dailybuy-1h.json \\
+        --candle-store-root /freqtrade/candle_store --pairs BTC/USDT:USDT ETH/USDT:USDT \\
+        --timeframes 5m 15m 1h 4h
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+
+logger = logging.getLogger("fleet_runner")
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+
+def preload():
+    """Importy sdílené všemi potomky (fork po importu = jedna kopie stránek v paměti)."""
+    import ccxt  # noqa: F401
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+    import talib.abstract  # noqa: F401
+
+    import freqtrade.freqtradebot  # noqa: F401
+    import freqtrade.main  # noqa: F401
+    import freqtrade.rpc.api_server  # noqa: F401
+    import freqtrade.worker  # noqa: F401
+
+
+def prefix_log_records(name):
+    # Logy všech botů jdou do jednoho stdout podu - každý záznam dostane jméno bota
+    factory = logging.getLogRecordFactory()
+
+    def record_factory(*args, **kwargs):
+        record = factory(*args, **kwargs)
+        record.msg = f"[{name}] {record.msg}"
+        return record
+
+    logging.setLogRecordFactory(record_factory)
+
+
+def reset_signals():
+    # Fork dědí handlery supervisoru - potomek musí na SIGINT reagovat KeyboardInterrupt jako freqtrade
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+
+def run_bot(name, configs, args):
+    from freqtrade.main import main
+
+    reset_signals()
+    prefix_log_records(name)
+    argv = ['trade', '--strategy', args.strategy]
+    if args.strategy_path:
+        argv += ['--strategy-path', args.strategy_path]
+    user_data_dir = Path(args.user_data_root) / name
+    user_data_dir.mkdir(parents=True, exist_ok=True)
+    argv += ['--userdir', str(user_data_dir)]
+    for config in configs:
+        argv += ['-c', config]
+    main(argv)
+
+
+def run_candle_store(args):
+    sys.path.insert(0, str(SCRIPT_DIR))
+    import candle_store
+
+    reset_signals()
+    prefix_log_records('candle-store')
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(message)s")
+    store_args = candle_store.parse_args(
+        ['--root', args.candle_store_root, '--exchange', args.exchange,
+         '--trading-mode', args.trading_mode, '--pairs', *args.pairs, '--timeframes', *args.timeframes])
+    sys.exit(candle_store.run(store_args))
+
+
+class Supervisor:
+    def __init__(self, args):
+        self.args = args
+        self.context = multiprocessing.get_context('fork')
+        self.children = {}
+        self.stopping = False
+        self.specs = {}
+        if args.candle_store_root:
+            self.specs['candle-store'] = (run_candle_store, (args,))
+        for bot in args.bots:
+            name, _, configs = bot.partition('=')
+            self.specs[name] = (run_bot, (name, configs.split(','), args))
+
+    def start(self, name):
+        target, target_args = self.specs[name]
+        process = self.context.Process(target=target, args=target_args, name=name)
+        process.start()
+        previous = self.children.get(name)
+        backoff = previous['backoff'] if previous else self.args.restart_delay
+        self.children[name] = {'process': process, 'started': time.monotonic(), 'backoff': backoff}
+        logger.info(f"Started {name} (pid {process.pid})")
+
+    def stop(self, signum=None, frame=None):
+        if self.stopping:
+            return
+        self.stopping = True
+        logger.info("Stopping fleet...")
+        for child in self.children.values():
+            if child['process'].is_alive():
+                os.kill(child['process'].pid, signal.SIGINT)
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        # Store nejdřív - boty pak hned najdou aktuální svíčky a nestahují je samy
+        for name in self.specs:
+            self.start(name)
+        while not self.stopping:
+            time.sleep(1)
+            now = time.monotonic()
+            for name, child in list(self.children.items()):
+                process = child['process']
+                if process.is_alive() or self.stopping:
+                    continue
+                if 'restart_at' not in child:
+                    uptime = now - child['started']
+                    # Běžel dlouho => jednorázový pád, backoff od začátku; jinak se backoff zdvojnásobí
+                    if uptime > self.args.stable_after:
+                        child['backoff'] = self.args.restart_delay
+                    child['restart_at'] = now + child['backoff']
+                    logger.warning(f"{name} exited with code {process.exitcode} after {uptime:.0f}s, "
+                                   f"restarting in {child['backoff']:.0f}s")
+                    child['backoff'] = min(child['backoff'] * 2, self.args.max_restart_delay)
+                elif now >= child['restart_at']:
+                    self.start(name)
+
+        deadline = time.monotonic() + self.args.stop_timeout
+        for name, child in self.children.items():
+            child['process'].join(max(deadline - time.monotonic(), 0))
+            if child['process'].is_alive():
+                logging.error(f"{name} did not stop in {self.args.stop_timeout}s, killing")
+                child['process'].kill()
+        return 0
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Single-pod supervisor for the Daily bot fleet")
+    parser.add_argument('--bot', dest='bots', action='append', required=True,
+                        help="NAME=CONFIG[,CONFIG...] (opakovatelné, jeden bot na timeframe)")
+    parser.add_argument('--strategy', required=True)
+    parser.add_argument('--strategy-path', dest='strategy_path', default=None)
+    parser.add_argument('--user-data-root', dest='user_data_root', default='/freqtrade/user_data',
+                        help="user_data botu = <root>/<NAME>")
+    parser.add_argument('--candle-store-root', dest='candle_store_root', default=None,
+                        help="spustí zapisovatele candle_store.py jako dalšího potomka")
+    parser.add_argument('--exchange', default='bybit')
+    parser.add_argument('--trading-mode', dest='trading_mode', default='futures')
+    parser.add_argument('--pairs', nargs='+', default=[])
+    parser.add_argument('--timeframes', nargs='+', default=[])
+    parser.add_argument('--restart-delay', dest='restart_delay', type=float, default=5.0)
+    parser.add_argument('--max-restart-delay', dest='max_restart_delay', type=float, default=300.0)
+    parser.add_argument('--stable-after', dest='stable_after', type=float, default=600.0,
+                        help="s běhu, po kterých se pád nepočítá do backoffu")
+    parser.add_argument('--stop-timeout', dest='stop_timeout', type=float, default=60.0)
+    args = parser.parse_args(argv)
+    if args.candle_store_root and not (args.pairs and args.timeframes):
+        parser.error("--candle-store-root requires --pairs and --timeframes")
+    return args
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(message)s")
+    args = parse_args(sys.argv[1:])
+    if args.candle_store_root:
+        os.environ.setdefault('FT_CANDLE_STORE', args.candle_store_root)
+    preload()
+    sys.exit(Supervisor(args).run())
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Spouštěč freqtrade hyperoptu s on-disk cache výsledků epoch.
+
+Výsledek epochy je uložen pod klíčem odvozeným z:
+  - hashe zdrojáku strategie a hodnot neoptimalizovaných parametrů (z .json / defaultů),
+  - hashe dat (hyperopt_tickerdata.pkl = páry, timeframe, timerange; s hyperopt_precompute jen OHLCV),
+  - hashe konfigurace, prostorů a loss funkce,
+  - vektoru parametrů navržených optimizerem.
+
+Opakovaný / navazující běh se stejným --random-state tak přehraje již
+spočtené epochy z cache (optimizer dostane stejné loss hodnoty) a backtest
+spouští jen pro nové kombinace parametrů.
+
+Použití (stejné argumenty jako `freqtrade`):
+    python3 hyperopt_epoch_cache.py hyperopt --strategy ... -e 500
+    python3 hyperopt_epoch_cache.py --self-test    # klíč cache přežije export parametrů mezi běhy
+
+HYPEROPT_EPOCH_CACHE=0 cache vypne, HYPEROPT_EPOCH_CACHE_DIR změní adresář
+(default: <user_data_dir>/hyperopt_cache/epochs).
+
+Průběh běhu se zapisuje jako JSON lines (start, epoch per epochu, end) do
+<user_data_dir>/hyperopt_results/events/<strategie>-<čas>-<pid>.jsonl - parametry, loss,
+profit, počet tradů, čas backtestu a pid workeru. Čte ho monitor_hyperopt.py.
+HYPEROPT_EVENTS=0 stream vypne, HYPEROPT_EVENTS_DIR změní adresář.
+"""
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+logger = logging.getLogger("hyperopt_epoch_cache")
+
+# Klíče konfigurace, které nemají vliv na výsledek jednotlivé epochy
+VOLATILE_CONFIG_KEYS = {
+    "epochs", "hyperopt_random_state", "hyperopt_jobs", "print_all", "print_json",
+    "print_colorized", "verbosity", "logfile", "original_config", "config_files",
+    "user_data_dir", "datadir", "exportfilename", "hyperopt_show_index",
+    "hyperopt_list_best", "hyperopt_list_profitable", "disableparamexport",
+}
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def config_digest(config):
+    relevant = {k: v for k, v in config.items() if k not in VOLATILE_CONFIG_KEYS}
+    return hashlib.sha256(
+        json.dumps(relevant, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def params_key(params):
+    # Decimal parametry chodí z optimizeru jako float - zaokrouhlení drží klíč stabilní
+    normalized = {
+        k: round(v, 10) if isinstance(v, float) else v for k, v in sorted(params.items())
+    }
+    return hashlib.sha256(
+        json.dumps(normalized, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def candles_digest(path, columns=("date", "open", "high", "low", "close", "volume")):
+    """
+    Hash jen svíček z hyperopt_tickerdata.pkl. Indikátory v pickle se počítají s hodnotami
+    optimalizovaných parametrů z .json (po každém běhu jiné), strategie s hyperopt_precompute
+    je ale v každé epoše přepíše variantou podle parametrů epochy.
+    """
+    import numpy as np
+    from joblib import load
+
+    data = load(path, mmap_mode="r")
+    digest = hashlib.sha256()
+    for pair in sorted(data):
+        digest.update(pair.encode())
+        for column in columns:
+            digest.update(np.ascontiguousarray(data[pair][column].values).tobytes())
+    return digest.hexdigest()
+
+
+def not_optimized_digest(hyperopter):
+    """
+    Hash efektivních hodnot parametrů mimo optimalizované prostory (jako params_not_optimized
+    v exportu). Ne hash <strategie>.json - export_params ho na konci každého běhu přepíše
+    s novým export_time a nejlepšími hodnotami optimalizovaných prostorů, které už jsou v klíči epochy.
+    """
+    not_optimized = {
+        **hyperopter.backtesting.strategy.get_no_optimize_params(),
+        **hyperopter._get_no_optimize_details(),
+    }
+    return hashlib.sha256(
+        json.dumps(not_optimized, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+class EpochCache:
+    """Content-addressed úložiště výsledků epoch (jeden JSON soubor na epochu)."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def for_hyperopt(cls, hyperopt):
+        config = hyperopt.config
+        strategy = hyperopt.hyperopter.backtesting.strategy
+
+        context = hashlib.sha256()
+        strategy_file = Path(getattr(strategy, "__file__", "") or "")
+        if strategy_file.is_file():
+            context.update(file_digest(strategy_file).encode())
+        else:
+            context.update(type(strategy).__name__.encode())
+        context.update(not_optimized_digest(hyperopt.hyperopter).encode())
+        # Pickle obsahuje přesně ta data (páry, timerange, startup), na kterých běží backtest
+        if hyperopt.data_pickle_file.is_file():
+            if getattr(strategy, "hyperopt_precompute", False):
+                context.update(candles_digest(hyperopt.data_pickle_file).encode())
+            else:
+                context.update(file_digest(hyperopt.data_pickle_file).encode())
+        context.update(config_digest(config).encode())
+
+        base = os.environ.get("HYPEROPT_EPOCH_CACHE_DIR")
+        base = Path(base) if base else Path(config["user_data_dir"]) / "hyperopt_cache" / "epochs"
+        root = base / f"{config['strategy']}-{context.hexdigest()[:16]}"
+        root.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Epoch cache: {root}")
+        return cls(root)
+
+    def path_for(self, params):
+        key = params_key(params)
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, params):
+        import rapidjson
+
+        path = self.path_for(params)
+        if not path.is_file():
+            return None
+        try:
+            with path.open("r") as f:
+                return rapidjson.load(f, number_mode=rapidjson.NM_NATIVE | rapidjson.NM_NAN)
+        except Exception as e:
+            logging.error(f"Error reading epoch cache {path}: {e}")
+            return None
+
+    def put(self, params, result):
+        import rapidjson
+        from freqtrade.optimize.hyperopt_tools import hyperopt_serializer
+
+        path = self.path_for(params)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with tmp_path.open("w") as f:
+                rapidjson.dump(
+                    result, f,
+                    default=hyperopt_serializer,
+                    number_mode=rapidjson.NM_NATIVE | rapidjson.NM_NAN,
+                )
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logging.error(f"Error writing epoch cache {path}: {e}")
+            tmp_path.unlink(missing_ok=True)
+
+
+def json_default(value):
+    # numpy skaláry z optimizeru / metrik
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+class EventStream:
+    """Append-only JSON lines stream událostí hyperoptu (zapisuje jen hlavní proces)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = path.open("a", buffering=1)
+
+    @classmethod
+    def for_hyperopt(cls, hyperopt):
+        config = hyperopt.config
+        base = os.environ.get("HYPEROPT_EVENTS_DIR")
+        base = Path(base) if base else Path(config["user_data_dir"]) / "hyperopt_results" / "events"
+        # pid v názvu - paralelní okna walk_forward.py startují ve stejné sekundě
+        path = base / f"{config['strategy']}-{time.strftime('%Y%m%d_%H%M%S')}-{os.getpid()}.jsonl"
+        logger.info(f"Hyperopt events: {path}")
+        return cls(path)
+
+    def emit(self, event, **fields):
+        try:
+            self.file.write(json.dumps({"event": event, "time": time.time(), **fields},
+                                       default=json_default) + "\n")
+        except Exception as e:
+            logging.error(f"Error writing hyperopt event to {self.path}: {e}")
+
+    def close(self):
+        self.file.close()
+
+
+def timed_epoch(func, args, kwargs):
+    # Běží ve workeru: k výsledku epochy přidá pid workeru a čas backtestu
+    started = time.time()
+    begin = time.perf_counter()
+    result = func(*args, **kwargs)
+    result["epoch_worker"] = os.getpid()
+    result["epoch_started"] = started
+    result["epoch_seconds"] = time.perf_counter() - begin
+    return result
+
+
+def install_events():
+    """
+    Per-epoch event stream. Úloha pro joblib (delayed generate_optimizer_wrapped) se obalí
+    timed_epoch, takže čas a worker se měří přímo ve workeru; události zapisuje
+    Hyperopt.evaluate_result v pořadí epoch.
+    """
+    from joblib import effective_n_jobs, wrap_non_picklable_objects
+    from freqtrade.optimize.hyperopt.hyperopt import Hyperopt
+    from freqtrade.optimize.hyperopt.hyperopt_optimizer import HyperOptimizer
+
+    if getattr(Hyperopt, "events_installed", False):
+        return
+    original_wrapped = HyperOptimizer.generate_optimizer_wrapped
+    timed = wrap_non_picklable_objects(timed_epoch)
+
+    def generate_optimizer_wrapped(self, params_dict):
+        func, args, kwargs = original_wrapped(self, params_dict)
+        return timed, (func, args, kwargs), {}
+
+    original_evaluate = Hyperopt.evaluate_result
+
+    def evaluate_result(self, val, current, is_random):
+        original_evaluate(self, val, current, is_random)
+        events = getattr(self, "events", None)
+        if events is None:
+            return
+        metrics = val.get("results_metrics", {})
+        cached = val.get("epoch_cached", False)
+        events.emit(
+            "epoch",
+            epoch=current,
+            epochs=self.total_epochs,
+            loss=val["loss"],
+            profit=metrics.get("profit_total"),
+            profit_abs=metrics.get("profit_total_abs"),
+            trades=metrics.get("total_trades"),
+            params=val.get("params_dict"),
+            # Epocha z cache se nepočítala - žádný worker ani čas
+            worker=None if cached else val.get("epoch_worker"),
+            started=None if cached else val.get("epoch_started"),
+            seconds=0.0 if cached else val.get("epoch_seconds"),
+            cached=cached,
+            is_best=val["is_best"],
+            is_random=is_random,
+        )
+
+    original_start = Hyperopt.start
+
+    def start(self):
+        config = self.config
+        try:
+            self.events = EventStream.for_hyperopt(self)
+        except Exception as e:
+            logging.error(f"Error opening hyperopt event stream: {e}")
+            self.events = None
+            return original_start(self)
+        self.events.emit(
+            "start",
+            strategy=config["strategy"],
+            epochs=self.total_epochs,
+            spaces=config.get("spaces"),
+            jobs=effective_n_jobs(config.get("hyperopt_jobs", -1)),
+            cpus=os.cpu_count(),
+            random_state=config.get("hyperopt_random_state"),
+            timeframe=config.get("timeframe"),
+            timerange=config.get("timerange"),
+            pid=os.getpid(),
+        )
+        try:
+            original_start(self)
+        finally:
+            best = self.current_best_epoch or {}
+            self.events.emit("end", best_epoch=best.get("current_epoch"), best_loss=best.get("loss"),
+                             saved=self.num_epochs_saved)
+            self.events.close()
+
+    HyperOptimizer.generate_optimizer_wrapped = generate_optimizer_wrapped
+    Hyperopt.evaluate_result = evaluate_result
+    Hyperopt.start = start
+    Hyperopt.events_installed = True
+
+
+def install():
+    """Obalí Hyperopt.run_optimizer_parallel - backtest se spustí jen pro epochy mimo cache."""
+    from freqtrade.optimize.hyperopt.hyperopt import Hyperopt
+
+    if getattr(Hyperopt, "epoch_cache_installed", False):
+        return
+    original = Hyperopt.run_optimizer_parallel
+
+    def run_optimizer_parallel(self, parallel, asked):
+        cache = getattr(self, "epoch_cache", None)
+        if cache is None:
+            cache = self.epoch_cache = EpochCache.for_hyperopt(self)
+
+        results = [cache.get(params) for params in asked]
+        missing = [i for i, result in enumerate(results) if result is None]
+        for result in results:
+            if result is not None:
+                # Pro event stream - přehraná epocha bez backtestu
+                result["epoch_cached"] = True
+        cache.hits += len(asked) - len(missing)
+        cache.misses += len(missing)
+
+        if missing:
+            computed = original(self, parallel, [asked[i] for i in missing])
+            for i, result in zip(missing, computed):
+                cache.put(asked[i], result)
+                results[i] = result
+        return results
+
+    original_start = Hyperopt.start
+
+    def start(self):
+        try:
+            original_start(self)
+        finally:
+            cache = getattr(self, "epoch_cache", None)
+            if cache is not None:
+                logger.info(
+                    f"Epoch cache: {cache.hits} epoch z cache, {cache.misses} backtestů spuštěno"
+                )
+
+    Hyperopt.run_optimizer_parallel = run_optimizer_parallel
+    Hyperopt.start = start
+    Hyperopt.epoch_cache_installed = True
+
+
+def self_test():
+    """
+    Dva běhy hyperoptu nad stejnými daty: mezi nimi export_params přepíše <strategie>.json
+    (nový export_time a nejlepší buy hodnoty) a indikátory v pickle dat se spočtou s nimi.
+    Druhý běh musí trefit stejnou cache,
+    změna neoptimalizovaného parametru naopak musí klíč změnit.
+    """
+    import importlib.util
+    import shutil
+    import tempfile
+    from types import SimpleNamespace
+
+    import numpy as np
+    import pandas as pd
+    from joblib import dump
+    from freqtrade.enums import CandleType, RunMode
+    from freqtrade.optimize.hyperopt.hyperopt_optimizer import HyperOptimizer
+    from freqtrade.optimize.hyperopt_tools import HyperoptTools
+    from freqtrade.misc import deep_merge_dicts
+
+    script_dir = Path(__file__).resolve().parent
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        strategy_file = tmp / "DailyBuyStrategy3_5_JPA.py"
+        shutil.copy(script_dir / "DailyBuyStrategy3_5_JPA_TEMPLATE.py", strategy_file)
+        shutil.copy(script_dir / "DailyBuyStrategy3_5_JPA.json", strategy_file.with_suffix(".json"))
+        spec = importlib.util.spec_from_file_location("epoch_cache_strategy", strategy_file)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        strategy_class = module.DailyBuyStrategy3_5_JPA
+        strategy_class.__file__ = str(strategy_file)
+        config = {
+            "runmode": RunMode.HYPEROPT, "strategy": "DailyBuyStrategy3_5_JPA", "spaces": ["buy"],
+            "timeframe": "5m", "dry_run": True, "stake_currency": "USDT", "trading_mode": "futures",
+            "margin_mode": "isolated", "candle_type_def": CandleType.FUTURES, "user_data_dir": str(tmp),
+        }
+
+        def start_run():
+            # Jako Hyperopt.__init__: strategie načte .json, buy je optimalizovaný prostor
+            strategy = strategy_class(dict(config))
+            strategy.ft_set_special_params_from_file()
+            strategy.ft_load_hyper_params(hyperopt=True)
+            hyperopter = HyperOptimizer.__new__(HyperOptimizer)
+            hyperopter.config = config
+            hyperopter.backtesting = SimpleNamespace(strategy=strategy)
+            hyperopt = SimpleNamespace(config=config, hyperopter=hyperopter,
+                                       data_pickle_file=tmp / "hyperopt_tickerdata.pkl")
+            return EpochCache.for_hyperopt(hyperopt), hyperopter
+
+        def dump_data(indicator):
+            # Jako Hyperopt.prepare_hyperopt: svíčky + indikátory spočtené s hodnotami z .json
+            rows = 100
+            frame = pd.DataFrame({
+                "date": pd.date_range("2024-01-01", periods=rows, freq="5min", tz="UTC"),
+                **{column: np.linspace(100.0, 110.0, rows) for column in ("open", "high", "low", "close")},
+                "volume": np.ones(rows),
+                "ema_short": np.full(rows, indicator),
+            })
+            dump({"P000/USDT:USDT": frame}, tmp / "hyperopt_tickerdata.pkl")
+
+        dump_data(1.0)
+        first, hyperopter = start_run()
+        asked = [{name: p.value for name, p in hyperopter.backtesting.strategy.enumerate_parameters("buy")}]
+        for params in asked:
+            first.put(params, {"loss": 1.0, "params_dict": params})
+        not_optimized = deep_merge_dicts(hyperopter.backtesting.strategy.get_no_optimize_params(),
+                                         hyperopter._get_no_optimize_details())
+        HyperoptTools.export_params({"params_details": {"buy": asked[0]}, "params_not_optimized": not_optimized},
+                                    "DailyBuyStrategy3_5_JPA", strategy_file.with_suffix(".json"))
+
+        dump_data(2.0)
+        second, hyperopter = start_run()
+        hits = [second.get(params) is not None for params in asked]
+
+        params_file = strategy_file.with_suffix(".json")
+        exported = json.loads(params_file.read_text())
+        exported["params"]["sell"]["new_sl_coef"] += 0.05
+        params_file.write_text(json.dumps(exported))
+        third, _ = start_run()
+
+        checks = {
+            "rewritten params file and indicators keep cache dir": first.root == second.root,
+            "second run hits every epoch": all(hits),
+            "changed non-optimized param changes cache dir": third.root != first.root,
+        }
+    for name, ok in checks.items():
+        print(f"{'OK  ' if ok else 'FAIL'} {name}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "--self-test":
+        sys.exit(self_test())
+    if len(sys.argv) < 2:
+        print("Usage: hyperopt_epoch_cache.py hyperopt [freqtrade hyperopt args]")
+        sys.exit(1)
+
+    if os.environ.get("HYPEROPT_EPOCH_CACHE", "1") != "0":
+        install()
+    if os.environ.get("HYPEROPT_EVENTS", "1") != "0":
+        install_events()
+
+    from freqtrade.main import main
+
+    main(sys.argv[1:])
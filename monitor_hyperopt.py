@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Živý monitor hyperoptu nad event streamem z hyperopt_epoch_cache.py
+(<user_data_dir>/hyperopt_results/events/*.jsonl, jedna JSON řádka na událost).
+
+Stream čte inkrementálně (jen nově dopsané řádky) a každých --interval sekund vypíše:
+  - průběh epoch, throughput (epochs/s celkem a za posledních --window s) a ETA,
+  - vytížení workerů: čas backtestů / uplynulý čas per worker a celkem vůči -j,
+    počet workerů, které se opravdu zapojily (pod-využité -j $(JOBS) je vidět hned),
+  - křivku best-so-far (loss přes epochy) a tabulku zlepšení.
+
+Použití (na hostu stačí python3 bez freqtrade):
+    python3 monitor_hyperopt.py                       # nejnovější stream v user_data
+    python3 monitor_hyperopt.py <soubor.jsonl> --once
+    kubectl exec ... -- tail -n +1 -f <soubor.jsonl> | python3 monitor_hyperopt.py -
+"""
+import argparse
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+EVENTS_DIR = Path('user_data') / 'hyperopt_results' / 'events'
+SPARK = '▁▂▃▄▅▆▇█'
+
+
+def latest_stream(directory):
+    streams = sorted(Path(directory).glob('*.jsonl'), key=lambda p: p.stat().st_mtime)
+    return streams[-1] if streams else None
+
+
+def format_duration(seconds):
+    if seconds is None or math.isinf(seconds) or math.isnan(seconds):
+        return '?'
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    return f"{hours}:{rest // 60:02d}:{rest % 60:02d}" if hours else f"{rest // 60}:{rest % 60:02d}"
+
+
+class StreamTail:
+    """Čte z JSON lines souboru jen nové celé řádky (nedopsaná poslední řádka počká)."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.offset = 0
+        self.partial = b''
+
+    def read(self):
+        try:
+            with self.path.open('rb') as f:
+                f.seek(self.offset)
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        self.offset += len(data)
+        lines = (self.partial + data).split(b'\n')
+        self.partial = lines.pop()
+        return [line for line in lines if line.strip()]
+
+
+class HyperoptProgress:
+    def __init__(self, window=60.0):
+        self.window = window
+        self.start = None
+        self.end = None
+        self.last_time = None
+        self.epochs = []
+        self.workers = {}
+        self.best = []
+        self.best_loss = None
+
+    def add(self, line):
+        try:
+            event = json.loads(line)
+        except ValueError:
+            return
+        kind = event.get('event')
+        self.last_time = event.get('time', self.last_time)
+        if kind == 'start':
+            # Nový běh ve stejném streamu (stdin) - statistiky od začátku
+            self.__init__(self.window)
+            self.start = event
+            self.last_time = event.get('time')
+        elif kind == 'end':
+            self.end = event
+        elif kind == 'epoch':
+            self.epochs.append(event)
+            worker = event.get('worker')
+            if worker is not None:
+                stats = self.workers.setdefault(worker, {'epochs': 0, 'busy': 0.0})
+                stats['epochs'] += 1
+                stats['busy'] += event.get('seconds') or 0.0
+            loss = event.get('loss')
+            if loss is not None and (self.best_loss is None or loss < self.best_loss):
+                self.best_loss = loss
+                self.best.append(event)
+
+    def elapsed(self, now):
+        if self.start is None:
+            return 0.0
+        until = self.end['time'] if self.end else now
+        return max(until - self.start['time'], 1e-9)
+
+    def throughput(self, now):
+        elapsed = self.elapsed(now)
+        overall = len(self.epochs) / elapsed if elapsed else 0.0
+        until = self.end['time'] if self.end else now
+        recent = [e for e in self.epochs if e['time'] >= until - self.window]
+        span = min(self.window, elapsed)
+        return overall, (len(recent) / span if span else 0.0)
+
+    def best_curve(self, width=60):
+        # Best-so-far loss po epochách, vzorkovaná do width sloupců (nižší loss = vyšší sloupec)
+        if not self.epochs:
+            return ''
+        curve, best = [], None
+        for event in self.epochs:
+            loss = event.get('loss')
+            if loss is not None and (best is None or loss < best):
+                best = loss
+            curve.append(best)
+        step = max(len(curve) / width, 1)
+        sampled = [curve[min(int(i * step), len(curve) - 1)] for i in range(min(width, len(curve)))]
+        sampled = [value for value in sampled if value is not None]
+        if not sampled:
+            return ''
+        high, low = max(sampled), min(sampled)
+        if high == low:
+            return SPARK[-1] * len(sampled)
+        return ''.join(SPARK[int((high - value) / (high - low) * (len(SPARK) - 1))] for value in sampled)
+
+    def render(self, source, now, stale_seconds):
+        start = self.start or {}
+        total = start.get('epochs') or (self.epochs[-1].get('epochs') if self.epochs else None)
+        jobs = start.get('jobs')
+        done = len(self.epochs)
+        elapsed = self.elapsed(now)
+        overall, recent = self.throughput(now)
+        lines = [
+            "📊 Hyperopt Progress Monitor",
+            "=============================",
+            f"Stream: {source}",
+            f"Strategy: {start.get('strategy', '?')}  spaces: {' '.join(start.get('spaces') or []) or '?'}  "
+            f"timeframe: {start.get('timeframe', '?')}  jobs: {jobs or '?'} (CPUs: {start.get('cpus', '?')})",
+        ]
+        if self.end:
+            lines.append(f"Status: ⏹  FINISHED after {format_duration(elapsed)}")
+        elif self.last_time is not None and now - self.last_time > stale_seconds:
+            lines.append(f"Status: ⏸️  no event for {format_duration(now - self.last_time)} (stopped?)")
+        else:
+            lines.append(f"Status: ✅ RUNNING for {format_duration(elapsed)}")
+
+        cached = sum(1 for e in self.epochs if e.get('cached'))
+        percent = f" ({100 * done / total:.0f}%)" if total else ''
+        lines.append(f"Epochs: {done}/{total or '?'}{percent}  cached: {cached}")
+        rate = recent or overall
+        eta = (total - done) / rate if total and rate and not self.end else None
+        lines.append(f"Throughput: {overall:.2f} epochs/s (last {self.window:.0f}s: {recent:.2f})"
+                     + (f"  ETA: {format_duration(eta)}" if eta is not None else ''))
+
+        if self.workers:
+            busy = sum(stats['busy'] for stats in self.workers.values())
+            slots = jobs or len(self.workers)
+            utilisation = busy / (elapsed * slots) if elapsed else 0.0
+            lines += ["", f"Workers: {len(self.workers)} active of {slots}, utilisation {100 * utilisation:.0f}% "
+                          f"(backtest {format_duration(busy)} / {format_duration(elapsed)} × {slots})"]
+            lines.append(f"  {'worker':>8} {'epochs':>7} {'busy':>9} {'util':>6} {'avg s':>7}")
+            for worker, stats in sorted(self.workers.items(), key=lambda item: -item[1]['busy']):
+                lines.append(f"  {worker:>8} {stats['epochs']:>7} {format_duration(stats['busy']):>9} "
+                             f"{100 * stats['busy'] / elapsed:>5.0f}% {stats['busy'] / stats['epochs']:>7.1f}")
+            if jobs and len(self.workers) < jobs:
+                lines.append(f"  ⚠️  only {len(self.workers)} of {jobs} workers ran an epoch")
+            cpus = start.get('cpus')
+            if jobs and cpus and jobs < cpus:
+                lines.append(f"  ⚠️  -j {jobs} uses {jobs} of {cpus} CPUs")
+            elif jobs and cpus and jobs > cpus:
+                lines.append(f"  ⚠️  -j {jobs} oversubscribes {cpus} CPUs - epochs compete for cores")
+            if done >= 2 * slots and utilisation < 0.7:
+                # Batch čeká na nejpomalejší epochu + ask/tell optimizeru v hlavním procesu
+                lines.append("  ⚠️  workers idle >30% - stragglers in batches or optimizer overhead between batches")
+
+        lines += ["", f"Best so far: {self.best_curve()}"]
+        lines.append(f"  {'epoch':>6} {'at':>8} {'loss':>12} {'profit':>9} {'trades':>7}")
+        for event in self.best[-8:]:
+            at = event['time'] - start['time'] if start else None
+            profit = event.get('profit')
+            lines.append(f"  {event['epoch']:>6} {format_duration(at):>8} {event['loss']:>12.5f} "
+                         f"{'?' if profit is None else f'{100 * profit:.2f}%':>9} {event.get('trades', '?'):>7}")
+        if self.best:
+            lines += ["", f"Best params: {json.dumps(self.best[-1].get('params'), sort_keys=True)}"]
+        return '\n'.join(lines)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Live monitor of the hyperopt event stream")
+    parser.add_argument('stream', nargs='?', default=None,
+                        help=f"events .jsonl, '-' = stdin (default: nejnovější v {EVENTS_DIR})")
+    parser.add_argument('--dir', default=str(EVENTS_DIR), help="adresář streamů")
+    parser.add_argument('--interval', type=float, default=5.0, help="obnovení výpisu (s)")
+    parser.add_argument('--window', type=float, default=60.0, help="okno pro aktuální throughput (s)")
+    parser.add_argument('--stale', type=float, default=300.0, help="bez události déle => stopped (s)")
+    parser.add_argument('--once', action='store_true', help="vypsat jednou a skončit")
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    args = parse_args(argv)
+    progress = HyperoptProgress(args.window)
+    clear = sys.stdout.isatty() and not args.once
+
+    def show(source):
+        if clear:
+            print('\033[2J\033[H', end='')
+        print(progress.render(source, time.time(), args.stale), flush=True)
+
+    if args.stream == '-':
+        shown = 0.0
+        for line in sys.stdin:
+            progress.add(line)
+            if progress.end:
+                break
+            if time.time() - shown >= args.interval:
+                show('stdin')
+                shown = time.time()
+        show('stdin')
+        return 0
+
+    path = Path(args.stream) if args.stream else latest_stream(args.dir)
+    if path is None or not path.is_file():
+        print(f"❌ No hyperopt event stream found ({args.stream or args.dir})")
+        return 1
+    tail = StreamTail(path)
+    try:
+        while True:
+            for line in tail.read():
+                progress.add(line)
+            show(path)
+            if args.once or progress.end:
+                return 0
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
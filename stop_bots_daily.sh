@@ -61,6 +61,9 @@ for bot in "${BOTS_TO_STOP[@]}"; do
         echo "   ✓ Secret ${bot}-secret smazán"
     fi
 
+    # Hash posledního nasazení - další autogen_daily.sh bota znovu nasadí
+    rm -f "${SCRIPT_DIR}/bots_dailybuy_${bot#dailybuy-}/.applied.sha256"
+
     echo ""
 done
 
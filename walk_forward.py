@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Walk-forward hyperopt: rolling train/test okna, hyperopt každého okna v process poolu,
+out-of-sample backtest s nejlepšími parametry okna a souhrnný report.
+
+  - Svíčková data (všechny páry / timeframy / candle typy pro whitelist) se načtou jednou
+    v hlavním procesu do shared memory. Workery je čtou odtud místo opakovaného čtení
+    feather souborů - data handler freqtrade je přesměrovaný na sdílené bloky.
+  - Každé okno má vlastní rozpočet hyperopt jobů (--jobs-per-window), okna běží paralelně
+    (--parallel-windows).
+  - Epochy se cachují přes hyperopt_epoch_cache.py (sdílený adresář pro všechna okna),
+    průběh každého okna jde do vlastního event streamu (monitor_hyperopt.py).
+  - Výstup: user_data/walk_forward/<run>/report.json + tabulka na stdout
+    (OOS profit per okno, stabilita parametrů mezi okny).
+
+Použití (uvnitř freqtrade prostředí, např. docker s --entrypoint python3):
+    python3 walk_forward.py -c user_data/config.json --strategy DailyBuyStrategy3_5_JPA \\
+        --timerange 20250101-20251231 --train-days 90 --test-days 30 --step-days 30 \\
+        --parallel-windows 2 --jobs-per-window 4 -e 500 --spaces buy sell
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger("walk_forward")
+
+DATE_FORMAT = "%Y%m%d"
+
+
+def build_windows(start, end, train_days, test_days, step_days):
+    """Rolling okna [train_start, train_end) + [train_end, test_end) v rámci start-end."""
+    windows = []
+    train_start = start
+    while True:
+        train_end = train_start + timedelta(days=train_days)
+        test_end = train_end + timedelta(days=test_days)
+        if test_end > end:
+            break
+        windows.append({
+            'name': f"w{len(windows):02d}",
+            'train': f"{train_start.strftime(DATE_FORMAT)}-{train_end.strftime(DATE_FORMAT)}",
+            'test': f"{train_end.strftime(DATE_FORMAT)}-{test_end.strftime(DATE_FORMAT)}",
+        })
+        train_start += timedelta(days=step_days)
+    return windows
+
+
+def build_config(args, runmode, timerange, user_data_dir):
+    from freqtrade.configuration import Configuration
+
+    cli = {
+        'config': args.config,
+        'strategy': args.strategy,
+        'strategy_path': args.strategy_path,
+        'user_data_dir': str(user_data_dir),
+        'datadir': args.datadir,
+        'timeframe': args.timeframe,
+        'timerange': timerange,
+        'epochs': args.epochs,
+        'spaces': args.spaces,
+        'hyperopt_loss': args.hyperopt_loss,
+        'hyperopt_jobs': args.jobs_per_window,
+        'hyperopt_random_state': args.random_state,
+        'hyperopt_min_trades': args.min_trades,
+        # Okna běží paralelně - nesmí si přepisovat <strategie>.json
+        'disableparamexport': True,
+    }
+    config = Configuration({k: v for k, v in cli.items() if v is not None}, runmode).get_config()
+    # Okno má vlastní user_data_dir (hyperopt pickle / results), data se čtou ze společného datadir
+    config['user_data_dir'] = Path(user_data_dir)
+    return config
+
+
+class WindowCandleStore:
+    """
+    Svíčková data ve sdílené paměti: jeden memmap .npy per (pair, timeframe, candle_type)
+    v /dev/shm (tmpfs), sloupce jako řádky 8bajtových hodnot (date jako int64 ns, ostatní float64).
+    Workery soubory jen mapují (copy-on-write) a dataframe staví přímo nad mapovanými řádky,
+    stránky se tak sdílí mezi všemi procesy a soukromou kopii dělá až trim/clean v ohlcv_load.
+    Pokud /dev/shm nemá dost místa (docker default 64 MB), použije se dočasný adresář na disku
+    - mmap stránky jsou pak sdílené přes page cache.
+    """
+
+    def __init__(self, meta, root=None):
+        self.meta = meta
+        self.root = root
+
+    @staticmethod
+    def shared_dir(required_bytes):
+        base = os.environ.get('WALK_FORWARD_SHM_DIR')
+        if not base and os.path.isdir('/dev/shm'):
+            if shutil.disk_usage('/dev/shm').free > required_bytes * 1.2:
+                base = '/dev/shm'
+        return Path(tempfile.mkdtemp(prefix='walk_forward_', dir=base))
+
+    @classmethod
+    def load(cls, config, pairs, min_timeframe_seconds):
+        from freqtrade.data.history import get_datahandler
+        from freqtrade.exchange import timeframe_to_seconds
+
+        handler = get_datahandler(config['datadir'], config.get('dataformat_ohlcv'))
+        available = handler.ohlcv_get_available_data(config['datadir'], config['trading_mode'])
+        frames = {}
+        for pair, timeframe, candle_type in available:
+            if pair not in pairs or timeframe_to_seconds(timeframe) < min_timeframe_seconds:
+                continue
+            df = handler._ohlcv_load(pair, timeframe, timerange=None, candle_type=candle_type)
+            if not df.empty:
+                frames[(pair, timeframe, candle_type.value)] = df
+
+        root = cls.shared_dir(sum(8 * df.size for df in frames.values()))
+        meta = {}
+        for i, (key, df) in enumerate(frames.items()):
+            columns = list(df.columns)
+            path = root / f"{i:04d}.npy"
+            buffer = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64,
+                                               shape=(len(columns), len(df)))
+            for j, column in enumerate(columns):
+                if column == 'date':
+                    buffer[j].view(np.int64)[:] = df['date'].values.astype('datetime64[ns]').view(np.int64)
+                else:
+                    buffer[j] = df[column].values
+            buffer.flush()
+            del buffer
+            meta[key] = {'path': str(path), 'columns': columns, 'date_unit': df['date'].dt.unit}
+        logger.info(f"Loaded {len(meta)} candle series into {root} "
+                    f"({sum(8 * df.size for df in frames.values()) / 1e6:.1f} MB)")
+        return cls(meta, root)
+
+    def frame(self, pair, timeframe, candle_type):
+        import pandas as pd
+
+        info = self.meta.get((pair, timeframe, candle_type.value))
+        if info is None:
+            return None
+        # 'c' = copy-on-write: zápis do dataframe kopíruje jen dotčené stránky, soubor se nemění
+        buffer = np.load(info['path'], mmap_mode='c')
+        data = {}
+        for i, column in enumerate(info['columns']):
+            if column == 'date':
+                data[column] = pd.to_datetime(buffer[i].view(np.int64), utc=True).as_unit(info['date_unit'])
+            else:
+                data[column] = buffer[i]
+        # copy=False - sloupce zůstávají pohledy do mmap (bez konsolidace do nového bloku)
+        return pd.DataFrame(data, copy=False)
+
+    def install(self, config):
+        """Přesměruje _ohlcv_load data handleru na sdílená data (chybějící klíče jdou z disku)."""
+        from freqtrade.data.history import get_datahandler
+
+        handler_class = type(get_datahandler(config['datadir'], config.get('dataformat_ohlcv')))
+        if getattr(handler_class, 'window_candle_store', None) is None:
+            original = handler_class._ohlcv_load
+
+            def _ohlcv_load(self, pair, timeframe, timerange, candle_type):
+                df = handler_class.window_candle_store.frame(pair, timeframe, candle_type)
+                if df is None:
+                    return original(self, pair, timeframe, timerange, candle_type)
+                return df
+
+            handler_class._ohlcv_load = _ohlcv_load
+        # Worker poolu může zpracovat víc oken - patch se instaluje jednou, store se jen vymění
+        handler_class.window_candle_store = self
+
+    def remove(self):
+        if self.root is not None:
+            shutil.rmtree(self.root, ignore_errors=True)
+
+
+def apply_params(strategy, details):
+    """
+    Nastaví strategii parametry z params_details nejlepší epochy. Backtest volá ft_bot_start ->
+    ft_load_hyper_params, který hodnoty parametrů znovu načte z _ft_params_from_file
+    (<strategie>.json) - proto se parametry prostorů zapíšou i tam.
+    """
+    params = {space: dict(details.get(space) or {}) for space in ('buy', 'sell', 'protection')}
+    strategy._ft_params_from_file = {**strategy._ft_params_from_file,
+                                     **{space: values for space, values in params.items() if values}}
+    for space, values in params.items():
+        for name, value in values.items():
+            attr = getattr(strategy, name, None)
+            if hasattr(attr, 'value'):
+                attr.value = value
+    if details.get('roi'):
+        strategy.minimal_roi = dict(sorted((int(k), v) for k, v in details['roi'].items()))
+    if details.get('stoploss'):
+        strategy.stoploss = details['stoploss']['stoploss']
+    for name, value in (details.get('trailing') or {}).items():
+        setattr(strategy, name, value)
+
+
+def window_params(details):
+    """Parametry prostorů buy/sell/protection z params_details jako plochý dict."""
+    return {name: value for space in ('buy', 'sell', 'protection')
+            for name, value in (details.get(space) or {}).items()}
+
+
+def run_window(window, args, store_meta, run_dir):
+    """Worker: hyperopt na train části okna, backtest nejlepších parametrů na test části."""
+    from freqtrade.enums import RunMode
+    from freqtrade.optimize.backtesting import Backtesting
+    from freqtrade.optimize.hyperopt import Hyperopt
+    from freqtrade.optimize.optimize_reports import generate_backtest_stats
+    from joblib.externals.loky import get_reusable_executor
+
+    import hyperopt_epoch_cache
+
+    logging.basicConfig(level=logging.WARNING, format=f"%(asctime)s - {window['name']} - %(message)s")
+    window_dir = run_dir / window['name']
+    (window_dir / 'hyperopt_results').mkdir(parents=True, exist_ok=True)
+
+    store = WindowCandleStore(store_meta)
+    if os.environ.get('HYPEROPT_EPOCH_CACHE', '1') != '0':
+        hyperopt_epoch_cache.install()
+    if os.environ.get('HYPEROPT_EVENTS', '1') != '0':
+        hyperopt_epoch_cache.install_events()
+    result = dict(window)
+    try:
+        config = build_config(args, RunMode.HYPEROPT, window['train'], window_dir)
+        store.install(config)
+        hyperopt = Hyperopt(config)
+        hyperopt.start()
+        best = hyperopt.current_best_epoch
+        if not best:
+            result['error'] = 'no hyperopt result'
+            return result
+        result['train_loss'] = best['loss']
+        result['train_profit'] = best['results_metrics'].get('profit_total')
+        result['params'] = best['params_dict']
+
+        bt_config = build_config(args, RunMode.BACKTEST, window['test'], window_dir)
+        backtesting = Backtesting(bt_config)
+        strategy = backtesting.strategylist[0]
+        apply_params(strategy, best['params_details'])
+        data, timerange = backtesting.load_bt_data()
+        min_date, max_date = backtesting.backtest_one_strategy(strategy, data, timerange)
+        # OOS musí běžet s parametry okna - ft_bot_start je jinak přepíše z <strategie>.json
+        expected = window_params(best['params_details'])
+        result['oos_params'] = {name: getattr(getattr(strategy, name, None), 'value', None) for name in expected}
+        mismatch = {name: (value, expected[name]) for name, value in result['oos_params'].items()
+                    if value != expected[name]}
+        if mismatch:
+            logging.error(f"Window {window['name']}: OOS backtest ran with other params: {mismatch}")
+            result['error'] = f"OOS params mismatch: {sorted(mismatch)}"
+        stats = generate_backtest_stats(data, backtesting.all_bt_content, min_date, max_date)
+        oos = stats['strategy'][strategy.get_strategy_name()]
+        result['oos'] = {k: oos.get(k) for k in (
+            'total_trades', 'profit_total', 'profit_total_abs', 'winrate',
+            'max_drawdown_account', 'holding_avg')}
+        return result
+    finally:
+        # Worker poolu nespouští atexit - loky workery hyperoptu by jinak blokovaly ukončení procesu
+        get_reusable_executor().shutdown(wait=True)
+
+
+def summarize(results):
+    done = [r for r in results if 'oos' in r]
+    profits = [r['oos']['profit_total'] or 0.0 for r in done]
+    compounded = float(np.prod([1 + p for p in profits]) - 1) if profits else 0.0
+
+    stability = {}
+    names = sorted({name for r in done for name in r['params']})
+    for name in names:
+        values = [r['params'][name] for r in done if isinstance(r['params'].get(name), (int, float))]
+        if len(values) > 1:
+            mean = statistics.fmean(values)
+            stdev = statistics.stdev(values)
+            stability[name] = {'mean': mean, 'stdev': stdev,
+                               'cv': stdev / abs(mean) if mean else None,
+                               'min': min(values), 'max': max(values)}
+    return {
+        'windows': len(results),
+        'completed': len(done),
+        'oos_profit_compounded': compounded,
+        'oos_profitable_windows': sum(p > 0 for p in profits),
+        'oos_trades': sum(r['oos']['total_trades'] or 0 for r in done),
+        'param_stability': stability,
+    }
+
+
+def print_report(results, summary):
+    print(f"{'okno':<6}{'train':<20}{'test':<20}{'train profit':>14}{'OOS trades':>12}"
+          f"{'OOS profit':>12}{'OOS DD':>10}")
+    for r in results:
+        if 'oos' not in r:
+            print(f"{r['name']:<6}{r['train']:<20}{r['test']:<20}  {r.get('error', 'failed')}")
+            continue
+        oos = r['oos']
+        print(f"{r['name']:<6}{r['train']:<20}{r['test']:<20}{r['train_profit'] or 0:>14.2%}"
+              f"{oos['total_trades'] or 0:>12}{oos['profit_total'] or 0:>12.2%}"
+              f"{oos['max_drawdown_account'] or 0:>10.2%}")
+    print(f"\nOOS složený profit: {summary['oos_profit_compounded']:.2%}, "
+          f"ziskových oken {summary['oos_profitable_windows']}/{summary['completed']}")
+    for name, s in summary['param_stability'].items():
+        cv = f"{s['cv']:.2f}" if s['cv'] is not None else "-"
+        print(f"  {name:<24} mean={s['mean']:<10.4g} stdev={s['stdev']:<10.4g} cv={cv}")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Walk-forward hyperopt orchestrator")
+    parser.add_argument('-c', '--config', action='append', required=True)
+    parser.add_argument('--strategy', required=True)
+    parser.add_argument('--strategy-path', dest='strategy_path')
+    parser.add_argument('--userdir', '--user-data-dir', dest='user_data_dir', default='user_data')
+    parser.add_argument('--datadir', default=None)
+    parser.add_argument('--timeframe', default=None)
+    parser.add_argument('--timerange', required=True, help="YYYYMMDD-YYYYMMDD")
+    parser.add_argument('--train-days', type=int, default=90)
+    parser.add_argument('--test-days', type=int, default=30)
+    parser.add_argument('--step-days', type=int, default=None, help="default: --test-days")
+    parser.add_argument('--parallel-windows', type=int, default=2)
+    parser.add_argument('--jobs-per-window', type=int, default=None,
+                        help="hyperopt -j per okno (default: CPU / parallel-windows)")
+    parser.add_argument('-e', '--epochs', type=int, default=500)
+    parser.add_argument('--spaces', nargs='+', default=['buy'])
+    parser.add_argument('--hyperopt-loss', dest='hyperopt_loss', default='OnlyProfitHyperOptLoss')
+    parser.add_argument('--random-state', dest='random_state', type=int, default=100)
+    parser.add_argument('--min-trades', dest='min_trades', type=int, default=1)
+    args = parser.parse_args(argv)
+    if args.step_days is None:
+        args.step_days = args.test_days
+    if args.jobs_per_window is None:
+        args.jobs_per_window = max(1, (os.cpu_count() or 1) // args.parallel_windows)
+    return args
+
+
+def main(argv):
+    from freqtrade.enums import RunMode
+    from freqtrade.exchange import timeframe_to_seconds
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(message)s")
+    args = parse_args(argv)
+    start, end = (datetime.strptime(d, DATE_FORMAT).replace(tzinfo=timezone.utc)
+                  for d in args.timerange.split('-'))
+    windows = build_windows(start, end, args.train_days, args.test_days, args.step_days)
+    if not windows:
+        print("Timerange is shorter than one train + test window.")
+        return 1
+
+    run_dir = Path(args.user_data_dir) / 'walk_forward' / datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+    run_dir.mkdir(parents=True, exist_ok=True)
+    # Sdílená epoch cache pro všechna okna (klíč obsahuje hash dat okna)
+    os.environ.setdefault('HYPEROPT_EPOCH_CACHE_DIR',
+                          str(Path(args.user_data_dir).resolve() / 'hyperopt_cache' / 'epochs'))
+
+    config = build_config(args, RunMode.HYPEROPT, args.timerange, Path(args.user_data_dir))
+    pairs = set(config['exchange']['pair_whitelist'])
+    min_timeframe = config.get('timeframe_detail') or config['timeframe']
+    store = WindowCandleStore.load(config, pairs, timeframe_to_seconds(min_timeframe))
+    logger.info(f"{len(windows)} windows, {args.parallel_windows} in parallel, "
+                f"{args.jobs_per_window} hyperopt jobs per window")
+
+    results = []
+    try:
+        with ProcessPoolExecutor(max_workers=args.parallel_windows,
+                                 mp_context=get_context('spawn')) as pool:
+            futures = {pool.submit(run_window, w, args, store.meta, run_dir): w for w in windows}
+            for future in as_completed(futures):
+                window = futures[future]
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logging.error(f"Window {window['name']} failed: {e}")
+                    results.append({**window, 'error': str(e)})
+    finally:
+        store.remove()
+
+    results.sort(key=lambda r: r['name'])
+    summary = summarize(results)
+    report = {'args': vars(args), 'summary': summary, 'windows': results}
+    with (run_dir / 'report.json').open('w') as f:
+        json.dump(report, f, indent=2, default=str)
+    print_report(results, summary)
+    print(f"\nReport: {run_dir / 'report.json'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))